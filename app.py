@@ -5,6 +5,9 @@ from pathlib import Path
 import pydeck as pdk
 import streamlit as st
 
+from src.db.raw_archive import read_archive
+from src.enrichment.grid_index import GridIndex
+
 # — helper to convert hex to rgba with some opacity —
 def hex_to_rgba(hex_color: str, alpha: int = 180) -> list[int]:
     """Convert hex color to RGBA list."""
@@ -88,33 +91,30 @@ def load_and_group():
     if not hotspots:
         return {}, "⚠️ No hotspots in latest insights."
 
+    # hotspots usually share a source archive; read each one once
+    sources = []
     for hs in hotspots:
         src_fn = hs.get("source_file", "")
-        if not src_fn:
-            skipped += 1
-            continue
-        src = raw_dir / src_fn
-        if not src.exists():
+        if not src_fn or not (raw_dir / src_fn).exists():
             skipped += 1
-            continue
+        elif src_fn not in sources:
+            sources.append(src_fn)
+
+    for src_fn in sources:
         try:
-            raw = json.loads(src.read_text(encoding="utf-8"))
-            recs = raw.get("data") if isinstance(raw, dict) else raw
-            if not isinstance(recs, list):
-                continue
-            for ev in recs:
-                if not isinstance(ev, dict):
-                    skipped += 1
-                    continue
-                try:
-                    lat = float(ev["latitude"])
-                    lon = float(ev["longitude"])
-                    et = ev.get("event_type", "unknown").lower().replace(" ", "_")
-                    events.setdefault(et, []).append({"lat": lat, "lon": lon})
-                    processed += 1
-                except Exception:
-                    skipped += 1
-                    continue
+            df = read_archive(raw_dir / src_fn, columns=["latitude", "longitude", "event_type"])
+            # bin events into grid cells per type; the map draws cells weighted by count
+            index = GridIndex(df["latitude"], df["longitude"])
+            valid = index.point_cells >= 0
+            skipped += int((~valid).sum())
+            types = df["event_type"].fillna("unknown").replace("", "unknown").str.lower().str.replace(" ", "_")
+            for et, points in types[valid].groupby(types[valid]).indices.items():
+                cells = index.density(valid.nonzero()[0][points])
+                events.setdefault(et, []).extend(
+                    {"lat": float(lat), "lon": float(lon), "count": int(count)}
+                    for lat, lon, count in cells[["latitude", "longitude", "count"]].itertuples(index=False)
+                )
+                processed += len(points)
         except Exception:
             skipped += 1
             continue
@@ -222,6 +222,11 @@ for etype, evs in events_by_type.items():
         id=layer_key,
         data=evs,
         get_position="[lon, lat]",
+        # each point is a grid cell; weight it by its event count
+        get_elevation_weight="count",
+        elevation_aggregation="SUM",
+        get_color_weight="count",
+        color_aggregation="SUM",
         radius=radius,
         elevation_scale=elevation_scale,
         extruded=True,
@@ -238,10 +243,9 @@ for etype, evs in events_by_type.items():
 
 # render map with a unique key
 if layers:
-    all_lats = [e["lat"] for evs in events_by_type.values() for e in evs]
-    all_lons = [e["lon"] for evs in events_by_type.values() for e in evs]
-    center_lat = sum(all_lats) / len(all_lats)
-    center_lon = sum(all_lons) / len(all_lons)
+    all_cells = [e for evs in events_by_type.values() for e in evs]
+    center_lat = sum(e["lat"] * e["count"] for e in all_cells) / sum(e["count"] for e in all_cells)
+    center_lon = sum(e["lon"] * e["count"] for e in all_cells) / sum(e["count"] for e in all_cells)
     view = pdk.ViewState(latitude=center_lat, longitude=center_lon, zoom=2, pitch=40)
     
     # Create deck with unique key based on colors
@@ -256,8 +260,8 @@ if layers:
     # Render with unique key
     st.pydeck_chart(r, use_container_width=True, key=f"map_{deck_key}")
     
-    total = sum(len(v) for v in events_by_type.values())
-    shown = sum(len(events_by_type[k]) for k, s in layer_settings.items() if s["visible"])
+    total = sum(e["count"] for v in events_by_type.values() for e in v)
+    shown = sum(e["count"] for k, s in layer_settings.items() if s["visible"] for e in events_by_type[k])
     count = sum(s["visible"] for s in layer_settings.values())
     st.sidebar.success(f"Showing {shown:,}/{total:,} events across {count} layers")
 else:
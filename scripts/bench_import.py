@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Cold-start import benchmark for the CLI and the API.
+
+Each target is imported in a fresh interpreter under ``python -X importtime``.
+The script reports the summed self time of every module imported, the
+slowest top-level packages, and which heavy dependencies (``HEAVY_MODULES``)
+were loaded. ``--check`` makes it a regression test: it exits non-zero if
+importing ``src.core.ctrl``, or running a registry lookup for a light agent,
+loads a heavy module that agent does not need.
+
+    python scripts/bench_import.py
+    python scripts/bench_import.py --agent insight_agent
+    python scripts/bench_import.py --check
+"""
+import os
+import sys
+import argparse
+import json
+import subprocess
+from collections import defaultdict
+from typing import Dict, List
+
+# Add the src directory to the Python path
+root_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, root_dir)
+
+# Dependencies that cost hundreds of milliseconds (or network calls) to import
+HEAVY_MODULES = ["pandas", "numpy", "matplotlib", "folium", "openai", "boto3", "requests", "fastapi"]
+
+# Code run by each target; {agent} is replaced by --agent
+TARGETS = {
+    "ctrl": "import src.core.ctrl",
+    "cli_agent": "from src.core.ctrl import AGENT_REGISTRY; AGENT_REGISTRY['{agent}']",
+    "api": "import src.api.main",
+}
+
+# Heavy modules that must stay out of a target, for --check
+FORBIDDEN = {
+    "ctrl": HEAVY_MODULES,
+    "cli_agent": HEAVY_MODULES,  # with the default, dependency-free ai_news_agent
+}
+
+
+def measure(code: str) -> Dict[str, object]:
+    """Import time of ``code`` in a fresh interpreter started in the repo root."""
+    probe = f"{code}\nimport sys, json\nprint(json.dumps(sorted(m for m in {HEAVY_MODULES!r} if m in sys.modules)))"
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", probe], cwd=root_dir,
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        return {"error": proc.stderr.strip().splitlines()[-1]}
+    total = 0
+    packages: Dict[str, int] = defaultdict(int)
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        total += int(self_us)
+        packages[name.strip().split(".")[0]] += int(self_us)
+    slowest = sorted(packages.items(), key=lambda item: -item[1])[:8]
+    return {
+        "import_ms": round(total / 1000, 1),
+        "slowest_ms": {name: round(us / 1000, 1) for name, us in slowest},
+        "heavy": json.loads(proc.stdout.strip().splitlines()[-1]),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark cold-start imports of the CLI and API.")
+    parser.add_argument("--agent", default="ai_news_agent", help="Agent looked up by the cli_agent target")
+    parser.add_argument("--check", action="store_true",
+                        help="Fail if ctrl or the agent lookup import a heavy module")
+    args = parser.parse_args()
+
+    failures: List[str] = []
+    for target, code in TARGETS.items():
+        result = measure(code.format(agent=args.agent))
+        print(json.dumps({"target": target, **result}))
+        forbidden = set(FORBIDDEN.get(target, [])) & set(result.get("heavy", []))
+        if args.check and (forbidden or "error" in result) and target in FORBIDDEN:
+            failures.append(f"{target}: {result.get('error') or sorted(forbidden)}")
+    for failure in failures:
+        print(f"FAIL {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
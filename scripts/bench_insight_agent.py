@@ -0,0 +1,486 @@
+#!/usr/bin/env python3
+"""
+Benchmark InsightAgent on a synthetic ACLED archive.
+
+``--stage load`` compares the legacy load path (DataFrame ->
+acled_processed.csv -> read_csv -> to_datetime) with the typed in-memory path
+of ``InsightAgent.load_data``; each path runs in its own subprocess so peak
+RSS is measured cleanly. ``--stage profiles`` times the country/event-type/
+actor profile engine against the per-group loops it replaced, and ``--stage
+alerts`` the strategic alert detectors against the per-location/per-country
+rescans they replaced. ``--stage incremental`` spreads the events over three
+years, then compares a full rebuild of the insight state with a daily
+incremental run that merges one new archive (including revised events).
+``--stage events`` compares the memory held by the events as a list of
+ACLED dicts with the same events in an ``EventTable``.
+
+    python scripts/bench_insight_agent.py --events 1000000
+    python scripts/bench_insight_agent.py --events 1000000 --stage profiles
+    python scripts/bench_insight_agent.py --events 1000000 --stage alerts
+    python scripts/bench_insight_agent.py --events 1000000 --stage incremental
+    python scripts/bench_insight_agent.py --events 1000000 --stage events
+"""
+import os
+import sys
+import argparse
+import json
+import random
+import resource
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Dict, List
+
+# Add the src directory to the Python path
+root_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, root_dir)
+
+import pandas as pd
+
+from src.core.event_table import EventTable
+from src.db.raw_archive import ArchiveWriter, archive_path, iter_archive, read_archive
+from src.agents.insight_agent import _value_counts
+
+# roughly ACLED's cardinality: ~200 countries, thousands of actors and locations
+COUNTRIES = ["Sudan", "Chad", "Mali", "Niger", "Nigeria", "Somalia", "Ethiopia", "Kenya",
+             "Yemen", "Syria", "Myanmar", "Ukraine", "Mexico", "Colombia", "Haiti", "DR Congo"] \
+    + [f"Country {i}" for i in range(184)]
+EVENT_TYPES = ["Battles", "Protests", "Riots", "Explosions/Remote violence",
+               "Violence against civilians", "Strategic developments"]
+
+
+def generate_archive(raw_dir: str, events: int, seed: int = 7, day: str = "2025-04-30",
+                     first_id: int = 0, dates: Any = None) -> str:
+    """Write ``events`` synthetic ACLED events to a columnar archive.
+
+    Event dates fall in Jan-Apr 2025 unless ``dates`` (a function of the
+    random generator) picks them.
+    """
+    rng = random.Random(seed)
+    actors = [f"Armed Group {i}" for i in range(5000)] + [""]
+    path = archive_path(raw_dir, day)
+    with ArchiveWriter(path) as writer:
+        for start in range(first_id, first_id + events, 5000):
+            page = []
+            for i in range(start, min(start + 5000, first_id + events)):
+                country = rng.choice(COUNTRIES)
+                page.append({
+                    "event_id_cnty": f"{country[:3].upper()}{i}",
+                    "event_date": dates(rng) if dates else f"2025-{rng.randint(1, 4):02d}-{rng.randint(1, 28):02d}",
+                    "event_type": rng.choice(EVENT_TYPES),
+                    "sub_event_type": "Armed clash",
+                    "actor1": rng.choice(actors),
+                    "actor2": rng.choice(actors),
+                    "region": "Africa",
+                    "country": country,
+                    "admin1": f"{country} Province {rng.randint(0, 9)}",
+                    "location": f"{country} Town {rng.randint(0, 300)}",
+                    "latitude": f"{rng.uniform(-10, 30):.4f}",
+                    "longitude": f"{rng.uniform(-20, 50):.4f}",
+                    "fatalities": str(rng.choice([0, 0, 0, 1, 2, 5, 12])),
+                    "notes": "Armed clashes were reported between the two groups near the town.",
+                    "source": "Local media",
+                    "timestamp": "1745000000",
+                })
+            writer.write_all(page)
+    return path
+
+
+def load_legacy(raw_dir: str, processed_dir: str) -> pd.DataFrame:
+    """The pre-typed load path: raw -> CSV -> read_csv -> to_datetime."""
+    df = pd.DataFrame(read_archive(archive_path(raw_dir, "2025-04-30")))
+    df['data_id'] = df['event_id_cnty']
+    os.makedirs(processed_dir, exist_ok=True)
+    csv_path = os.path.join(processed_dir, "acled_processed.csv")
+    df.to_csv(csv_path, index=False)
+    data = pd.read_csv(csv_path)
+    data['event_date'] = pd.to_datetime(data['event_date'], errors='coerce')
+    # extract_metadata parsed the dates once more
+    data['event_date'] = pd.to_datetime(data['event_date'])
+    return data
+
+
+def _legacy_trend(dates: pd.Series) -> float:
+    date_range = dates.max() - dates.min()
+    if pd.isna(date_range):
+        return 0
+    quarter_range = date_range / 4
+    recent_events = len(dates[dates >= dates.max() - quarter_range])
+    early_events = len(dates[dates <= dates.min() + quarter_range])
+    if early_events > 0:
+        return (recent_events - early_events) / early_events
+    return 1 if recent_events > 0 else 0
+
+
+def legacy_profiles(data: pd.DataFrame) -> None:
+    """The per-group loops the profile engine replaced (results discarded)."""
+    vc = _value_counts
+    for country, group in data.groupby('country', observed=True):
+        vc(group['event_type']).to_dict()
+        int(group['fatalities'].sum())
+        vc(group['actor1']).head(5).to_dict()
+        vc(group['actor2']).head(5).to_dict()
+        group.groupby('location', observed=True).agg({'data_id': 'count', 'fatalities': 'sum'}) \
+            .sort_values('data_id', ascending=False).head(5)
+        _legacy_trend(group['event_date'])
+    for event_type, group in data.groupby('event_type', observed=True):
+        int(group['fatalities'].sum())
+        _legacy_trend(group['event_date'])
+        vc(group['country']).head(5).to_dict()
+    done = set()
+    for actor_col in ['actor1', 'actor2']:
+        for actor in vc(data[actor_col]).head(20).index.tolist():
+            if pd.isna(actor) or actor == '' or actor in done:
+                continue
+            actor_events = data[(data['actor1'] == actor) | (data['actor2'] == actor)]
+            if len(actor_events) < 5:
+                continue
+            done.add(actor)
+            int(actor_events['fatalities'].sum())
+            vc(actor_events['country']).head(5).to_dict()
+            vc(actor_events['event_type']).head(5).to_dict()
+            _legacy_trend(actor_events['event_date'])
+            vc(actor_events['actor2' if actor_col == 'actor1' else 'actor1']).head(5).to_dict()
+
+
+def bench_profiles(raw_dir: str) -> None:
+    """Time the profile engine against the legacy per-group loops."""
+    from src.agents.insight_agent import InsightAgent
+
+    with tempfile.TemporaryDirectory() as processed_dir:
+        agent = InsightAgent(raw_data_dir=raw_dir, processed_data_dir=processed_dir)
+        agent.load_data()
+    started = time.perf_counter()
+    legacy_profiles(agent.data)
+    legacy = time.perf_counter() - started
+    started = time.perf_counter()
+    agent.extract_country_profiles()
+    agent.extract_event_type_summary()
+    agent.extract_actor_profiles()
+    engine = time.perf_counter() - started
+    print(json.dumps({"stage": "profiles", "rows": len(agent.data), "legacy_seconds": round(legacy, 2),
+                      "engine_seconds": round(engine, 2), "speedup": round(legacy / engine, 1)}))
+
+
+def legacy_alerts(data: pd.DataFrame) -> List[Dict[str, Any]]:
+    """InsightAgent.identify_strategic_alerts before the detector pipeline."""
+    alerts = []
+    
+    # 1. Look for emerging hotspots - locations with rapid increase in events
+    recent_cutoff = data['event_date'].max() - pd.Timedelta(days=30)
+    
+    # Get locations with at least 3 events in the last 30 days
+    recent_locations = data[data['event_date'] >= recent_cutoff].groupby(
+        ['country', 'location'], observed=True
+    ).size().reset_index(name='recent_count')
+    
+    recent_locations = recent_locations[recent_locations['recent_count'] >= 3]
+    
+    for _, row in recent_locations.iterrows():
+        # Check if this is a new or escalating hotspot
+        all_events_at_location = data[
+            (data['country'] == row['country']) & 
+            (data['location'] == row['location'])
+        ]
+        
+        total_events = len(all_events_at_location)
+        recent_ratio = row['recent_count'] / total_events
+        
+        # If most events are recent, it's an emerging hotspot
+        if recent_ratio > 0.7 and total_events >= 5:
+            # Get event types for context
+            event_types = _value_counts(all_events_at_location['event_type']).head(2).to_dict()
+            event_type_str = ", ".join(event_types.keys())
+            
+            # Get fatalities
+            fatalities = int(all_events_at_location['fatalities'].sum())
+            
+            alerts.append({
+                "type": "Emerging Hotspot",
+                "severity": "High" if fatalities > 10 else "Medium",
+                "location": {
+                    "country": row['country'],
+                    "location": row['location']
+                },
+                "description": f"Rapid escalation of conflict in {row['location']}, {row['country']} with {row['recent_count']} recent events ({event_type_str})."
+            })
+    
+    # 2. Look for unusual spikes in fatalities
+    country_recent_fatalities = data[data['event_date'] >= recent_cutoff].groupby(
+        'country', observed=True
+    )['fatalities'].sum().reset_index()
+    
+    for _, row in country_recent_fatalities.iterrows():
+        # Compare to historical averages
+        country_data = data[data['country'] == row['country']]
+        
+        # Skip if not enough data
+        if len(country_data) < 10:
+            continue
+            
+        # Calculate average fatalities per month historically
+        date_range_days = (country_data['event_date'].max() - country_data['event_date'].min()).days
+        if date_range_days <= 0:
+            continue
+            
+        months = date_range_days / 30
+        historical_monthly_avg = country_data['fatalities'].sum() / months
+        
+        # Recent is for last ~1 month
+        recent_monthly = row['fatalities']
+        
+        # If recent fatalities are significantly higher than historical average
+        if recent_monthly > 0 and (recent_monthly / historical_monthly_avg) > 2:
+            alerts.append({
+                "type": "Fatality Spike",
+                "severity": "High" if recent_monthly > 50 else "Medium",
+                "location": {
+                    "country": row['country']
+                },
+                "description": f"Significant increase in fatalities in {row['country']} with {int(recent_monthly)} fatalities in the last 30 days, compared to historical average of {int(historical_monthly_avg)} per month."
+            })
+    
+    # 3. Look for new conflict actors
+    recent_actors = set()
+    for col in ['actor1', 'actor2']:
+        recent_actors.update(data[data['event_date'] >= recent_cutoff][col].unique())
+    
+    older_cutoff = recent_cutoff - pd.Timedelta(days=60)
+    older_actors = set()
+    for col in ['actor1', 'actor2']:
+        older_actors.update(data[
+            (data['event_date'] < recent_cutoff) & 
+            (data['event_date'] >= older_cutoff)
+        ][col].unique())
+    
+    historical_actors = set()
+    for col in ['actor1', 'actor2']:
+        historical_actors.update(data[data['event_date'] < older_cutoff][col].unique())
+    
+    # New actors are those in recent_actors but not in historical_actors
+    new_actors = recent_actors - historical_actors
+    new_actors = {actor for actor in new_actors if actor and not pd.isna(actor) and len(str(actor)) > 3}
+    
+    for actor in new_actors:
+        # Get context about this new actor
+        actor_events = data[(data['actor1'] == actor) | (data['actor2'] == actor)]
+        
+        if len(actor_events) < 3:
+            continue
+            
+        countries = _value_counts(actor_events['country']).head(2).index.tolist()
+        countries_str = ", ".join(countries)
+        
+        event_types = _value_counts(actor_events['event_type']).head(2).index.tolist()
+        event_types_str = ", ".join(event_types)
+        
+        fatalities = int(actor_events['fatalities'].sum())
+        
+        alerts.append({
+            "type": "New Actor",
+            "severity": "High" if fatalities > 20 else "Medium",
+            "location": {
+                "countries": countries
+            },
+            "description": f"Emergence of new conflict actor: {actor} in {countries_str}. Associated with {event_types_str} events and {fatalities} fatalities."
+        })
+    
+    # 4. Look for changes in conflict dynamics (e.g., shift from protests to violence)
+    for country in data['country'].unique():
+        country_data = data[data['country'] == country]
+        
+        if len(country_data) < 10:
+            continue
+            
+        # Analyze event type distribution over time
+        recent_events = country_data[country_data['event_date'] >= recent_cutoff]
+        historical_events = country_data[country_data['event_date'] < recent_cutoff]
+        
+        if len(recent_events) < 5 or len(historical_events) < 5:
+            continue
+            
+        # Compare event type distributions
+        recent_types = _value_counts(recent_events['event_type'], normalize=True)
+        historical_types = _value_counts(historical_events['event_type'], normalize=True)
+        
+        for event_type in recent_types.index:
+            if event_type in historical_types:
+                change = recent_types[event_type] - historical_types[event_type]
+                
+                # If there's a significant increase in this event type
+                if change > 0.2:  # 20% shift in distribution
+                    alerts.append({
+                        "type": "Conflict Dynamic Shift",
+                        "severity": "Medium",
+                        "location": {
+                            "country": country
+                        },
+                        "description": f"Significant shift toward {event_type} events in {country}. This event type now represents {int(recent_types[event_type]*100)}% of recent events, up from {int(historical_types[event_type]*100)}% historically."
+                    })
+            elif recent_types[event_type] > 0.25:  # If a new event type represents >25% of recent events
+                alerts.append({
+                    "type": "New Conflict Dynamic",
+                    "severity": "High",
+                    "location": {
+                        "country": country
+                    },
+                    "description": f"Emergence of {event_type} as a significant new conflict dynamic in {country}, representing {int(recent_types[event_type]*100)}% of recent events."
+                })
+    
+    # Sort alerts by severity
+    severity_order = {"High": 0, "Medium": 1, "Low": 2}
+    alerts = sorted(alerts, key=lambda x: severity_order.get(x["severity"], 3))
+    
+    return alerts
+
+
+def bench_alerts(raw_dir: str) -> None:
+    """Time the alert detector pipeline against the legacy per-group rescans."""
+    from src.agents.insight_agent import InsightAgent
+    from src.enrichment.alerts import detect_alerts
+
+    with tempfile.TemporaryDirectory() as processed_dir:
+        agent = InsightAgent(raw_data_dir=raw_dir, processed_data_dir=processed_dir)
+        agent.load_data()
+    started = time.perf_counter()
+    legacy = legacy_alerts(agent.data)
+    legacy_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    alerts = detect_alerts(agent.data)
+    seconds = time.perf_counter() - started
+    print(json.dumps({"stage": "alerts", "rows": len(agent.data), "alerts": len(alerts),
+                      "legacy_alerts": len(legacy), "legacy_seconds": round(legacy_seconds, 2),
+                      "pipeline_seconds": round(seconds, 2), "speedup": round(legacy_seconds / seconds, 1)}))
+
+
+def _report(agent: Any) -> None:
+    """Everything ``InsightAgent.run`` does except writing the JSON file."""
+    agent.load_data()
+    agent.extract_metadata()
+    agent.extract_country_profiles()
+    agent.extract_event_type_summary()
+    agent.extract_actor_profiles()
+    agent.identify_hotspots()
+    agent.identify_strategic_alerts()
+    agent.extract_event_samples()
+
+
+def bench_incremental(raw_dir: str, events: int) -> None:
+    """Time a daily incremental run against rebuilding the state from all archives."""
+    from src.agents.insight_agent import InsightAgent
+
+    def history_date(rng: random.Random) -> str:
+        return f"{rng.randint(2022, 2024)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+
+    # the history as one archive per quarter
+    per_file = max(events // 12, 1)
+    for quarter in range(12):
+        generate_archive(raw_dir, per_file, seed=quarter, first_id=quarter * per_file,
+                         day=f"{2022 + quarter // 4}-{quarter % 4 * 3 + 1:02d}-01", dates=history_date)
+
+    with tempfile.TemporaryDirectory() as processed_dir:
+        started = time.perf_counter()
+        _report(InsightAgent(raw_data_dir=raw_dir, processed_data_dir=processed_dir, mode="full"))
+        full_seconds = time.perf_counter() - started
+
+        # one day of new events; the first 200 ids revise events already in the state
+        generate_archive(raw_dir, 1000, seed=99, first_id=per_file * 12 - 200, day="2025-01-01",
+                         dates=lambda rng: "2024-12-31")
+        started = time.perf_counter()
+        agent = InsightAgent(raw_data_dir=raw_dir, processed_data_dir=processed_dir, mode="incremental")
+        _report(agent)
+        incremental_seconds = time.perf_counter() - started
+        state_mb = os.path.getsize(agent.state_path) / 1e6
+
+    print(json.dumps({"stage": "incremental", "rows": len(agent.state),
+                      "full_seconds": round(full_seconds, 2),
+                      "incremental_seconds": round(incremental_seconds, 2),
+                      "state_mb": round(state_mb, 1),
+                      "speedup": round(full_seconds / incremental_seconds, 1)}))
+
+
+def bench_events(raw_dir: str) -> None:
+    """Memory of the events as ACLED dicts vs. an EventTable."""
+    path = archive_path(raw_dir, "2025-04-30")
+    tracemalloc.start()
+    events = list(iter_archive(path))
+    dicts_mb = tracemalloc.get_traced_memory()[0] / 1e6
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    table = EventTable.from_records(events)
+    seconds = time.perf_counter() - started
+    del events
+    print(json.dumps({
+        "events": len(table),
+        "dicts_mb": round(dicts_mb, 1),
+        "table_mb": round(table.nbytes / 1e6, 1),
+        "from_records_seconds": round(seconds, 2),
+    }))
+
+
+def load_typed(raw_dir: str, processed_dir: str) -> pd.DataFrame:
+    from src.agents.insight_agent import InsightAgent
+
+    agent = InsightAgent(raw_data_dir=raw_dir, processed_data_dir=processed_dir)
+    agent.load_data()
+    return agent.data
+
+
+def measure(mode: str, raw_dir: str) -> None:
+    """Run one load path in this process and print its stats as JSON."""
+    base_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    with tempfile.TemporaryDirectory() as processed_dir:
+        started = time.perf_counter()
+        data = (load_legacy if mode == "legacy" else load_typed)(raw_dir, processed_dir)
+        seconds = time.perf_counter() - started
+    print(json.dumps({
+        "mode": mode,
+        "rows": len(data),
+        "seconds": round(seconds, 2),
+        "frame_mb": round(data.memory_usage(deep=True).sum() / 1e6, 1),
+        # ru_maxrss is in KiB on Linux
+        "peak_rss_mb": round((resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - base_rss) / 1024, 1),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark InsightAgent data loading.")
+    parser.add_argument("--events", type=int, default=1_000_000, help="Synthetic events to generate")
+    parser.add_argument("--stage", choices=["load", "profiles", "alerts", "incremental", "events"],
+                        default="load",
+                        help="load: raw archive -> DataFrame; profiles: country/event-type/actor "
+                             "profiles; alerts: strategic alert detectors; incremental: daily "
+                             "state update vs full rebuild; events: event dicts vs EventTable memory")
+    parser.add_argument("--mode", choices=["legacy", "typed"], help=argparse.SUPPRESS)
+    parser.add_argument("--raw_dir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        measure(args.mode, args.raw_dir)
+        return
+
+    with tempfile.TemporaryDirectory() as raw_dir:
+        print(f"Generating {args.events} events...")
+        if args.stage == "incremental":
+            bench_incremental(raw_dir, args.events)
+            return
+        generate_archive(raw_dir, args.events)
+        if args.stage == "profiles":
+            bench_profiles(raw_dir)
+            return
+        if args.stage == "alerts":
+            bench_alerts(raw_dir)
+            return
+        if args.stage == "events":
+            bench_events(raw_dir)
+            return
+        for mode in ("legacy", "typed"):
+            out = subprocess.run([sys.executable, __file__, "--mode", mode, "--raw_dir", raw_dir],
+                                 check=True, capture_output=True, text=True).stdout
+            print(out.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    main()
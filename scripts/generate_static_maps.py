@@ -3,10 +3,14 @@ import json
 from pathlib import Path
 # import pydeck as pdk # No longer needed directly here
 import logging
+import numpy as np
 
 # Import the rendering function from the agent
 # Assuming src is importable from scripts/, adjust sys.path if necessary
 from src.agents.map_render_agent import render_hotspot_map
+from src.core import artifact_cache
+from src.db.raw_archive import read_archive
+from src.enrichment.grid_index import GridIndex
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -34,6 +38,22 @@ MAP_CONFIG = {
 }
 
 MAX_HOTSPOTS_TO_MAP = 5 # Limit number of maps generated
+MAP_COLUMNS = ["latitude", "longitude", "event_type"]
+HOTSPOT_RADIUS_KM = 50 # Events within this distance of a hotspot are mapped
+
+def event_category(event_type) -> str:
+    # Simple classification based on event_type string
+    et_str = event_type.lower() if isinstance(event_type, str) else "other"
+    if "battle" in et_str: return "battle"
+    elif "protest" in et_str or "riot" in et_str: return "protest"
+    elif "attack" in et_str or "violence" in et_str or "explosion" in et_str: return "attack"
+    return "other"
+
+def load_archive_index(src: Path):
+    """Read an archive's map columns once and index its events by grid cell."""
+    df = read_archive(src, columns=MAP_COLUMNS)
+    categories = np.array([event_category(et) for et in df["event_type"]], dtype=object)
+    return GridIndex(df["latitude"], df["longitude"]), categories
 
 # ─── Main Script Logic ───────────────────────────────────────────────────────
 
@@ -41,7 +61,9 @@ def generate_maps():
     logging.info("Starting static map generation process.")
 
     # ─── Load latest insights ───────────────────────────────────────────────
-    ins_files = sorted(insights_dir.glob("conflict_insights_*.json"), reverse=True)
+    # the file the last InsightAgent run produced or reused, else the newest by name
+    recorded = artifact_cache.latest_output("insights", "insights")
+    ins_files = [Path(recorded)] if recorded else sorted(insights_dir.glob("conflict_insights_*.json"), reverse=True)
     if not ins_files:
         logging.error(f"❌ No insight files found in {insights_dir}")
         return
@@ -59,7 +81,22 @@ def generate_maps():
         logging.warning("No hotspots found in the insight file.")
         return
 
+    # ─── Reuse the maps of an identical earlier run ─────────────────────────
+    sources = sorted({raw_dir / hs["source_file"] for hs in hotspots if hs.get("source_file")})
+    key = artifact_cache.stage_key(
+        "maps", [latest_insight_file, *sources],
+        config={"map": MAP_CONFIG, "max_hotspots": MAX_HOTSPOTS_TO_MAP, "radius_km": HOTSPOT_RADIUS_KM,
+                "output_dir": str(output_dir)},
+        code=[generate_maps, load_archive_index, event_category, render_hotspot_map, GridIndex])
+    cached = artifact_cache.lookup("maps", key)
+    if cached is not None:
+        logging.info(f"Insights and archives unchanged; reusing {len(cached['outputs'])} maps in {output_dir}")
+        return
+
     # ─── Process each hotspot ───────────────────────────────────────────────
+    map_files = {}
+    failed = False # a run with errors is not cached, so the next run retries
+    indexes = {} # source file -> (GridIndex, event categories), loaded once
     maps_generated = 0
     for i, hs in enumerate(hotspots):
         if maps_generated >= MAX_HOTSPOTS_TO_MAP:
@@ -82,33 +119,28 @@ def generate_maps():
         # ─── Group events for this hotspot ───────────────────────────────
         hotspot_events_by_type: dict[str, list[dict]] = {}
         try:
-            data = json.loads(src.read_text(encoding='utf-8'))
-            raw_event_list = data.get("data") if isinstance(data, dict) else data
-            if not isinstance(raw_event_list, list):
-                 logging.warning(f"Skipping hotspot {hotspot_id}: Event data in '{src.name}' is not a list.")
-                 continue
-
-            processed_count = 0
-            for ev in raw_event_list:
-                if not isinstance(ev, dict):
-                    continue
-                try:
-                    lat = float(ev["latitude"])
-                    lon = float(ev["longitude"])
-                    # Simple classification based on event_type string
-                    et_str = ev.get("event_type", "other").lower()
-                    if "battle" in et_str: key = "battle"
-                    elif "protest" in et_str or "riot" in et_str: key = "protest"
-                    elif "attack" in et_str or "violence" in et_str or "explosion" in et_str: key = "attack"
-                    else: key = "other"
-                    hotspot_events_by_type.setdefault(key, []).append({"lat": lat, "lon": lon})
-                    processed_count += 1
-                except (KeyError, ValueError, TypeError):
-                    continue # Skip invalid event entries silently for now
-            logging.info(f"Processed {processed_count} events for hotspot {hotspot_id}.")
+            # Only the map columns are materialized from the archive
+            if src_filename not in indexes:
+                indexes[src_filename] = load_archive_index(src)
+            index, categories = indexes[src_filename]
+
+            # Events near the hotspot (all of them for hotspots without coordinates),
+            # binned into grid cells per category
+            if hs.get("latitude") is not None and hs.get("longitude") is not None:
+                points = index.radius(hs["latitude"], hs["longitude"], HOTSPOT_RADIUS_KM)
+            else:
+                points = np.flatnonzero(index.point_cells >= 0)
+            for key in sorted(set(categories[points])):
+                cells = index.density(points[categories[points] == key])
+                hotspot_events_by_type[key] = [
+                    {"lat": float(lat), "lon": float(lon), "count": int(count)}
+                    for lat, lon, count in cells[["latitude", "longitude", "count"]].itertuples(index=False)
+                ]
+            logging.info(f"Processed {len(points)} events for hotspot {hotspot_id}.")
 
         except Exception as e:
              logging.error(f"Error processing file {src.name} for hotspot {hotspot_id}: {e}")
+             failed = True
              continue
 
         if not hotspot_events_by_type:
@@ -125,11 +157,14 @@ def generate_maps():
 
         if success:
             maps_generated += 1
+            map_files[hotspot_id] = output_dir / f"{hotspot_id}_map.html"
         else:
             # Error is logged within the agent function
             # logging.error(f"Map generation failed for hotspot {hotspot_id}.")
-            pass # Continue to next hotspot even if one fails
+            failed = True # Continue to next hotspot even if one fails
 
+    if not failed:
+        artifact_cache.store("maps", key, map_files)
     logging.info(f"Map generation process finished. Generated {maps_generated} maps.")
 
 if __name__ == "__main__":
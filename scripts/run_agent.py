@@ -6,15 +6,16 @@ import os
 import sys
 import argparse
 import json
-import traceback
+import time
 
 # Add the src directory to the Python path
 root_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.insert(0, root_dir)
 
-from src.core.ctrl import AGENT_REGISTRY, execute_agent
+from src.core.ctrl import AGENT_REGISTRY, PIPELINE_WORKERS, execute_agent, run_pipeline
 
-# Define the pipeline sequence
+# Define the pipeline sequence. Agents run as soon as the agents whose output
+# they read (ctrl.AGENT_IO) have finished, so independent ones overlap.
 PIPELINE_SEQUENCE = [
     "conflict_agent",
     "insight_agent",
@@ -36,6 +37,16 @@ def main():
                         help="Override ACLED_START_DATE (YYYY-MM-DD)")
     parser.add_argument("--end_date", type=str, default=None,
                         help="Override ACLED_END_DATE (YYYY-MM-DD)")
+    parser.add_argument("--workers", type=int, default=PIPELINE_WORKERS,
+                        help="Pipeline agents run at the same time (1 runs them in order)")
+    parser.add_argument("--executor", choices=["thread", "process"], default="thread",
+                        help="Run pipeline agents in threads or in worker processes")
+    parser.add_argument("--isolate", action='store_true',
+                        help="Run a single agent in a worker process (the pipeline uses --executor process)")
+    parser.add_argument("--timeout", type=float, default=None,
+                        help="Seconds before an isolated agent is killed (default FORGENEWS_AGENT_TIMEOUT, 0 = none)")
+    parser.add_argument("--memory_mb", type=int, default=None,
+                        help="Memory ceiling for an isolated agent (default FORGENEWS_AGENT_MEMORY_MB, 0 = none)")
     args = parser.parse_args()
 
     # Inject ACLED date overrides into environment if provided
@@ -53,39 +64,38 @@ def main():
             sys.exit(1)
         print(f"--- Running single agent: {args.agent_name} ---")
         agent_func = AGENT_REGISTRY[args.agent_name]
-        result = execute_agent(agent_func, args.agent_name, run_interval, args.allow_high_risk)
+        result = execute_agent(agent_func, args.agent_name, run_interval, args.allow_high_risk,
+                               isolation="process" if args.isolate else None,
+                               timeout=args.timeout, memory_mb=args.memory_mb)
         print(json.dumps(result))
     else:
-        # Run the full pipeline sequence
-        print("--- Running full pipeline ---")
+        # Run the full pipeline as a DAG
+        print(f"--- Running full pipeline ({args.workers} {args.executor} worker(s)) ---")
+        started = time.perf_counter()
+        records = run_pipeline(PIPELINE_SEQUENCE, run_interval, args.allow_high_risk,
+                               workers=args.workers, executor=args.executor,
+                               timeout=args.timeout, memory_mb=args.memory_mb)
+        elapsed = time.perf_counter() - started
+
         pipeline_results = {}
-        for agent_name in PIPELINE_SEQUENCE:
-            print(f"--- Executing: {agent_name} ---")
-            if agent_name not in AGENT_REGISTRY:
-                print(f"Agent '{agent_name}' not found in registry. Skipping.")
+        for agent_name, record in records.items():
+            if record["status"] == "not_found":
+                print(f"Agent '{agent_name}' not found in registry. Skipped.")
                 pipeline_results[agent_name] = {"status": "not_found"}
-                continue
-            
-            agent_func = AGENT_REGISTRY[agent_name]
-            try:
-                result = execute_agent(agent_func, agent_name, run_interval, args.allow_high_risk)
-                print(f"Result for {agent_name}: {json.dumps(result)}")
-                pipeline_results[agent_name] = result
-                # Optional: Add logic here to stop pipeline if a step fails crucial output
-                # if result.get('status') != 'success': # Example check
-                #     print(f"Agent {agent_name} did not succeed. Stopping pipeline.")
-                #     break 
-            except Exception as e:
-                print(f"Error executing agent {agent_name}: {e}")
+            elif record["status"] == "exception":
+                print(f"Error executing agent {agent_name}: {record['error']}")
                 print("--- Full Traceback (from run_agent.py) ---")
-                traceback.print_exc(file=sys.stdout)
+                print(record["traceback"], end="")
                 print("--- End Traceback ---")
-                pipeline_results[agent_name] = {"status": "exception", "error": str(e)}
-                # Optional: Decide whether to stop the pipeline on exception
-                # break 
-        print("--- Pipeline finished ---")
+                pipeline_results[agent_name] = {"status": "exception", "error": record["error"]}
+            else:
+                pipeline_results[agent_name] = record["result"]
+            if "duration" in record:
+                print(f"{agent_name}: started at {record['started']:.2f}s, took {record['duration']:.2f}s")
+        busy = sum(record.get("duration", 0) for record in records.values())
+        print(f"--- Pipeline finished in {elapsed:.2f}s ({busy:.2f}s of agent time) ---")
         print("Pipeline Summary:")
-        print(json.dumps(pipeline_results, indent=2))
+        print(json.dumps(pipeline_results, indent=2, default=str))
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
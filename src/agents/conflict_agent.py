@@ -3,155 +3,419 @@
 import os
 import sys
 import requests  # type: ignore
+import itertools
 import json
-from typing import Optional, Tuple, List, Dict, Any, cast
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple, List, Dict, Any, Callable, Generator, Iterator, Union
 from datetime import date, timedelta
 from dotenv import load_dotenv  # auto-load .env
 from pathlib import Path
 
+import numpy as np
+
 # Add the parent directory to the Python path to make imports work
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
+from src.core.event_table import EventTable
 from src.core.guardrails import pii_filter
-from src.db.sqlite_writer import init_db, insert_event
+from src.core.http import get_session
+from src.db.raw_archive import ArchiveWriter, archive_path
+from src.db.sqlite_writer import ConflictEventWriter
 
 load_dotenv()
 
-def get_conflict_feed(limit: int = 5000,
-                      region: Optional[str] = None,
-                      date_range: Optional[Tuple[str, str]] = None) -> List[Dict[str, Any]]:
-    """Fetch conflict feed from ACLED, handling pagination."""
+ACLED_URL = "https://api.acleddata.com/acled/read"
+# Per-request timeout as (connect, read) seconds
+ACLED_TIMEOUT = (10, float(os.getenv("ACLED_READ_TIMEOUT", "60")))
+# Maximum number of ACLED requests in flight at once
+ACLED_MAX_CONCURRENCY = int(os.getenv("ACLED_MAX_CONCURRENCY", "4"))
+MAX_PAGES = 100  # Safety break to prevent infinite loops
+# Events per ACLED page requested by run()
+ACLED_PAGE_SIZE = int(os.getenv("ACLED_PAGE_SIZE", "5000"))
+# Most events one run() ingests; 0 keeps paging until the range is exhausted
+ACLED_MAX_EVENTS = int(os.getenv("ACLED_MAX_EVENTS", "0"))
+RAW_DIR = Path(__file__).parents[2] / "data" / "raw"
+# Days before the watermark that are re-checked for revised events
+ACLED_REVISION_DAYS = int(os.getenv("ACLED_REVISION_DAYS", "3"))
+
+# Flag bits set by flag_events; an event is flagged when any bit is set
+FLAG_FATALITIES = 1  # fatalities at or above the threshold
+FLAG_EVENT_TYPE = 2  # event_type on the watchlist
+FLAG_ACTOR = 4       # actor1 or actor2 on the watchlist
+FLAG_REGION = 8      # region on the watchlist
+FLAG_NAMES = {FLAG_FATALITIES: "fatalities", FLAG_EVENT_TYPE: "event_type",
+              FLAG_ACTOR: "actor", FLAG_REGION: "region"}
+
+def _env_list(name: str) -> List[str]:
+    return [item.strip() for item in os.getenv(name, "").split(",") if item.strip()]
+
+# Default flagging rules; watchlists match case-insensitively and are off when empty
+FLAG_RULES: Dict[str, Any] = {
+    "fatalities": int(os.getenv("FORGENEWS_FLAG_FATALITIES", "10")),
+    "event_types": _env_list("FORGENEWS_FLAG_EVENT_TYPES"),
+    "actors": _env_list("FORGENEWS_FLAG_ACTORS"),
+    "regions": _env_list("FORGENEWS_FLAG_REGIONS"),
+}
+
+def _get_session() -> requests.Session:
+    return get_session()
+
+def _date_windows(start: str, end: str) -> List[Tuple[str, str]]:
+    """Split an inclusive ISO date range into single-day windows."""
+    try:
+        first, last = date.fromisoformat(start), date.fromisoformat(end)
+    except ValueError:
+        return [(start, end)]
+    if last <= first:
+        return [(start, end)]
+    days = [(first + timedelta(days=i)).isoformat() for i in range((last - first).days + 1)]
+    return [(day, day) for day in days]
+
+def _iter_window_pages(params: Dict[str, Any], limit: int,
+                       stop: Optional[threading.Event] = None) -> Generator[List[Dict[str, Any]], None, bool]:
+    """Yield each page for one query window, stopping after ``limit`` events.
+
+    Returns True when the window was read to the end, and False when it was
+    cut short (API error, ``limit``, ``MAX_PAGES`` or ``stop``).
+    """
+    session = _get_session()
+    window = f"{params.get('start_date')}..{params.get('end_date')}"
+    remaining = limit
+    next_page_url: Optional[str] = None
+    page = 1
+    while page <= MAX_PAGES:
+        if stop is not None and stop.is_set():
+            return False
+        try:
+            if next_page_url:
+                # next_page links already carry every query parameter
+                resp = session.get(next_page_url, timeout=ACLED_TIMEOUT)
+            else:
+                page_params = dict(params, page=page) if page > 1 else params
+                resp = session.get(ACLED_URL, params=page_params, timeout=ACLED_TIMEOUT)
+            resp.raise_for_status()
+            payload = resp.json()
+        except requests.RequestException as e:
+            # Log error but keep the data fetched so far
+            print(f"ACLED API error for {window} page {page}: {e}. Returning partial data.")
+            return False
+        except ValueError as e:
+            print(f"Failed to decode ACLED JSON for {window} page {page}: {e}. Returning partial data.")
+            return False
+
+        page_data = payload.get("data", [])
+        if not isinstance(page_data, list):
+            print(f"Warning: Unexpected data format for {window} page {page}")
+            return False
+        next_page_url = payload.get("next_page")
+        full_page = len(page_data) >= int(params.get("limit", limit))
+        del payload
+        if page_data:
+            yield page_data[:remaining]
+        remaining -= len(page_data)
+        last_page = not next_page_url and not full_page
+        if remaining <= 0:
+            return remaining == 0 and last_page
+        if last_page:
+            return True  # short page: nothing left to fetch
+        page += 1
+    print(f"Warning: Reached maximum page limit ({MAX_PAGES}) for {window}. Data may be incomplete.")
+    return False
+
+def _fetch_window(params: Dict[str, Any], limit: int) -> List[Dict[str, Any]]:
+    """Fetch every page for one query window, stopping after ``limit`` events."""
+    return [event for page in _iter_window_pages(params, limit) for event in page]
+
+def _feed_queries(limit: int, region: Optional[str], date_range: Optional[Tuple[str, str]],
+                  updated_since: Optional[int]) -> List[Dict[str, Any]]:
+    """Build one ACLED query per day in the requested range."""
     api_key = os.getenv("ACLED_API_KEY")
     if not api_key:
         raise EnvironmentError("ACLED_API_KEY not set in environment")
     email = os.getenv("ACLED_EMAIL")
     if not email:
         raise EnvironmentError("ACLED_EMAIL not set in environment")
-    
-    all_data: List[Dict[str, Any]] = []
-    next_page_url: Optional[str] = "https://api.acleddata.com/acled/read"
-    
-    # Initial parameters (only for the first request)
-    params = {"key": api_key, "limit": limit, "email": email}
+
+    params: Dict[str, Any] = {"key": api_key, "limit": limit, "email": email}
     if region:
         params["region"] = region
+    if updated_since:
+        params["timestamp"] = int(updated_since)
+        params["timestamp_where"] = ">"
     # Apply date_range (start_date and end_date) for filtering
     if date_range and len(date_range) == 2:
-        params["start_date"], params["end_date"] = date_range
+        start_date, end_date = date_range
     else:
         # Default to yesterday if no date_range provided
-        yesterday = date.today() - timedelta(days=1)
-        yesterday_str = yesterday.isoformat()
-        params["start_date"] = yesterday_str
-        params["end_date"] = yesterday_str
-        
-    page_count = 0
-    max_pages = 100  # Safety break to prevent infinite loops
-    # Respect the caller provided limit for the overall number of events
-    # returned rather than using a fixed constant.
-    total_event_limit = limit
+        start_date = end_date = (date.today() - timedelta(days=1)).isoformat()
 
-    while next_page_url and page_count < max_pages:
-        page_count += 1
-        print(f"Fetching ACLED data page {page_count} from: {next_page_url}") # Log progress
-        try:
-            # --- Corrected request logic for pagination ---
-            if page_count == 1:
-                # First page: use base URL and constructed params
-                resp = requests.get(next_page_url, params=params, timeout=120)
-            else:
-                # Subsequent pages: use the full next_page_url directly (no extra params)
-                resp = requests.get(next_page_url, timeout=120)
-            # --- End correction ---
-            resp.raise_for_status()
-        except requests.RequestException as e:
-            # Log error but try to return data fetched so far
-            print(f"ACLED API error on page {page_count}: {e}. Returning partial data.")
-            break # Exit loop on error
-            
+    return [dict(params, start_date=ws, end_date=we) for ws, we in _date_windows(start_date, end_date)]
+
+def iter_conflict_pages(limit: int = 5000,
+                        region: Optional[str] = None,
+                        date_range: Optional[Tuple[str, str]] = None,
+                        updated_since: Optional[int] = None,
+                        max_events: Optional[int] = None,
+                        on_window: Optional[Callable[[str, bool], None]] = None) -> Iterator[List[Dict[str, Any]]]:
+    """Yield ACLED events one page at a time as they arrive.
+
+    Takes the same arguments as ``get_conflict_feed``. Day windows are
+    fetched by up to ``ACLED_MAX_CONCURRENCY`` workers that hand pages over
+    through a bounded queue, so at most one page per worker is held in
+    memory; pages arrive in completion order rather than date order. Closing
+    the generator early stops the workers.
+
+    Args:
+        limit: Events per ACLED page, and the most events yielded overall
+            unless ``max_events`` is given.
+        max_events: Overall cap on the events yielded; 0 means no cap.
+        on_window: Called as ``on_window(start_date, complete)`` after all
+            the pages of a day window have been yielded. ``complete`` is
+            False when the window was cut short (API error, page limit or
+            event cap). Windows that were never finished get no call.
+    """
+    queries = _feed_queries(limit, region, date_range, updated_since)
+    cap = limit if max_events is None else (max_events or sys.maxsize)
+    remaining = cap
+    if len(queries) == 1:
+        complete = yield from _iter_window_pages(queries[0], cap)
+        if on_window is not None:
+            on_window(queries[0]["start_date"], bool(complete))
+        return
+
+    workers = max(1, min(ACLED_MAX_CONCURRENCY, len(queries)))
+    pending: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+    for query in queries:
+        pending.put(query)
+    # pages, ("window", start_date, complete) markers, or None when a worker is done
+    pages: "queue.Queue[Any]" = queue.Queue(maxsize=workers)
+    stop = threading.Event()
+
+    def hand_over(item: Any) -> None:
+        while not stop.is_set():
+            try:
+                pages.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def worker() -> None:
         try:
-            payload = resp.json()
-        except requests.exceptions.JSONDecodeError as e:
-            print(f"Failed to decode JSON on page {page_count}: {e}. Response text: {resp.text[:500]}... Returning partial data.")
-            break # Exit loop on decode error
-
-        # --- DEBUG: Print raw API payload ---
-        if page_count == 1: # Only print for the first page
-            print(f"--- Raw ACLED API Payload (Page {page_count}) ---")
-            print(json.dumps(payload, indent=2))
-            print("--- End Raw Payload ---")
-        # --- End DEBUG ---
-        
-        page_data = payload.get("data", [])
-        if isinstance(page_data, list):
-            all_data.extend(page_data)
-            # --- Check total event limit ---
-            if len(all_data) >= total_event_limit:
-                 print(f"Reached total event limit of {total_event_limit}. Stopping pagination.")
-                 break # Stop fetching more pages
-            # --- End check ---
-        else:
-            print(f"Warning: Unexpected data format on page {page_count}")
+            while not stop.is_set():
+                try:
+                    query = pending.get_nowait()
+                except queue.Empty:
+                    break
+                window = _iter_window_pages(query, cap, stop)
+                while True:
+                    try:
+                        page = next(window)
+                    except StopIteration as end:
+                        hand_over(("window", query["start_date"], bool(end.value)))
+                        break
+                    hand_over(page)
+        finally:
+            hand_over(None)
 
-        # Get the next page URL from the payload
-        next_page_url = payload.get("next_page")
-        
-        # Clear params after first request as next_page_url contains them
-        if page_count == 1:
-             params = {} # Params are now baked into next_page_url
-
-    if page_count >= max_pages:
-         print(f"Warning: Reached maximum page limit ({max_pages}). Data may be incomplete.")
-
-    # --- Enforce exact limit before returning ---
-    final_data = all_data[:total_event_limit]
-    print(f"Fetched {len(all_data)} events across {page_count} pages. Returning {len(final_data)} events (limit: {total_event_limit}).")
-    # --- End enforcement ---
-    
+    pool = ThreadPoolExecutor(max_workers=workers)
+    for _ in range(workers):
+        pool.submit(worker)
+    try:
+        finished = 0
+        while finished < workers and remaining > 0:
+            page = pages.get()
+            if page is None:
+                finished += 1
+                continue
+            if isinstance(page, tuple):
+                # every page of this window has been yielded (and handled)
+                if on_window is not None:
+                    on_window(page[1], page[2])
+                continue
+            page = page[:remaining]
+            remaining -= len(page)
+            yield page
+    finally:
+        stop.set()
+        pool.shutdown(wait=False)
+
+def get_conflict_feed(limit: int = 5000,
+                      region: Optional[str] = None,
+                      date_range: Optional[Tuple[str, str]] = None,
+                      updated_since: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Fetch conflict feed from ACLED, handling pagination.
+
+    Multi-day ranges are split into per-day windows that are fetched
+    concurrently (up to ``ACLED_MAX_CONCURRENCY`` at once) over a shared
+    keep-alive session; results are returned in date order. With
+    ``updated_since`` only events added or revised after that ACLED
+    ``timestamp`` are requested.
+    """
+    queries = _feed_queries(limit, region, date_range, updated_since)
+    if len(queries) == 1:
+        results = [_fetch_window(queries[0], limit)]
+    else:
+        workers = max(1, min(ACLED_MAX_CONCURRENCY, len(queries)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(lambda q: _fetch_window(q, limit), queries))
+
+    all_data = [event for window_events in results for event in window_events]
+    # Respect the caller provided limit for the overall number of events
+    final_data = all_data[:limit]
+    print(f"Fetched {len(all_data)} events across {len(queries)} window(s). Returning {len(final_data)} events (limit: {limit}).")
     return final_data
     
 
+def _watched(table: EventTable, column: str, watchlist: List[str]) -> np.ndarray:
+    """Whether each event's ``column`` value is on the watchlist (checked once per distinct value)."""
+    if column not in table:
+        return np.zeros(len(table), dtype=bool)
+    codes, values = table.codes(column)
+    watched = {str(item).lower() for item in watchlist}
+    hits = np.array([isinstance(v, str) and v.lower() in watched for v in values] + [False])
+    if not hits.any():
+        return np.zeros(len(table), dtype=bool)
+    return hits[codes]  # code -1 (missing) picks the trailing False
+
+def flag_events(events: Union[EventTable, List[Dict[str, Any]]],
+                rules: Optional[Dict[str, Any]] = None) -> np.ndarray:
+    """Evaluate the flagging rules over a batch of events at once.
+
+    Args:
+        events: An EventTable, or event dicts (converted to one).
+        rules: Overrides for ``FLAG_RULES``: ``fatalities`` (threshold, None
+            to disable), ``event_types``, ``actors`` and ``regions``
+            (watchlists).
+
+    Returns:
+        uint8 array with the ``FLAG_*`` bits set for each event; nonzero
+        means flagged.
+    """
+    table = events if isinstance(events, EventTable) else EventTable.from_records(events)
+    rules = dict(FLAG_RULES, **(rules or {}))
+    flags = np.zeros(len(table), dtype=np.uint8)
+    if rules.get("fatalities") is not None and "fatalities" in table:
+        np.bitwise_or(flags, FLAG_FATALITIES, out=flags, where=table["fatalities"] >= rules["fatalities"])
+    if rules.get("event_types"):
+        np.bitwise_or(flags, FLAG_EVENT_TYPE, out=flags, where=_watched(table, "event_type", rules["event_types"]))
+    if rules.get("actors"):
+        actors = _watched(table, "actor1", rules["actors"]) | _watched(table, "actor2", rules["actors"])
+        np.bitwise_or(flags, FLAG_ACTOR, out=flags, where=actors)
+    if rules.get("regions"):
+        np.bitwise_or(flags, FLAG_REGION, out=flags, where=_watched(table, "region", rules["regions"]))
+    return flags
+
+def flag_names(flags: int) -> List[str]:
+    """Names of the rules behind a flag bitmask."""
+    return [name for bit, name in FLAG_NAMES.items() if flags & bit]
+
 def flag_event(event: Dict[str, Any], threshold: int = 10) -> Dict[str, Any]:
-    """Flag events where fatalities exceed a threshold."""
-    fatal_raw = event.get("fatalities", 0)
+    """Flag events where fatalities exceed a threshold (or a watchlist matches).
+
+    Single-event wrapper around ``flag_events``.
+    """
+    flags = int(flag_events([event], {"fatalities": threshold})[0])
+    return {"flagged": bool(flags), "flags": flag_names(flags), "event": event}
+
+def _fetch_window_since(watermark: Optional[Dict[str, Any]], end: date) -> Tuple[str, str]:
+    """Date range to request given the stored watermark.
+
+    Without a watermark only ``end`` is fetched. Otherwise the range starts
+    at the watermark date (so missed days are backfilled) or
+    ``ACLED_REVISION_DAYS`` before ``end``, whichever is earlier.
+    """
+    if watermark is None:
+        return end.isoformat(), end.isoformat()
+    start = end - timedelta(days=ACLED_REVISION_DAYS)
     try:
-        count = int(fatal_raw)
-    except (ValueError, TypeError):
-        count = 0
-    flagged = count >= threshold
-    return {"flagged": flagged, "event": event}
+        start = min(start, date.fromisoformat(watermark["last_event_date"]))
+    except ValueError:
+        pass
+    return start.isoformat(), end.isoformat()
+
+def _max_timestamp(events: List[Dict[str, Any]]) -> int:
+    latest = 0
+    for event in events:
+        try:
+            latest = max(latest, int(event.get("timestamp") or 0))
+        except (ValueError, TypeError):
+            continue
+    return latest
 
 def run() -> Dict[str, Any]:
-    """Entrypoint for the conflict agent, with PII sanitization."""
-    # Initialize database
-    init_db()
+    """Entrypoint for the conflict agent, with PII sanitization.
+
+    Fetches only events added or revised since the stored watermark for the
+    region, backfilling any days missed since the last run up to yesterday.
+    Pages are requested until the range is exhausted (or ``ACLED_MAX_EVENTS``
+    is reached) and merged into the day's raw archive.
+
+    Returns:
+        ``status``, ``data`` (the flagged events only, each as
+        ``{"flagged", "flags", "event"}``), ``fetched`` (events received) and
+        ``db`` (inserted/updated/ignored counts).
+    """
     # Determine region override from environment if provided
     region_override = os.getenv("ACLED_REGION")
-    
-    # Always fetch yesterday's data 
+    region_key = region_override or "all"
+
     yesterday = date.today() - timedelta(days=1)
-    yesterday_str = yesterday.isoformat()
-    # Limit parameter is handled by default in get_conflict_feed
-    events = get_conflict_feed(region=region_override, date_range=(yesterday_str, yesterday_str))
-    file_date = yesterday_str # Use yesterday for the filename as well
-    
-    # Persist events to SQLite
-    for e in events:
-        insert_event(e)
-    # Save raw JSON to data/raw/<date>_conflict.json
-    try:
-        raw_dir = Path(__file__).parents[2] / "data" / "raw"
-        raw_dir.mkdir(parents=True, exist_ok=True)
-        raw_file = raw_dir / f"conflict_{file_date}.json"
-        with raw_file.open("w", encoding="utf-8") as f:
-            json.dump(events, f, indent=2)
-    except Exception:
-        pass
-    flagged = [flag_event(e) for e in events]
-    result: Dict[str, Any] = {"status": "success", "data": flagged}
-    # Sanitize output for PII
-    filtered = pii_filter(json.dumps(result))
-    filtered_json = json.loads(filtered)
-    return cast(Dict[str, Any], filtered_json)
+    file_date = yesterday.isoformat()
 
+    fetched = 0
+    max_timestamp = 0
+    db_stats = {"inserted": 0, "updated": 0, "ignored": 0}
+    # Flagged events are kept in compact tables until the end of the run
+    flagged_tables: List[EventTable] = []
+    flagged_bits: List[np.ndarray] = []
+    raw_file = archive_path(RAW_DIR, file_date)
+    # day window start -> whether it was fetched to the end
+    completed: Dict[str, bool] = {}
+
+    # Each page is stored, archived and flagged as it arrives, so memory stays
+    # bounded by a page regardless of how many days are being backfilled.
+    with ConflictEventWriter() as writer, ArchiveWriter(raw_file, merge=True) as archive:
+        watermark = writer.get_watermark(region_key)
+        date_range = _fetch_window_since(watermark, yesterday)
+        updated_since = watermark["last_timestamp"] if watermark else None
+        for page in iter_conflict_pages(limit=ACLED_PAGE_SIZE, region=region_override,
+                                        date_range=date_range, updated_since=updated_since,
+                                        max_events=ACLED_MAX_EVENTS, on_window=completed.__setitem__):
+            fetched += len(page)
+            max_timestamp = max(max_timestamp, _max_timestamp(page))
+            # Revisions replace older rows
+            for key, count in writer.upsert_events(page).items():
+                db_stats[key] += count
+            archive.write_all(page)
+            table = EventTable.from_records(page)
+            flags = flag_events(table)
+            rows = np.flatnonzero(flags)
+            if len(rows):
+                flagged_tables.append(table.take(rows))
+                flagged_bits.append(flags[rows])
+
+        days = [start for start, _ in _date_windows(*date_range)]
+        done = list(itertools.takewhile(lambda day: completed.get(day), days))
+        if len(done) == len(days):
+            writer.set_watermark(region_key, date_range[1], max(max_timestamp, updated_since or 0))
+        elif done:
+            # Later days were cut short: move the date past the days fetched in
+            # full but keep the old timestamp, so the next run resumes there
+            writer.set_watermark(region_key, done[-1], updated_since or 0)
+            print(f"Warning: fetch incomplete after {done[-1]}; watermark for {region_key} advanced to that day.")
+        else:
+            print(f"Warning: fetch incomplete from {date_range[0]}; watermark for {region_key} not advanced.")
+    flagged_events = EventTable.concat(flagged_tables).to_records() if flagged_tables else []
+    bits = np.concatenate(flagged_bits).tolist() if flagged_bits else []
+    # Sanitize output for PII
+    flagged = json.loads(pii_filter(json.dumps([
+        {"flagged": True, "flags": flag_names(flags), "event": event}
+        for flags, event in zip(bits, flagged_events)
+    ])))
+    print(f"Stored {fetched} events in SQLite for {date_range[0]}..{date_range[1]}: {db_stats['inserted']} inserted, "
+          f"{db_stats['updated']} revised, {db_stats['ignored']} unchanged; {len(flagged)} flagged.")
 
+    result: Dict[str, Any] = {"status": "success", "data": flagged, "fetched": fetched, "db": db_stats}
+    return result
@@ -10,16 +10,27 @@ from typing import Dict, Any
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
 from src.agents.report_agent import run as report_run
-from src.agents.llm_report_agent import run as llm_run
+from src.agents.llm_report_agent import get_latest_insight_file, run as llm_run
+from src.core.ctrl import PipelineNode, run_dag
 
 def run() -> Dict[str, Any]:
-    # Generate and persist summary JSON
-    summary = report_run()
-    # Generate narrative report via LLM based on the summary
-    llm_result = llm_run()
+    # The narrative reads the latest conflict insights and only falls back to
+    # the summary without them, so with insights both steps run concurrently
+    narrative_input = "insights" if get_latest_insight_file() else "summary"
+    records = run_dag([
+        # Generate and persist summary JSON
+        PipelineNode("report_agent", report_run, outputs=["summary"]),
+        # Generate narrative report via LLM based on the summary
+        PipelineNode("llm_report_agent", llm_run, inputs=[narrative_input], outputs=["narrative_report"]),
+    ])
+    for record in records.values():
+        if record["status"] != "success":
+            raise RuntimeError(record["error"])
+    summary = records["report_agent"]["result"]
+    llm_result = records["llm_report_agent"]["result"]
     return {
         "status": llm_result.get("status", "failure"),
         "summary": summary,
         "narrative": llm_result.get("report"),
         "file": llm_result.get("file")
-    } 
\ No newline at end of file
+    } 
@@ -6,40 +6,116 @@ Extracts structured insights from ACLED conflict data.
 
 import os
 import json
+import argparse
 import pandas as pd
 from datetime import datetime
 from typing import Dict, List, Any, Optional, Tuple
 from pathlib import Path
 import logging
+import threading
 from collections import defaultdict
 import numpy as np
-import glob
-from src.scoring.scorer import score_insight, DOMAIN_KEYWORDS
-from src.sources.loader import load_registry, get_source
+from src.core import artifact_cache
+from src.scoring.scorer import score_insight, DOMAIN_KEYWORDS, flush_novelty_index
+from src.sources.ingest import ingest_sources
+from src.db.raw_archive import latest_archive, list_archives, read_archive, read_rows
+from src.enrichment.alerts import AlertTables, detect_alerts
+from src.enrichment.grid_index import CELL_DEG, cell_centers, rank_cells
+from src.enrichment.insight_state import STATE_COLUMNS, STATE_FILE, InsightState
+from src.enrichment.profiles import (actor_table, group_stats, top_counts, top_groups,
+                                     top_values, trend_label)
 
 # Set up logging
 logging.basicConfig(level=logging.INFO,
                     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Explicit dtypes for the in-memory event frame
+CATEGORY_COLUMNS = ["country", "event_type", "sub_event_type", "actor1", "actor2", "region", "admin1", "location"]
+INT32_COLUMNS = ["fatalities"]
+FLOAT32_COLUMNS = ["latitude", "longitude"]
+EVENT_DTYPES = dict(
+    [(col, "category") for col in CATEGORY_COLUMNS]
+    + [(col, "int32") for col in INT32_COLUMNS]
+    + [(col, "float32") for col in FLOAT32_COLUMNS]
+)
+
+def apply_event_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """Convert an ACLED event frame to compact dtypes in place.
+
+    Repeated strings become categoricals, fatalities int32, coordinates
+    float32 and event_date datetime64. Also fills in ``fatalities`` and
+    ``data_id`` when the source lacks them.
+    """
+    if 'fatalities' not in df.columns:
+        df['fatalities'] = 0 # Add fatalities column if missing
+    # Ensure 'data_id' exists if missing (though ACLED usually has event_id_cnty)
+    if 'data_id' not in df.columns and 'event_id_cnty' in df.columns:
+        df['data_id'] = df['event_id_cnty']
+    elif 'data_id' not in df.columns:
+        df['data_id'] = df.index # Fallback to index
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            # ACLED uses "" for a missing actor/location; treat it as missing
+            df[col] = df[col].replace("", np.nan).astype("category")
+    for col in INT32_COLUMNS:
+        if df[col].dtype != "int32":
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype("int32")
+    for col in FLOAT32_COLUMNS:
+        if col in df.columns and df[col].dtype != "float32":
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype("float32")
+    if 'event_date' in df.columns and not pd.api.types.is_datetime64_any_dtype(df['event_date']):
+        df['event_date'] = pd.to_datetime(df['event_date'], errors='coerce')
+    return df
+
+# latest: insights from the newest raw archive only
+# incremental: merge new archives into the saved InsightState, then report from it
+# full: rebuild the InsightState from every archive (to verify incremental runs)
+INSIGHT_MODES = ("latest", "incremental", "full")
+DEFAULT_MODE = os.getenv("FORGENEWS_INSIGHT_MODE", "latest")
+# densest grid cells kept in insights["map_cells"]
+MAP_CELLS = int(os.getenv("FORGENEWS_MAP_CELLS", "500"))
+# modules whose code the insights depend on (part of the artifact cache key)
+INSIGHT_CODE = ["src.agents.insight_agent", "src.db.raw_archive", "src.enrichment.alerts",
+                "src.enrichment.grid_index", "src.enrichment.insight_state", "src.enrichment.profiles"]
+
+def _value_counts(series: pd.Series, normalize: bool = False) -> pd.Series:
+    """value_counts without the zero rows categoricals add for unused categories."""
+    counts = series.value_counts(normalize=normalize)
+    return counts[counts > 0]
+
 class InsightAgent:
     """Agent for extracting insights from ACLED conflict data."""
     
     def __init__(self,
                  raw_data_dir: str = os.path.join("data", "raw"),
-                 processed_data_dir: str = os.path.join("data", "processed")):
+                 processed_data_dir: str = os.path.join("data", "processed"),
+                 save_processed: bool = False,
+                 mode: Optional[str] = None):
         """
         Initialize the InsightAgent.
         
         Args:
-            raw_data_dir: Path to the directory containing raw ACLED JSON files.
+            raw_data_dir: Path to the directory containing raw ACLED archives.
             processed_data_dir: Path to the directory where processed data will be saved.
+            save_processed: Write the typed processed frame to disk after loading.
+            mode: One of ``INSIGHT_MODES``; defaults to ``FORGENEWS_INSIGHT_MODE``
+                or "latest".
         """
+        self.mode = mode or DEFAULT_MODE
+        if self.mode not in INSIGHT_MODES:
+            raise ValueError(f"Unknown insight mode {self.mode!r}; expected one of {INSIGHT_MODES}")
         self.raw_data_dir = Path(raw_data_dir)
         self.processed_data_dir = Path(processed_data_dir)
-        self.processed_data_path = self.processed_data_dir / "acled_processed.csv"
+        self.processed_data_path = self.processed_data_dir / "acled_processed.pkl"
+        self.state_path = self.processed_data_dir / STATE_FILE
+        self.save_processed = save_processed
+        self._save_thread: Optional[threading.Thread] = None
         self.data = None
+        self.state: Optional[InsightState] = None
         self.source_raw_filename = None
+        self.insights_path: Optional[str] = None
+        self.cache_hit = False
         self.insights = {
             "metadata": {
                 "generated_at": "",
@@ -53,86 +129,66 @@ class InsightAgent:
             "event_type_summary": {},
             "actor_profiles": {},
             "hotspots": [],
+            "map_cells": [],
             "strategic_alerts": [],
             "events": []
         }
         
-    def _preprocess_raw_data(self) -> None:
-        """Find the latest raw data, preprocess, and save as CSV."""
-        try:
-            # Find the latest raw conflict JSON file
-            list_of_files = glob.glob(str(self.raw_data_dir / 'conflict_*.json'))
-            if not list_of_files:
-                logger.error(f"No raw conflict JSON files found in {self.raw_data_dir}")
-                raise FileNotFoundError(f"No raw conflict JSON files found in {self.raw_data_dir}")
+    def _read_raw_data(self) -> pd.DataFrame:
+        """Load the latest raw archive into a typed DataFrame."""
+        latest_file = latest_archive(str(self.raw_data_dir))
+        if latest_file is None:
+            logger.error(f"No raw conflict archives found in {self.raw_data_dir}")
+            raise FileNotFoundError(f"No raw conflict archives found in {self.raw_data_dir}")
 
-            latest_file = max(list_of_files, key=os.path.getctime)
-            logger.info(f"Found latest raw data file: {latest_file}")
-            self.source_raw_filename = os.path.basename(latest_file)
+        logger.info(f"Found latest raw data file: {latest_file}")
+        self.source_raw_filename = os.path.basename(latest_file)
 
-            # Load the raw JSON data
-            with open(latest_file, 'r', encoding='utf-8') as f:
-                raw_data = json.load(f)
+        df = read_archive(latest_file, dtypes=EVENT_DTYPES)
+        if df.empty:
+            logger.warning(f"No events found in {latest_file}.")
+        return apply_event_dtypes(df)
 
-            # Extract the 'event' data from each item
-            # Handle cases where the structure might be different
-            if isinstance(raw_data, list) and raw_data and isinstance(raw_data[0], dict) and 'event' in raw_data[0]:
-                 events_data = [item['event'] for item in raw_data if 'event' in item]
-            elif isinstance(raw_data, list) and raw_data and isinstance(raw_data[0], dict) and 'event_id_cnty' in raw_data[0]:
-                 # Assume it's already a list of events if 'event' key is missing but other keys exist
-                 events_data = raw_data
-            else:
-                 logger.warning(f"Unexpected raw data structure in {latest_file}. Trying direct load.")
-                 events_data = raw_data # Fallback
+    def _save_processed_async(self) -> threading.Thread:
+        """Pickle the loaded data to ``processed_data_path`` on a background thread."""
+        data = self.data
 
-            if not events_data:
-                logger.warning(f"No events found in {latest_file}. Processed CSV will be empty.")
-                df = pd.DataFrame() # Create empty DataFrame
-            else:
-                df = pd.DataFrame(events_data)
-                # Basic cleaning (ensure essential columns exist, handle potential type issues if needed)
-                if 'event_date' in df.columns:
-                    df['event_date'] = pd.to_datetime(df['event_date'], errors='coerce')
-                if 'fatalities' in df.columns:
-                    df['fatalities'] = pd.to_numeric(df['fatalities'], errors='coerce').fillna(0).astype(int)
-                else:
-                    df['fatalities'] = 0 # Add fatalities column if missing
-                # Ensure 'data_id' exists if missing (though ACLED usually has event_id_cnty)
-                if 'data_id' not in df.columns and 'event_id_cnty' in df.columns:
-                     df['data_id'] = df['event_id_cnty']
-                elif 'data_id' not in df.columns:
-                     df['data_id'] = df.index # Fallback to index
+        def save() -> None:
+            try:
+                self.processed_data_dir.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.processed_data_path.with_name(self.processed_data_path.name + ".tmp")
+                data.to_pickle(tmp_path)
+                os.replace(tmp_path, self.processed_data_path)
+                logger.info(f"Processed data saved to {self.processed_data_path}")
+            except Exception as e:
+                logger.error(f"Failed to save processed data: {e}")
 
-            # Ensure the processed directory exists
-            self.processed_data_dir.mkdir(parents=True, exist_ok=True)
+        thread = threading.Thread(target=save, name="insight-processed-save", daemon=False)
+        thread.start()
+        return thread
 
-            # Save as CSV
-            df.to_csv(self.processed_data_path, index=False)
-            logger.info(f"Preprocessed data saved to {self.processed_data_path}")
+    def load_data(self, save_processed: Optional[bool] = None) -> None:
+        """Load the events the insights are computed from.
 
-        except FileNotFoundError:
-            # Re-raise FileNotFoundError specifically
-             raise
-        except Exception as e:
-            logger.error(f"Failed during preprocessing: {e}")
-            raise RuntimeError(f"Failed during preprocessing: {e}")
+        In "latest" mode the newest raw archive is read into memory with
+        compact dtypes and aggregated into an in-memory ``InsightState``.
+        The other modes update the persisted state instead (see
+        ``update_state``).
 
-    def load_data(self) -> None:
-        """Preprocess raw data if needed and load the processed ACLED data."""
+        Args:
+            save_processed: Also write the processed frame to
+                ``processed_data_path`` (pickle) in the background. Defaults
+                to the ``save_processed`` value given to the constructor.
+                Only used in "latest" mode.
+        """
         try:
-            # Preprocess raw data first
-            self._preprocess_raw_data()
-
-            # Now load the processed CSV
-            self.data = pd.read_csv(self.processed_data_path)
-            # Convert event_date to datetime objects after loading
-            if 'event_date' in self.data.columns:
-                 self.data['event_date'] = pd.to_datetime(self.data['event_date'], errors='coerce')
-            else:
-                 logger.warning("Column 'event_date' not found in processed CSV.")
-
-            logger.info(f"Loaded {len(self.data)} events from {self.processed_data_path}")
-
+            if self.mode != "latest":
+                self.update_state(rebuild=self.mode == "full")
+                return
+            self.data = self._read_raw_data()
+            logger.info(f"Loaded {len(self.data)} events from {self.source_raw_filename}")
+            self.state = InsightState()
+            self.state.merge([(str(self.raw_data_dir / self.source_raw_filename), self.data)])
         except FileNotFoundError:
              logger.error(f"Preprocessing failed: Raw data file not found.")
              # Decide how to handle this: raise error, or proceed with empty data?
@@ -141,22 +197,81 @@ class InsightAgent:
         except Exception as e:
             logger.error(f"Failed to load or preprocess data: {e}")
             raise
+
+        if self.save_processed if save_processed is None else save_processed:
+            self._save_thread = self._save_processed_async()
+
+    def wait_for_save(self, timeout: Optional[float] = None) -> None:
+        """Block until a background save started by ``load_data`` has finished."""
+        if self._save_thread is not None:
+            self._save_thread.join(timeout)
+
+    def update_state(self, rebuild: bool = False) -> int:
+        """Merge raw archives not seen yet into the persisted ``InsightState``.
+
+        Args:
+            rebuild: Discard the saved state and rebuild it from every archive.
+
+        Returns:
+            Number of events merged.
+        """
+        archives = [path for _, path in list_archives(str(self.raw_data_dir))]
+        if not archives:
+            logger.error(f"No raw conflict archives found in {self.raw_data_dir}")
+            raise FileNotFoundError(f"No raw conflict archives found in {self.raw_data_dir}")
+
+        state = InsightState() if rebuild else InsightState.load(self.state_path)
+        pending = state.pending(archives)
+        merged = 0
+        if pending:
+            batches = [(path, read_archive(path, columns=STATE_COLUMNS, dtypes=EVENT_DTYPES))
+                       for path in pending]
+            merged = state.merge(batches)
+            state.save(self.state_path)
+        logger.info(f"Insight state holds {len(state)} events; merged {merged} from {len(pending)} archive(s)")
+        self.state = state
+        self.source_raw_filename = state.source_file
+        return merged
+
+    def _event_rows(self, ledger_rows: pd.DataFrame) -> pd.DataFrame:
+        """Full raw events for rows of the state ledger, in the same order."""
+        if self.data is not None:
+            return self.data.iloc[ledger_rows['_row'].to_numpy()]
+        parts = []
+        order = np.empty(len(ledger_rows), dtype=np.int64)
+        position = 0
+        files = ledger_rows['_file'].astype(str).to_numpy()
+        for name in dict.fromkeys(files):
+            selected = np.flatnonzero(files == name)
+            path = self.raw_data_dir / name
+            if not path.exists():
+                logger.warning(f"Raw archive {path} is gone; skipping {len(selected)} sample events")
+                order[selected] = -1
+                continue
+            parts.append(apply_event_dtypes(read_rows(str(path), ledger_rows['_row'].to_numpy()[selected],
+                                                      dtypes=EVENT_DTYPES)))
+            order[selected] = np.arange(position, position + len(selected))
+            position += len(selected)
+        if not parts:
+            return pd.DataFrame()
+        events = pd.concat(parts, ignore_index=True)
+        return events.iloc[order[order >= 0]]
             
     def extract_metadata(self) -> None:
         """Extract metadata from the dataset."""
-        if self.data is None:
+        if self.state is None:
             logger.error("No data loaded. Call load_data() first.")
             return
-            
-        # Get date range
-        self.data['event_date'] = pd.to_datetime(self.data['event_date'])
-        min_date = self.data['event_date'].min()
-        max_date = self.data['event_date'].max()
+        
+        # Daily totals from the aggregate state
+        events = self.state.events
+        min_date = events['event_date'].min()
+        max_date = events['event_date'].max()
         
         # Calculate basic stats
-        total_events = len(self.data)
-        total_fatalities = self.data['fatalities'].sum()
-        countries = sorted(self.data['country'].unique().tolist())
+        total_events = int(events['n'].sum())
+        total_fatalities = events['fatalities'].sum()
+        countries = sorted(events['country'].dropna().unique().tolist())
         
         # Update metadata
         self.insights["metadata"] = {
@@ -172,80 +287,35 @@ class InsightAgent:
     
     def extract_country_profiles(self) -> None:
         """Extract country-level insights."""
-        if self.data is None:
+        if self.state is None:
             logger.error("No data loaded. Call load_data() first.")
             return
             
-        country_profiles = {}
-        
-        # Group by country
-        country_groups = self.data.groupby('country')
+        events, actors = self.state.events, self.state.actors
+        stats = group_stats(events, 'country', weight='n')
+        event_types = top_counts(events, 'country', 'event_type', weight='n')
+        actor1_counts = top_counts(actors, 'country', 'actor1', 5, weight='n')
+        actor2_counts = top_counts(actors, 'country', 'actor2', 5, weight='n')
+        locations = top_groups(events, 'country', 'location', 5, weight='n')
         
-        for country, group in country_groups:
-            # Calculate event counts by type
-            event_type_counts = group['event_type'].value_counts().to_dict()
-            
-            # Calculate fatalities
-            total_fatalities = int(group['fatalities'].sum())
-            fatality_rate = float(total_fatalities / len(group)) if len(group) > 0 else 0
-            
-            # Identify top actors in this country
-            actor1_counts = group['actor1'].value_counts().head(5).to_dict()
-            actor2_counts = group['actor2'].value_counts().head(5).to_dict()
-            
-            # Find top locations
-            location_counts = group.groupby('location').agg({
-                'data_id': 'count',
-                'fatalities': 'sum'
-            }).sort_values('data_id', ascending=False).head(5)
-            
-            top_locations = []
-            for location, data in location_counts.iterrows():
-                top_locations.append({
-                    "location": location,
-                    "count": int(data['data_id']),
-                    "fatalities": int(data['fatalities'])
-                })
-            
-            # Calculate trend (events in the most recent 1/4 of the date range vs the first 1/4)
-            date_range = group['event_date'].max() - group['event_date'].min()
-            quarter_range = date_range / 4
-            
-            if not pd.isna(date_range):
-                recent_cutoff = group['event_date'].max() - quarter_range
-                early_cutoff = group['event_date'].min() + quarter_range
-                
-                recent_events = len(group[group['event_date'] >= recent_cutoff])
-                early_events = len(group[group['event_date'] <= early_cutoff])
-                
-                if early_events > 0:
-                    trend_factor = (recent_events - early_events) / early_events
-                else:
-                    trend_factor = 1 if recent_events > 0 else 0
-            else:
-                trend_factor = 0
-                
-            # Trend description
-            if trend_factor > 0.1:
-                trend = "increasing"
-            elif trend_factor < -0.1:
-                trend = "decreasing"
-            else:
-                trend = "stable"
-            
-            # Store country profile
+        country_profiles = {}
+        for country, row in zip(stats.index, stats.itertuples(index=False)):
+            top_locations = [
+                {"location": location, "count": count, "fatalities": fatalities}
+                for location, count, fatalities in locations.get(country, [])
+            ]
             country_profiles[country] = {
-                "events": len(group),
-                "fatalities": total_fatalities,
-                "fatality_rate": round(fatality_rate, 2),
-                "event_types": event_type_counts,
+                "events": int(row.events),
+                "fatalities": int(row.fatalities),
+                "fatality_rate": round(float(row.fatality_rate), 2),
+                "event_types": event_types.get(country, {}),
                 "top_actors": {
-                    "actor1": actor1_counts,
-                    "actor2": actor2_counts
+                    "actor1": actor1_counts.get(country, {}),
+                    "actor2": actor2_counts.get(country, {})
                 },
                 "top_locations": top_locations,
-                "trend": trend,
-                "trend_factor": round(trend_factor, 2)
+                "trend": trend_label(row.trend_factor),
+                "trend_factor": round(float(row.trend_factor), 2)
             }
         
         self.insights["country_profiles"] = country_profiles
@@ -253,58 +323,23 @@ class InsightAgent:
     
     def extract_event_type_summary(self) -> None:
         """Extract insights by event type."""
-        if self.data is None:
+        if self.state is None:
             logger.error("No data loaded. Call load_data() first.")
             return
         
-        event_type_summary = {}
-        
-        # Group by event type
-        event_type_groups = self.data.groupby('event_type')
+        events = self.state.events
+        stats = group_stats(events, 'event_type', weight='n')
+        country_counts = top_counts(events, 'event_type', 'country', 5, weight='n')
         
-        for event_type, group in event_type_groups:
-            # Calculate basic stats
-            events_count = len(group)
-            fatalities = int(group['fatalities'].sum())
-            fatality_rate = float(fatalities / events_count) if events_count > 0 else 0
-            
-            # Calculate trend
-            date_range = group['event_date'].max() - group['event_date'].min()
-            quarter_range = date_range / 4
-            
-            if not pd.isna(date_range):
-                recent_cutoff = group['event_date'].max() - quarter_range
-                early_cutoff = group['event_date'].min() + quarter_range
-                
-                recent_events = len(group[group['event_date'] >= recent_cutoff])
-                early_events = len(group[group['event_date'] <= early_cutoff])
-                
-                if early_events > 0:
-                    trend_factor = (recent_events - early_events) / early_events
-                else:
-                    trend_factor = 1 if recent_events > 0 else 0
-            else:
-                trend_factor = 0
-                
-            # Trend description
-            if trend_factor > 0.1:
-                trend = "increasing"
-            elif trend_factor < -0.1:
-                trend = "decreasing"
-            else:
-                trend = "stable"
-            
-            # Top countries for this event type
-            country_counts = group['country'].value_counts().head(5).to_dict()
-            
-            # Store event type profile
+        event_type_summary = {}
+        for event_type, row in zip(stats.index, stats.itertuples(index=False)):
             event_type_summary[event_type] = {
-                "count": events_count,
-                "fatalities": fatalities,
-                "fatality_rate": round(fatality_rate, 2),
-                "trend": trend,
-                "trend_factor": round(trend_factor, 2),
-                "top_countries": country_counts
+                "count": int(row.events),
+                "fatalities": int(row.fatalities),
+                "fatality_rate": round(float(row.fatality_rate), 2),
+                "trend": trend_label(row.trend_factor),
+                "trend_factor": round(float(row.trend_factor), 2),
+                "top_countries": country_counts.get(event_type, {})
             }
         
         self.insights["event_type_summary"] = event_type_summary
@@ -312,124 +347,88 @@ class InsightAgent:
     
     def extract_actor_profiles(self) -> None:
         """Extract insights about key actors."""
-        if self.data is None:
+        if self.state is None:
             logger.error("No data loaded. Call load_data() first.")
             return
         
-        actor_profiles = {}
-        
-        # Process both actor1 and actor2
+        # The 20 most active actors on each side; the side an actor was found
+        # on decides which column its interactions come from
+        pairs = self.state.actors
+        candidates = {}
         for actor_col in ['actor1', 'actor2']:
-            # Get top actors by event count
-            top_actors = self.data[actor_col].value_counts().head(20).index.tolist()
+            for actor in top_values(pairs[actor_col], 20, weights=pairs['n']):
+                candidates.setdefault(actor, 'actor2' if actor_col == 'actor1' else 'actor1')
+        
+        # One row per (day, pair, actor) for pairs naming any candidate
+        actors = actor_table(pairs, candidates,
+                             keep=['country', 'event_type', 'fatalities', 'event_date', 'n'])
+        stats = group_stats(actors, 'actor', weight='n')
+        countries = top_counts(actors, 'actor', 'country', 5, weight='n')
+        event_types = top_counts(actors, 'actor', 'event_type', 5, weight='n')
+        interactions = {col: top_counts(actors, 'actor', col, 5, weight='n') for col in ['actor1', 'actor2']}
+        
+        actor_profiles = {}
+        for actor, other_col in candidates.items():
+            row = stats.loc[actor]
+            if row['events'] < 5:  # Only process significant actors
+                continue
             
-            for actor in top_actors:
-                # Skip if empty or already processed
-                if pd.isna(actor) or actor == '' or actor in actor_profiles:
-                    continue
-                
-                # Get events where this actor appears in either actor column
-                actor_events = self.data[(self.data['actor1'] == actor) | (self.data['actor2'] == actor)]
-                
-                if len(actor_events) < 5:  # Only process significant actors
-                    continue
-                
-                # Calculate basic stats
-                events_count = len(actor_events)
-                fatalities = int(actor_events['fatalities'].sum())
-                fatality_rate = float(fatalities / events_count) if events_count > 0 else 0
-                
-                # Get countries where active
-                countries = actor_events['country'].value_counts().head(5).to_dict()
-                
-                # Get event types
-                event_types = actor_events['event_type'].value_counts().head(5).to_dict()
-                
-                # Calculate trend
-                date_range = actor_events['event_date'].max() - actor_events['event_date'].min()
-                quarter_range = date_range / 4
-                
-                if not pd.isna(date_range):
-                    recent_cutoff = actor_events['event_date'].max() - quarter_range
-                    early_cutoff = actor_events['event_date'].min() + quarter_range
-                    
-                    recent_events = len(actor_events[actor_events['event_date'] >= recent_cutoff])
-                    early_events = len(actor_events[actor_events['event_date'] <= early_cutoff])
-                    
-                    if early_events > 0:
-                        trend_factor = (recent_events - early_events) / early_events
-                    else:
-                        trend_factor = 1 if recent_events > 0 else 0
-                else:
-                    trend_factor = 0
-                    
-                # Trend description
-                if trend_factor > 0.1:
-                    trend = "increasing"
-                elif trend_factor < -0.1:
-                    trend = "decreasing"
-                else:
-                    trend = "stable"
-                
-                # Get interactions with other actors
-                if actor_col == 'actor1':
-                    interactions = actor_events['actor2'].value_counts().head(5).to_dict()
-                else:
-                    interactions = actor_events['actor1'].value_counts().head(5).to_dict()
-                
-                # Store actor profile
-                actor_profiles[actor] = {
-                    "events": events_count,
-                    "fatalities": fatalities,
-                    "fatality_rate": round(fatality_rate, 2),
-                    "countries": countries,
-                    "event_types": event_types,
-                    "trend": trend,
-                    "trend_factor": round(trend_factor, 2),
-                    "interactions": interactions
-                }
+            actor_profiles[actor] = {
+                "events": int(row['events']),
+                "fatalities": int(row['fatalities']),
+                "fatality_rate": round(float(row['fatality_rate']), 2),
+                "countries": countries.get(actor, {}),
+                "event_types": event_types.get(actor, {}),
+                "trend": trend_label(row['trend_factor']),
+                "trend_factor": round(float(row['trend_factor']), 2),
+                "interactions": interactions[other_col].get(actor, {})
+            }
         
         self.insights["actor_profiles"] = actor_profiles
         logger.info(f"Extracted profiles for {len(actor_profiles)} actors")
     
     def identify_hotspots(self) -> None:
-        """Identify conflict hotspots based on event concentration and fatalities."""
-        if self.data is None:
+        """Identify conflict hotspots based on event concentration and fatalities.
+
+        Hotspots are spatial grid cells (``src.enrichment.grid_index``): events
+        are counted per cell rather than per location name, so nearby spellings
+        of one place add up and a hotspot's coordinates are its cell center.
+        Each hotspot is labelled with its busiest (country, location).
+        """
+        if self.state is None:
             logger.error("No data loaded. Call load_data() first.")
             return
         
-        # Group by location and country
-        location_data = self.data.groupby(['country', 'location']).agg({
-            'data_id': 'count',
-            'fatalities': 'sum',
-            'latitude': 'first',
-            'longitude': 'first',
-            'event_date': ['min', 'max']
-        })
+        # Group the daily totals by grid cell (events without coordinates have cell -1)
+        events = self.state.events
+        events = events[events['cell'] >= 0]
+        cell_data = events.groupby('cell').agg(
+            count=('n', 'sum'),
+            fatalities=('fatalities', 'sum'),
+            first_event=('event_date', 'min'),
+            last_event=('event_date', 'max')
+        ).reset_index()
         
-        location_data.columns = ['count', 'fatalities', 'latitude', 'longitude', 'first_event', 'last_event']
-        
-        # Reset index for easier processing
-        location_data = location_data.reset_index()
-        
-        # Filter to locations with at least 5 events or significant fatalities
-        significant_locations = location_data[(location_data['count'] >= 5) | (location_data['fatalities'] >= 10)]
+        # Filter to cells with at least 5 events or significant fatalities
+        significant_cells = cell_data[(cell_data['count'] >= 5) | (cell_data['fatalities'] >= 10)]
         
         # Sort by a combined score of event count and fatalities
-        significant_locations['hotspot_score'] = (
-            significant_locations['count'] / significant_locations['count'].max() +
-            significant_locations['fatalities'] / significant_locations['fatalities'].max()
-        )
+        significant_cells = significant_cells.assign(hotspot_score=(
+            significant_cells['count'] / significant_cells['count'].max() +
+            significant_cells['fatalities'] / significant_cells['fatalities'].max()
+        ))
+        top_cells = significant_cells.sort_values('hotspot_score', ascending=False, kind='stable').head(20)
+        latitudes, longitudes = cell_centers(top_cells['cell'].to_numpy(), self.state.cell_deg)
         
         hotspots = []
-        for _, row in significant_locations.sort_values('hotspot_score', ascending=False).head(20).iterrows():
-            # Get event types for this location
-            location_events = self.data[
-                (self.data['country'] == row['country']) & 
-                (self.data['location'] == row['location'])
-            ]
+        for (_, row), latitude, longitude in zip(top_cells.iterrows(), latitudes, longitudes):
+            # Daily totals for this cell
+            cell_days = events[events['cell'] == row['cell']]
             
-            event_types = location_events['event_type'].value_counts().head(3).to_dict()
+            places = cell_days.groupby(['country', 'location'], observed=True)['n'].sum().sort_index()
+            country, location = places.sort_values(ascending=False, kind='stable').index[0]
+            type_counts = cell_days.groupby('event_type', observed=True)['n'].sum().sort_index()
+            event_types = type_counts.sort_values(ascending=False, kind='stable').head(3).to_dict()
             
             # Get recent activity trend
             date_range = row['last_event'] - row['first_event']
@@ -438,7 +437,7 @@ class InsightAgent:
             if not pd.isna(date_range):
                 recent_cutoff = row['last_event'] - quarter_range
                 
-                recent_events = len(location_events[location_events['event_date'] >= recent_cutoff])
+                recent_events = cell_days.loc[cell_days['event_date'] >= recent_cutoff, 'n'].sum()
                 recent_ratio = recent_events / row['count'] if row['count'] > 0 else 0
                 
                 if recent_ratio > 0.4:
@@ -451,13 +450,14 @@ class InsightAgent:
                 trend = "unknown"
             
             hotspots.append({
-                "country": row['country'],
-                "location": row['location'],
+                "cell": int(row['cell']),
+                "country": country,
+                "location": location,
                 "count": int(row['count']),
                 "fatalities": int(row['fatalities']),
-                "latitude": float(row['latitude']) if not pd.isna(row['latitude']) else None,
-                "longitude": float(row['longitude']) if not pd.isna(row['longitude']) else None,
-                "event_types": event_types,
+                "latitude": round(float(latitude), 6),
+                "longitude": round(float(longitude), 6),
+                "event_types": {event_type: int(count) for event_type, count in event_types.items()},
                 "trend": trend,
                 "first_event": row['first_event'].strftime("%Y-%m-%d"),
                 "last_event": row['last_event'].strftime("%Y-%m-%d"),
@@ -467,215 +467,84 @@ class InsightAgent:
         self.insights["hotspots"] = hotspots
         logger.info(f"Identified {len(hotspots)} conflict hotspots")
     
+    def extract_map_cells(self, limit: Optional[int] = MAP_CELLS) -> None:
+        """Bin events into grid cells for the maps.
+        
+        Map renderers draw these pre-binned cells (center, event count,
+        fatalities and counts per event type) instead of raw event points.
+        
+        Args:
+            limit: Number of cells to keep, densest first (None keeps all)
+        """
+        if self.state is None:
+            logger.error("No data loaded. Call load_data() first.")
+            return
+        
+        events = self.state.events
+        events = events[events['cell'] >= 0]
+        ranked = rank_cells(events['cell'].to_numpy(), events['n'].to_numpy(), limit, self.state.cell_deg)
+        fatalities = events.groupby('cell')['fatalities'].sum()
+        event_types = (events[events['cell'].isin(ranked['cell'])]
+                       .groupby(['cell', 'event_type'], observed=True)['n'].sum())
+        
+        map_cells = []
+        for row in ranked.itertuples(index=False):
+            type_counts = event_types.loc[row.cell].sort_index()
+            map_cells.append({
+                "cell": int(row.cell),
+                "latitude": round(float(row.latitude), 6),
+                "longitude": round(float(row.longitude), 6),
+                "count": int(row.count),
+                "fatalities": int(fatalities[row.cell]),
+                "event_types": {event_type: int(count) for event_type, count
+                                in type_counts.sort_values(ascending=False, kind='stable').items()}
+            })
+        
+        self.insights["map_cells"] = map_cells
+        logger.info(f"Binned events into {len(map_cells)} map cells")
+    
     def identify_strategic_alerts(self) -> None:
         """
         Identify strategic alerts and emerging patterns in the conflict data.
         Alerts are based on emerging hotspots, significant trends, and unusual patterns.
+        The detectors live in ``src.enrichment.alerts``.
         """
-        if self.data is None:
+        if self.state is None:
             logger.error("No data loaded. Call load_data() first.")
             return
         
-        alerts = []
-        
-        # 1. Look for emerging hotspots - locations with rapid increase in events
-        recent_cutoff = self.data['event_date'].max() - pd.Timedelta(days=30)
-        
-        # Get locations with at least 3 events in the last 30 days
-        recent_locations = self.data[self.data['event_date'] >= recent_cutoff].groupby(
-            ['country', 'location']
-        ).size().reset_index(name='recent_count')
-        
-        recent_locations = recent_locations[recent_locations['recent_count'] >= 3]
-        
-        for _, row in recent_locations.iterrows():
-            # Check if this is a new or escalating hotspot
-            all_events_at_location = self.data[
-                (self.data['country'] == row['country']) & 
-                (self.data['location'] == row['location'])
-            ]
-            
-            total_events = len(all_events_at_location)
-            recent_ratio = row['recent_count'] / total_events
-            
-            # If most events are recent, it's an emerging hotspot
-            if recent_ratio > 0.7 and total_events >= 5:
-                # Get event types for context
-                event_types = all_events_at_location['event_type'].value_counts().head(2).to_dict()
-                event_type_str = ", ".join(event_types.keys())
-                
-                # Get fatalities
-                fatalities = int(all_events_at_location['fatalities'].sum())
-                
-                alerts.append({
-                    "type": "Emerging Hotspot",
-                    "severity": "High" if fatalities > 10 else "Medium",
-                    "location": {
-                        "country": row['country'],
-                        "location": row['location']
-                    },
-                    "description": f"Rapid escalation of conflict in {row['location']}, {row['country']} with {row['recent_count']} recent events ({event_type_str})."
-                })
-        
-        # 2. Look for unusual spikes in fatalities
-        country_recent_fatalities = self.data[self.data['event_date'] >= recent_cutoff].groupby(
-            'country'
-        )['fatalities'].sum().reset_index()
-        
-        for _, row in country_recent_fatalities.iterrows():
-            # Compare to historical averages
-            country_data = self.data[self.data['country'] == row['country']]
-            
-            # Skip if not enough data
-            if len(country_data) < 10:
-                continue
-                
-            # Calculate average fatalities per month historically
-            date_range_days = (country_data['event_date'].max() - country_data['event_date'].min()).days
-            if date_range_days <= 0:
-                continue
-                
-            months = date_range_days / 30
-            historical_monthly_avg = country_data['fatalities'].sum() / months
-            
-            # Recent is for last ~1 month
-            recent_monthly = row['fatalities']
-            
-            # If recent fatalities are significantly higher than historical average
-            if recent_monthly > 0 and (recent_monthly / historical_monthly_avg) > 2:
-                alerts.append({
-                    "type": "Fatality Spike",
-                    "severity": "High" if recent_monthly > 50 else "Medium",
-                    "location": {
-                        "country": row['country']
-                    },
-                    "description": f"Significant increase in fatalities in {row['country']} with {int(recent_monthly)} fatalities in the last 30 days, compared to historical average of {int(historical_monthly_avg)} per month."
-                })
-        
-        # 3. Look for new conflict actors
-        recent_actors = set()
-        for col in ['actor1', 'actor2']:
-            recent_actors.update(self.data[self.data['event_date'] >= recent_cutoff][col].unique())
-        
-        older_cutoff = recent_cutoff - pd.Timedelta(days=60)
-        older_actors = set()
-        for col in ['actor1', 'actor2']:
-            older_actors.update(self.data[
-                (self.data['event_date'] < recent_cutoff) & 
-                (self.data['event_date'] >= older_cutoff)
-            ][col].unique())
-        
-        historical_actors = set()
-        for col in ['actor1', 'actor2']:
-            historical_actors.update(self.data[self.data['event_date'] < older_cutoff][col].unique())
-        
-        # New actors are those in recent_actors but not in historical_actors
-        new_actors = recent_actors - historical_actors
-        new_actors = {actor for actor in new_actors if actor and not pd.isna(actor) and len(str(actor)) > 3}
-        
-        for actor in new_actors:
-            # Get context about this new actor
-            actor_events = self.data[(self.data['actor1'] == actor) | (self.data['actor2'] == actor)]
-            
-            if len(actor_events) < 3:
-                continue
-                
-            countries = actor_events['country'].value_counts().head(2).index.tolist()
-            countries_str = ", ".join(countries)
-            
-            event_types = actor_events['event_type'].value_counts().head(2).index.tolist()
-            event_types_str = ", ".join(event_types)
-            
-            fatalities = int(actor_events['fatalities'].sum())
-            
-            alerts.append({
-                "type": "New Actor",
-                "severity": "High" if fatalities > 20 else "Medium",
-                "location": {
-                    "countries": countries
-                },
-                "description": f"Emergence of new conflict actor: {actor} in {countries_str}. Associated with {event_types_str} events and {fatalities} fatalities."
-            })
-        
-        # 4. Look for changes in conflict dynamics (e.g., shift from protests to violence)
-        for country in self.data['country'].unique():
-            country_data = self.data[self.data['country'] == country]
-            
-            if len(country_data) < 10:
-                continue
-                
-            # Analyze event type distribution over time
-            recent_events = country_data[country_data['event_date'] >= recent_cutoff]
-            historical_events = country_data[country_data['event_date'] < recent_cutoff]
-            
-            if len(recent_events) < 5 or len(historical_events) < 5:
-                continue
-                
-            # Compare event type distributions
-            recent_types = recent_events['event_type'].value_counts(normalize=True)
-            historical_types = historical_events['event_type'].value_counts(normalize=True)
-            
-            for event_type in recent_types.index:
-                if event_type in historical_types:
-                    change = recent_types[event_type] - historical_types[event_type]
-                    
-                    # If there's a significant increase in this event type
-                    if change > 0.2:  # 20% shift in distribution
-                        alerts.append({
-                            "type": "Conflict Dynamic Shift",
-                            "severity": "Medium",
-                            "location": {
-                                "country": country
-                            },
-                            "description": f"Significant shift toward {event_type} events in {country}. This event type now represents {int(recent_types[event_type]*100)}% of recent events, up from {int(historical_types[event_type]*100)}% historically."
-                        })
-                elif recent_types[event_type] > 0.25:  # If a new event type represents >25% of recent events
-                    alerts.append({
-                        "type": "New Conflict Dynamic",
-                        "severity": "High",
-                        "location": {
-                            "country": country
-                        },
-                        "description": f"Emergence of {event_type} as a significant new conflict dynamic in {country}, representing {int(recent_types[event_type]*100)}% of recent events."
-                    })
-        
-        # Sort alerts by severity
-        severity_order = {"High": 0, "Medium": 1, "Low": 2}
-        alerts = sorted(alerts, key=lambda x: severity_order.get(x["severity"], 3))
+        tables = AlertTables(self.state.events, actors=self.state.actors, weight='n')
+        alerts = detect_alerts(tables)
         
         self.insights["strategic_alerts"] = alerts
         logger.info(f"Identified {len(alerts)} strategic alerts")
     
     def extract_event_samples(self) -> None:
         """Extract sample events to include with the insights."""
-        if self.data is None:
+        if self.state is None:
             logger.error("No data loaded. Call load_data() first.")
             return
         
+        # Pick events from the ledger, then read just those from the raw data
+        ledger = self.state.ledger
+        
         # Extract the last 30 days of significant events (with fatalities)
-        recent_cutoff = self.data['event_date'].max() - pd.Timedelta(days=30)
-        significant_events = self.data[
-            (self.data['event_date'] >= recent_cutoff) & 
-            (self.data['fatalities'] > 0)
-        ].sort_values('fatalities', ascending=False).head(100)
+        recent_cutoff = ledger['event_date'].max() - pd.Timedelta(days=30)
+        significant_events = ledger[
+            (ledger['event_date'] >= recent_cutoff) & 
+            (ledger['fatalities'] > 0)
+        ].sort_values('fatalities', ascending=False, kind='stable').head(100)
         
         # Also grab some events from each identified hotspot
         hotspot_events = []
         for hotspot in self.insights.get("hotspots", []):
-            events = self.data[
-                (self.data['country'] == hotspot['country']) & 
-                (self.data['location'] == hotspot['location'])
-            ].sort_values('event_date', ascending=False).head(5)
+            events = ledger[ledger['cell'] == hotspot['cell']].sort_values('event_date', ascending=False, kind='stable').head(5)
             
             hotspot_events.append(events)
         
-        if hotspot_events:
-            hotspot_events = pd.concat(hotspot_events)
-        else:
-            hotspot_events = pd.DataFrame()
-        
         # Combine and deduplicate events
-        selected_events = pd.concat([significant_events, hotspot_events]).drop_duplicates(subset=['data_id'])
+        selected = pd.concat([significant_events, *hotspot_events])
+        selected_events = self._event_rows(selected[~selected.index.duplicated()])
         
         # Convert to list of dictionaries
         events_list = []
@@ -690,22 +559,49 @@ class InsightAgent:
             for key, value in event_dict.items():
                 if pd.isna(value):
                     event_dict[key] = None
-                elif isinstance(value, (np.int64, np.float64)):
-                    event_dict[key] = float(value) if key in ['latitude', 'longitude'] else int(value)
+                elif key in ['latitude', 'longitude']:
+                    # float32 storage: round away the widening noise
+                    event_dict[key] = round(float(value), 6)
+                elif isinstance(value, (np.integer, np.floating)):
+                    event_dict[key] = int(value)
             
             events_list.append(event_dict)
         
         self.insights["events"] = events_list
         logger.info(f"Extracted {len(events_list)} sample events")
     
+    def cache_key(self) -> str:
+        """``artifact_cache`` key of this run: the archives it reads, settings and code."""
+        if self.mode == "latest":
+            latest = latest_archive(str(self.raw_data_dir))
+            inputs = [latest] if latest else []
+        else:
+            inputs = [path for _, path in list_archives(str(self.raw_data_dir))]
+        config = {"mode": self.mode, "map_cells": MAP_CELLS, "cell_deg": CELL_DEG}
+        return artifact_cache.stage_key("insights", inputs, config, INSIGHT_CODE)
+
     def run(self) -> Dict[str, Any]:
         """
         Run the complete insight extraction pipeline and return structured insights.
+
+        When the raw archives, settings and code are unchanged since an
+        earlier run, the insights file that run wrote is loaded instead
+        ("full" mode always recomputes).
         
         Returns:
             Dict containing all structured insights
         """
         try:
+            key = self.cache_key()
+            cached = artifact_cache.lookup("insights", key) if self.mode != "full" else None
+            if cached is not None:
+                self.insights_path = cached["outputs"]["insights"]["path"]
+                with open(self.insights_path, 'r', encoding='utf-8') as f:
+                    self.insights = json.load(f)
+                self.cache_hit = True
+                logger.info(f"Raw data unchanged; reusing insights from {self.insights_path}")
+                return self.insights
+
             # Load data
             self.load_data()
             
@@ -715,11 +611,13 @@ class InsightAgent:
             self.extract_event_type_summary()
             self.extract_actor_profiles()
             self.identify_hotspots()
+            self.extract_map_cells()
             self.identify_strategic_alerts()
             self.extract_event_samples()
             
             # Save insights to file
-            self.save_insights()
+            self.insights_path = self.save_insights()
+            artifact_cache.store("insights", key, {"insights": self.insights_path})
             
             return self.insights
         except Exception as e:
@@ -757,19 +655,12 @@ def run() -> Dict[str, Any]:
     Returns:
         Dict containing all structured insights
     """
-    all_insights = []
-    source_registry = load_registry()
+    # fetch every registry source concurrently, then normalize in order
+    ingested = ingest_sources()
+    all_insights = ingested["insights"]
     
-    # gather raw events from loader
-    for dom in ["conflict","ai","markets"]:
-        for src_meta in source_registry[dom]:
-            mod = get_source(dom, src_meta["id"])
-            try:
-                raw = mod.normalize(mod.fetch())
-                all_insights.extend(raw)
-                logger.info(f"Collected {len(raw)} insights from {dom}/{src_meta['id']}")
-            except Exception as e:
-                logger.error(f"Error processing {dom}/{src_meta['id']}: {e}")
+    # Write the novelty memory once for the whole run
+    flush_novelty_index()
     
     # persist scored insights json -> data/processed/insights_<date>.json
     output_dir = os.path.join("data", "processed", "insights")
@@ -784,8 +675,13 @@ def run() -> Dict[str, Any]:
         json.dump(all_insights, f, indent=2, ensure_ascii=False)
     
     logger.info(f"Saved {len(all_insights)} insights to {filepath}")
-    return {"insights": all_insights, "filepath": filepath}
+    return {"insights": all_insights, "filepath": filepath, "sources": ingested["sources"]}
 
 if __name__ == "__main__":
-    agent = InsightAgent()
+    parser = argparse.ArgumentParser(description="Extract structured insights from ACLED data.")
+    parser.add_argument("--mode", choices=INSIGHT_MODES, default=DEFAULT_MODE,
+                        help="latest: newest archive only; incremental: update the saved state "
+                             "with new archives; full: rebuild the state from all archives")
+    args = parser.parse_args()
+    agent = InsightAgent(mode=args.mode)
     insights = agent.run() 
\ No newline at end of file
@@ -17,6 +17,7 @@ from datetime import datetime
 
 from aws_secret_mgt import AWSSecretManager
 from typing import Dict, Any, List, Optional
+from src.core import artifact_cache
 from src.enrichment.spatial import enrich_summary_file
 import json
 import glob
@@ -57,7 +58,14 @@ def embed_image_in_markdown(image_path: str, alt_text: str = "Visualization") ->
         return f"[View {alt_text}]({image_path})"
 
 def get_latest_insight_file() -> Optional[str]:
-    """Find the most recent insight snapshot file."""
+    """Find the most recent insight snapshot file.
+
+    Prefers the file recorded by the last InsightAgent run (which may have
+    reused an older snapshot) over the newest file on disk.
+    """
+    recorded = artifact_cache.latest_output("insights", "insights")
+    if recorded:
+        return recorded
     processed_dir = os.path.join("data", "processed", "insights")
     if not os.path.exists(processed_dir):
         return None
@@ -284,6 +292,20 @@ def run() -> Dict[str, Any]:
             insight_file = max(files, key=os.path.getmtime)
             print(f"Warning: Could not find conflict_insights file. Falling back to {insight_file}")
 
+        # Scored source insights, added as their own section below
+        insights_files = glob.glob(os.path.join("data", "processed", "insights", "insights_*.json"))
+        latest_insights_file = max(insights_files, key=os.path.getmtime) if insights_files else None
+
+        # Reuse the report written for the same inputs, model and code
+        key = artifact_cache.stage_key("report", [p for p in (insight_file, latest_insights_file) if p],
+                                       config={"model": MODEL}, code=[__name__])
+        cached = artifact_cache.lookup("report", key)
+        if cached is not None:
+            report_file = cached["outputs"]["report"]["path"]
+            print(f"Inputs unchanged; reusing report {report_file}")
+            with open(report_file, "r", encoding="utf-8") as f:
+                return {"status": "success", "report": f.read(), "file": report_file, "cached": True}
+
         # Load insights
         with open(insight_file, "r", encoding="utf-8") as f:
             insights = json.load(f)
@@ -361,9 +383,11 @@ def run() -> Dict[str, Any]:
                 ]
             )
             narrative = completion.choices[0].message.content
+            narrative_ok = True
         except Exception as e:
             print(f"Error calling OpenAI: {e}")
             narrative = "Narrative generation failed due to API error."
+            narrative_ok = False
             
         report_sections.append("## Narrative Overview\n\n")
         report_sections.append(narrative or "No narrative generated.")
@@ -384,10 +408,7 @@ def run() -> Dict[str, Any]:
         # Add insights section with scores
         try:
             # Try to load individual insights with scores
-            insights_pattern = os.path.join("data", "processed", "insights", "insights_*.json")
-            insights_files = glob.glob(insights_pattern)
-            if insights_files:
-                latest_insights_file = max(insights_files, key=os.path.getmtime)
+            if latest_insights_file:
                 with open(latest_insights_file, "r", encoding="utf-8") as f:
                     insights_data = json.load(f)
                 report_sections.append(generate_insight_section(insights_data))
@@ -429,6 +450,10 @@ def run() -> Dict[str, Any]:
              # Optionally re-raise or handle differently
              raise write_error # Re-raise the error to ensure failure status
         # --- End Added Logging ---
+
+        # A report with a failed narrative is not cached, so the next run retries the LLM
+        if narrative_ok:
+            artifact_cache.store("report", key, {"report": report_filepath})
             
         return {"status": "success", "report": final_report, "file": str(report_filepath)}
 
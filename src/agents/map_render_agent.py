@@ -1,8 +1,15 @@
 import json
+import os
+import sys
 from pathlib import Path
 import pydeck as pdk
 import logging
 
+# Add the parent directory to the Python path to make imports work
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.core.event_table import EventTable
+
 # Configure basic logging if needed when used as a module
 # logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
@@ -24,10 +31,18 @@ def hex_to_rgba(hex_color: str, alpha: int = 180) -> list[int]:
         return [128, 128, 128, alpha] # Default to grey
     return [r, g, b, alpha]
 
+def table_points(events: EventTable) -> list[dict]:
+    '''{'lat', 'lon'} points for the events of an EventTable that have coordinates.'''
+    if "latitude" not in events or "longitude" not in events:
+        return []
+    lat, lon = events["latitude"], events["longitude"]
+    valid = (lat == lat) & (lon == lon) # drop NaN coordinates
+    return [{"lat": la, "lon": lo} for la, lo in zip(lat[valid].tolist(), lon[valid].tolist())]
+
 # ─── Core Map Rendering Function ──────────────────────────────────────────
 
 def render_hotspot_map(
-    hotspot_events_by_type: dict[str, list[dict]],
+    hotspot_events_by_type: dict[str, "list[dict] | EventTable"],
     hotspot_id: str,
     output_dir: Path,
     config: dict
@@ -36,6 +51,9 @@ def render_hotspot_map(
 
     Args:
         hotspot_events_by_type: Dict mapping event type (str) to list of event dicts (each with 'lat', 'lon').
+            A dict may also carry 'count' when it stands for a pre-binned grid
+            cell (see src.enrichment.grid_index); hexagons then sum the counts.
+            An EventTable may stand in for a list; only its coordinates are sent to the map.
         hotspot_id: A unique identifier string for the hotspot (used in filename and layer IDs).
         output_dir: The directory (Path object) where the HTML map file should be saved.
         config: A dictionary containing rendering parameters:
@@ -69,17 +87,27 @@ def render_hotspot_map(
     layers = []
     all_lats = []
     all_lons = []
+    all_weights = []
     for etype, evs in hotspot_events_by_type.items():
+        if isinstance(evs, EventTable):
+            evs = table_points(evs)
         if not evs: # Skip if no events for this type
             continue
 
         color_hex = default_colors.get(etype, default_other_color)
         rgba = hex_to_rgba(color_hex)
+        # Pre-binned cells: weight each point by its event count
+        weights = [pt.get("count", 1) for pt in evs]
+        weighting = {}
+        if "count" in evs[0]:
+            weighting = dict(get_elevation_weight="count", elevation_aggregation="SUM",
+                             get_color_weight="count", color_aggregation="SUM")
         layers.append(
             pdk.Layer(
                 "HexagonLayer",
                 data=evs,
                 get_position="[lon, lat]",
+                **weighting,
                 radius=radius,
                 elevation_scale=elevation_scale,
                 extruded=True,
@@ -92,8 +120,9 @@ def render_hotspot_map(
             )
         )
         # Collect coords for centering
-        all_lats.extend([pt["lat"] for pt in evs])
-        all_lons.extend([pt["lon"] for pt in evs])
+        all_lats.extend([pt["lat"] * w for pt, w in zip(evs, weights)])
+        all_lons.extend([pt["lon"] * w for pt, w in zip(evs, weights)])
+        all_weights.extend(weights)
 
     if not layers:
          logging.warning(f"No layers generated for hotspot {hotspot_id}. Skipping map.")
@@ -104,8 +133,8 @@ def render_hotspot_map(
         logging.warning(f"Could not determine center for hotspot {hotspot_id}. Skipping map.")
         return False
 
-    center_lat = sum(all_lats) / len(all_lats)
-    center_lon = sum(all_lons) / len(all_lons)
+    center_lat = sum(all_lats) / sum(all_weights)
+    center_lon = sum(all_lons) / sum(all_weights)
     view_state = pdk.ViewState(
         latitude=center_lat,
         longitude=center_lon,
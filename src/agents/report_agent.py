@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 import sqlite3
 from datetime import date, timedelta
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
 import os
 import sys
 import json
@@ -9,15 +9,29 @@ import json
 # Add the parent directory to the Python path to make imports work
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
+from src.db.sqlite_writer import ensure_db
+
 # Update path to use proper module paths
 DB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "db", "conflict_data.db")
 
+def _sql_order(value: Any) -> Tuple[bool, Any]:
+    """Sort key matching SQLite's ordering of NULLs before text."""
+    return (value is not None, value if value is not None else "")
+
+def _top_counts(counts: Dict[Any, int], limit: int) -> List[Tuple[Any, int]]:
+    """Highest counts first, ties broken by name, like ORDER BY cnt DESC."""
+    ranked = sorted(counts.items(), key=lambda kv: _sql_order(kv[0]))
+    ranked.sort(key=lambda kv: kv[1], reverse=True)
+    return ranked[:limit]
+
 def get_summary(period: str = "daily") -> Dict[str, Any]:
+    # Make sure the rollup table exists before querying (migrated once per process)
+    ensure_db(DB_PATH)
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
 
     # Determine reference date as the most recent event_date in the DB
-    cursor.execute("SELECT MAX(event_date) FROM conflict_events")
+    cursor.execute("SELECT MAX(event_date) FROM daily_rollup WHERE event_date != ''")
     row = cursor.fetchone()
     if row and row[0]:
         reference_date = date.fromisoformat(row[0])
@@ -35,87 +49,50 @@ def get_summary(period: str = "daily") -> Dict[str, Any]:
     else:
         raise ValueError(f"Invalid period: {period}")
 
+    # One pass over the pre-aggregated daily rollup; every breakdown below
+    # is rolled up from these cells
     cursor.execute(
         """
-        SELECT event_type, COUNT(*), IFNULL(SUM(fatalities),0)
-        FROM conflict_events
-        WHERE event_date BETWEEN ? AND ?
-        GROUP BY event_type;
-        """,
-        (start.isoformat(), end.isoformat()),
-    )
-    rows = cursor.fetchall()
-    # Fetch top 5 locations by event count
-    cursor.execute(
-        """
-        SELECT city, COUNT(*)
-        FROM conflict_events
+        SELECT NULLIF(event_type, ''), NULLIF(country, ''), NULLIF(city, ''),
+               SUM(event_count), SUM(fatalities)
+        FROM daily_rollup
         WHERE event_date BETWEEN ? AND ?
-        GROUP BY city
-        ORDER BY COUNT(*) DESC
-        LIMIT 5;
+        GROUP BY event_type, country, city;
         """,
         (start.isoformat(), end.isoformat()),
     )
-    loc_rows = cursor.fetchall()
-    # Gather top locations per event type
-    cursor = conn.cursor()
-    cursor.execute(
-        """
-        SELECT event_type, city, COUNT(*) as cnt
-        FROM conflict_events
-        WHERE event_date BETWEEN ? AND ?
-        GROUP BY event_type, city
-        ORDER BY event_type ASC, cnt DESC;
-        """,
-        (start.isoformat(), end.isoformat()),
-    )
-    loc_by_type_rows = cursor.fetchall()
-    # Build a mapping of event type to top locations
-    locations_by_type = {}
-    for etype, city, cnt in loc_by_type_rows:
-        locations_by_type.setdefault(etype, []).append({"location": city, "count": cnt})
-    # Keep only top 2 locations per type
-    for etype in locations_by_type:
-        locations_by_type[etype] = locations_by_type[etype][:2]
+    cells = cursor.fetchall()
+    conn.close()
 
-    # Gather top countries per event type
-    cursor = conn.cursor()
-    cursor.execute(
-        """
-        SELECT event_type, country, COUNT(*) as cnt
-        FROM conflict_events
-        WHERE event_date BETWEEN ? AND ?
-        GROUP BY event_type, country
-        ORDER BY event_type ASC, cnt DESC;
-        """,
-        (start.isoformat(), end.isoformat()),
-    )
-    country_by_type_rows = cursor.fetchall()
-    countries_by_type = {}
-    for etype, country, cnt in country_by_type_rows:
-        countries_by_type.setdefault(etype, []).append({"country": country, "count": cnt})
-    # Keep only top 2 countries per type
-    for etype in countries_by_type:
-        countries_by_type[etype] = countries_by_type[etype][:2]
+    type_totals: Dict[Any, List[int]] = {}
+    city_counts: Dict[Any, int] = {}
+    country_counts: Dict[Any, int] = {}
+    type_city_counts: Dict[Any, Dict[Any, int]] = {}
+    type_country_counts: Dict[Any, Dict[Any, int]] = {}
+    for etype, country, city, cnt, fatalities in cells:
+        totals = type_totals.setdefault(etype, [0, 0])
+        totals[0] += cnt
+        totals[1] += fatalities
+        city_counts[city] = city_counts.get(city, 0) + cnt
+        country_counts[country] = country_counts.get(country, 0) + cnt
+        by_city = type_city_counts.setdefault(etype, {})
+        by_city[city] = by_city.get(city, 0) + cnt
+        by_country = type_country_counts.setdefault(etype, {})
+        by_country[country] = by_country.get(country, 0) + cnt
 
-    # Gather overall top countries
-    cursor = conn.cursor()
-    cursor.execute(
-        """
-        SELECT country, COUNT(*) as cnt
-        FROM conflict_events
-        WHERE event_date BETWEEN ? AND ?
-        GROUP BY country
-        ORDER BY cnt DESC
-        LIMIT 5;
-        """,
-        (start.isoformat(), end.isoformat()),
-    )
-    country_rows = cursor.fetchall()
+    rows = [(etype, cnt, fatalities) for etype, (cnt, fatalities) in sorted(type_totals.items(), key=lambda kv: _sql_order(kv[0]))]
+    loc_rows = _top_counts(city_counts, 5)
+    country_rows = _top_counts(country_counts, 5)
     top_countries = [{"country": r[0], "count": r[1]} for r in country_rows]
-
-    conn.close()
+    # Keep only the top 2 locations and countries per type
+    locations_by_type = {
+        etype: [{"location": city, "count": cnt} for city, cnt in _top_counts(type_city_counts[etype], 2)]
+        for etype, _, _ in rows
+    }
+    countries_by_type = {
+        etype: [{"country": country, "count": cnt} for country, cnt in _top_counts(type_country_counts[etype], 2)]
+        for etype, _, _ in rows
+    }
 
     # Rank event types by fatalities and build enriched summary entries
     rows_sorted = sorted(rows, key=lambda r: r[2], reverse=True)
@@ -0,0 +1,150 @@
+"""
+Background jobs for the API.
+
+``POST /run-agent/`` enqueues an agent run on a ``JobManager`` and returns
+at once with a job id. A bounded thread pool runs the jobs through
+``execute_agent``, so the event loop never waits for an agent. Each job
+keeps a list of progress events (queued, running, then the outcome) that
+``GET /jobs/{id}`` returns and ``GET /jobs/{id}/events`` streams.
+"""
+
+import os
+import sys
+import threading
+import traceback
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+# Add the parent directory to the Python path to make imports work
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+# Agent runs executing at the same time
+JOB_WORKERS = int(os.getenv("FORGENEWS_API_JOB_WORKERS", "2"))
+# Jobs waiting or running before new ones are refused
+MAX_PENDING_JOBS = int(os.getenv("FORGENEWS_API_MAX_PENDING_JOBS", "20"))
+# Finished jobs kept for polling
+JOB_HISTORY = int(os.getenv("FORGENEWS_API_JOB_HISTORY", "200"))
+
+FINISHED_STATUSES = ("success", "failed", "blocked")
+
+
+class JobQueueFull(RuntimeError):
+    """``MAX_PENDING_JOBS`` jobs are already queued or running."""
+
+
+class Job:
+    """One agent run: its status, result and progress events."""
+
+    def __init__(self, agent_name: str) -> None:
+        self.id = uuid.uuid4().hex
+        self.agent_name = agent_name
+        self.status = "queued"
+        self.created = datetime.utcnow().isoformat()
+        self.started: Optional[str] = None
+        self.finished: Optional[str] = None
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.events: List[Dict[str, Any]] = []
+        self._changed = threading.Condition()
+        self._event("queued")
+
+    @property
+    def done(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    def _event(self, status: str, **details: Any) -> None:
+        with self._changed:
+            self.status = status
+            self.events.append({"time": datetime.utcnow().isoformat(), "status": status, **details})
+            self._changed.notify_all()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait until the job has finished; False if ``timeout`` ran out first."""
+        with self._changed:
+            return self._changed.wait_for(lambda: self.done, timeout)
+
+    def wait_events(self, after: int, timeout: float) -> List[Dict[str, Any]]:
+        """Events after the first ``after``, waiting up to ``timeout`` seconds for one."""
+        with self._changed:
+            self._changed.wait_for(lambda: len(self.events) > after, timeout)
+            return self.events[after:]
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._changed:
+            return {
+                "job_id": self.id,
+                "agent_name": self.agent_name,
+                "status": self.status,
+                "created": self.created,
+                "started": self.started,
+                "finished": self.finished,
+                "result": self.result,
+                "error": self.error,
+                "events": list(self.events),
+            }
+
+
+class JobManager:
+    """Runs agent jobs on a bounded thread pool; see the module docstring."""
+
+    def __init__(self, workers: int = JOB_WORKERS, max_pending: int = MAX_PENDING_JOBS,
+                 history: int = JOB_HISTORY) -> None:
+        self.max_pending = max_pending
+        self.history = history
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="forgenews-job")
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, agent_name: str, run: Callable[[], Any]) -> Job:
+        """Queue ``run`` (a call to ``execute_agent``) as a job for ``agent_name``.
+
+        Raises:
+            JobQueueFull: Too many jobs are queued or running.
+        """
+        job = Job(agent_name)
+        with self._lock:
+            if sum(not j.done for j in self._jobs.values()) >= self.max_pending:
+                raise JobQueueFull(f"{self.max_pending} agent runs are already queued or running")
+            self._jobs[job.id] = job
+            self._prune()
+        self._pool.submit(self._run, job, run)
+        return job
+
+    def _prune(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.done]
+        for job_id in finished[:max(0, len(finished) - self.history)]:
+            del self._jobs[job_id]
+
+    def _run(self, job: Job, run: Callable[[], Any]) -> None:
+        job.started = datetime.utcnow().isoformat()
+        job._event("running")
+        try:
+            result = run()
+        except Exception as e:
+            job.error = f"{type(e).__name__}: {e}"
+            job.finished = datetime.utcnow().isoformat()
+            job._event("failed", error=job.error, traceback=traceback.format_exc())
+            return
+        job.result = result
+        job.finished = datetime.utcnow().isoformat()
+        outcome = result.get("status") if isinstance(result, dict) else None
+        if outcome == "blocked":
+            job._event("blocked", message=result.get("message"))
+        elif outcome in (None, "success"):
+            job._event("success")
+        else:
+            job._event("failed", error=result.get("error") or result.get("message"))
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def all(self) -> List[Job]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait)
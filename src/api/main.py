@@ -2,21 +2,24 @@
 API entrypoint for the ForgeNews platform orchestrator (ctrl).
 """
 
-from fastapi import FastAPI, HTTPException, Request, status
-from pydantic import BaseModel, EmailStr
+from fastapi import FastAPI, HTTPException, Response, status
+from pydantic import BaseModel, EmailStr, Field
+import asyncio
 import json
 import os
 import sys
 from datetime import datetime
 from typing import Dict, Any, List, Optional
-from fastapi.responses import HTMLResponse, FileResponse
+from fastapi.responses import HTMLResponse, FileResponse, StreamingResponse
 from pathlib import Path
 
 # Add the parent directory to the Python path to make imports work
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
 # Import the ctrl execution engine
+from src.core import ctrl
 from src.core.ctrl import execute_agent, AGENT_REGISTRY
+from src.db.state_store import read_state
 
 # Import guardrail logic to protect agent calls
 from src.core.guardrails import execute_guardrails
@@ -24,6 +27,12 @@ from src.core.guardrails import execute_guardrails
 # Import subscriber database functions
 from src.db.subscribers_db import init_db, add_subscriber, remove_subscriber, confirm_subscriber
 
+# Run log backend read by the dashboard
+from src.core.runlog import get_runlog
+
+# Background agent runs
+from src.api.jobs import JobManager, JobQueueFull
+
 # Import newsletter renderer
 from src.core.newsletter_renderer import render_latest_insights_html
 
@@ -36,10 +45,20 @@ init_db()
 # Initialize FastAPI app
 app = FastAPI(title="ForgeNews ctrl API", version="0.1")
 
+# Run log entries shown on the dashboard (the newest ones)
+DASHBOARD_LOG_TAIL = int(os.getenv("FORGENEWS_DASHBOARD_LOG_TAIL", "200"))
+
+# Agent runs triggered through the API execute here, off the event loop
+jobs = JobManager()
+
 # Define the expected JSON schema for agent execution
 class AgentRequest(BaseModel):
     agent_name: str
-    input_text: str
+    input_text: str = ""
+    # API triggers are not held back by the run interval unless one is given
+    interval_hours: int = Field(0, ge=0)
+    # respond once the agent has finished instead of returning a job id
+    wait: bool = False
 
 # Pydantic model for email validation in the request body
 class SubscriberEmail(BaseModel):
@@ -52,15 +71,15 @@ class LogFilter(BaseModel):
     date_to: Optional[str] = None
 
 # Endpoint to execute any registered agent
-@app.post("/run-agent/")
-async def run_agent(request: Request):
+@app.post("/run-agent/", status_code=status.HTTP_202_ACCEPTED)
+async def run_agent(agent_request: AgentRequest, response: Response):
     """
-    Runs the requested agent after passing through guardrails.
-    Returns success if the agent executes safely.
+    Queues the requested agent after passing through guardrails.
+    Returns 202 with a job id to poll at /jobs/{job_id}. With "wait": true
+    the response is sent once the agent has finished, as before.
     """
-    data = await request.json()
-    agent_name = data.get("agent_name")
-    input_text = data.get("input_text", "")
+    agent_name = agent_request.agent_name
+    input_text = agent_request.input_text
     
     if not agent_name or agent_name not in AGENT_REGISTRY:
         raise HTTPException(status_code=404, detail="Agent not found")
@@ -69,12 +88,65 @@ async def run_agent(request: Request):
     if not execute_guardrails(input_text, ""):
         raise HTTPException(status_code=400, detail="Guardrails triggered, unsafe input detected.")
     
-    agent_func = AGENT_REGISTRY[agent_name]
-    result = agent_func()
-    if result.get("status") == "success":
-        return {"status": "Agent executed successfully."}
-    else:
-        return {"status": "Agent execution failed."}
+    # Runs in a job thread through execute_agent (risk checks, state, run log)
+    interval_hours = agent_request.interval_hours
+    try:
+        job = jobs.submit(agent_name, lambda: execute_agent(AGENT_REGISTRY[agent_name], agent_name, interval_hours))
+    except JobQueueFull as e:
+        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=str(e))
+    
+    if agent_request.wait:
+        await asyncio.to_thread(job.wait)
+        response.status_code = status.HTTP_200_OK
+        if job.status == "success":
+            return {"status": "Agent executed successfully.", "job_id": job.id}
+        else:
+            return {"status": "Agent execution failed.", "job_id": job.id}
+    
+    return {"job_id": job.id, "status": job.status, "status_url": f"/jobs/{job.id}"}
+
+@app.get("/jobs/")
+async def list_jobs():
+    """
+    Lists the queued, running and recently finished agent jobs.
+    """
+    return {"jobs": [{key: value for key, value in job.to_dict().items() if key not in ("result", "events")}
+                     for job in jobs.all()]}
+
+def _get_job(job_id: str):
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    Returns a job's status, progress events and, once finished, its result.
+    """
+    return _get_job(job_id).to_dict()
+
+@app.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str):
+    """
+    Streams a job's progress events as NDJSON until it has finished.
+    """
+    job = _get_job(job_id)
+
+    async def events():
+        sent = 0
+        while True:
+            # wait for new events in a thread so the event loop stays free
+            new = await asyncio.to_thread(job.wait_events, sent, 15)
+            for event in new:
+                yield json.dumps(event, default=str) + "\n"
+            sent += len(new)
+            if job.done and sent == len(job.events):
+                break
+        summary = {key: value for key, value in job.to_dict().items() if key != "events"}
+        yield json.dumps({"status": "result", "job": summary}, default=str) + "\n"
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
 
 @app.get("/dashboard/")
 async def dashboard():
@@ -82,26 +154,11 @@ async def dashboard():
     Provides a dashboard view of log data and pipeline state.
     Allows filtering logs by agent, status, and date.
     """
-    # Load run logs
-    runlog_path = os.path.join('logs', 'runlog.json')
-    pipeline_state_path = "pipeline_state.json"
-    
-    logs = []
-    if os.path.exists(runlog_path):
-        try:
-            with open(runlog_path, 'r') as f:
-                logs = json.load(f)
-        except json.JSONDecodeError:
-            logs = []
+    # Load the newest run log entries
+    logs = get_runlog().tail(DASHBOARD_LOG_TAIL)
     
-    # Load pipeline state
-    pipeline_state = {}
-    if os.path.exists(pipeline_state_path):
-        try:
-            with open(pipeline_state_path, 'r') as f:
-                pipeline_state = json.load(f)
-        except json.JSONDecodeError:
-            pipeline_state = {}
+    # Per-agent run history, read without taking a write lock
+    pipeline_state = read_state(ctrl.STATE_FILE)
     
     # Get latest insights if available
     latest_insight = get_latest_insight()
@@ -117,19 +174,8 @@ async def filter_logs(filter_params: LogFilter):
     """
     Filter logs based on specified criteria.
     """
-    runlog_path = os.path.join('logs', 'runlog.json')
-    
-    if not os.path.exists(runlog_path):
-        return {"logs": []}
-    
-    try:
-        with open(runlog_path, 'r') as f:
-            logs = json.load(f)
-    except json.JSONDecodeError:
-        return {"logs": []}
-    
-    # Apply filters
-    filtered_logs = logs
+    # Only the run log segments overlapping the date range are read
+    filtered_logs = get_runlog().read_range(filter_params.date_from, filter_params.date_to)
     
     # Filter by agent name
     if filter_params.agent_name:
@@ -139,27 +185,6 @@ async def filter_logs(filter_params: LogFilter):
     if filter_params.status:
         filtered_logs = [log for log in filtered_logs if log.get("status") == filter_params.status]
     
-    # Filter by date range
-    if filter_params.date_from:
-        try:
-            date_from = datetime.fromisoformat(filter_params.date_from)
-            filtered_logs = [
-                log for log in filtered_logs 
-                if "timestamp" in log and datetime.fromisoformat(log["timestamp"]) >= date_from
-            ]
-        except ValueError:
-            pass
-    
-    if filter_params.date_to:
-        try:
-            date_to = datetime.fromisoformat(filter_params.date_to)
-            filtered_logs = [
-                log for log in filtered_logs 
-                if "timestamp" in log and datetime.fromisoformat(log["timestamp"]) <= date_to
-            ]
-        except ValueError:
-            pass
-    
     return {"logs": filtered_logs}
 
 def get_latest_insight() -> Dict[str, Any]:
@@ -0,0 +1,199 @@
+"""
+Content-addressed cache for pipeline stage outputs.
+
+A stage (insights, charts, maps, report) declares what it is computed
+from: input files, a config dict and the modules holding its code.
+``stage_key`` hashes all three into a key, and ``store`` records the files
+the stage wrote under that key as ``<ARTIFACT_DIR>/<stage>/<key>.json``
+together with their SHA-256 digests. A later run with the same key gets the
+manifest back from ``lookup`` as long as every output file still exists
+with the recorded digest, and reuses it instead of recomputing.
+
+File digests are memoized by (size, mtime) in ``digests.json``, so
+unchanged inputs are not re-read on every run. ``latest_output`` returns the
+newest output a stage recorded, for downstream stages that used to pick
+their input with a "latest file" glob.
+"""
+
+import hashlib
+import inspect
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from types import ModuleType
+from typing import Any, Callable, Dict, Iterable, Mapping, Optional, Tuple, Union
+
+# Add the parent directory to the Python path to make imports work
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_DIR = os.getenv("FORGENEWS_ARTIFACT_CACHE", os.path.join("data", ".artifacts"))
+DISABLED = os.getenv("FORGENEWS_ARTIFACT_CACHE_OFF", "").lower() in ("1", "true", "yes")
+
+_lock = threading.RLock()
+# path -> (size, mtime_ns, sha256), persisted in digests.json
+_digests: Optional[Dict[str, Tuple[int, int, str]]] = None
+_code_versions: Dict[str, str] = {}
+
+
+def _digests_path() -> str:
+    return os.path.join(ARTIFACT_DIR, "digests.json")
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _load_digests() -> Dict[str, Tuple[int, int, str]]:
+    global _digests
+    if _digests is None:
+        try:
+            with open(_digests_path(), "r") as f:
+                _digests = {path: tuple(entry) for path, entry in json.load(f).items()}
+        except (OSError, ValueError):
+            _digests = {}
+    return _digests
+
+
+def file_digest(path: Union[str, os.PathLike]) -> Optional[str]:
+    """SHA-256 of a file's contents, or None if it does not exist.
+
+    The digest is reused while the file's size and mtime are unchanged.
+    """
+    path = os.path.abspath(path)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    with _lock:
+        digests = _load_digests()
+        entry = digests.get(path)
+        if entry and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+            return entry[2]
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            sha.update(block)
+    digest = sha.hexdigest()
+    with _lock:
+        digests[path] = (stat.st_size, stat.st_mtime_ns, digest)
+        _write_atomic(_digests_path(), json.dumps(digests).encode("utf-8"))
+    return digest
+
+
+def object_digest(obj: Any) -> str:
+    """SHA-256 of a JSON-serializable object (keys sorted)."""
+    payload = json.dumps(obj, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def code_version(*modules: Union[str, ModuleType, Callable]) -> str:
+    """Digest of the source files of ``modules`` (module objects, names or functions)."""
+    parts = []
+    for module in modules:
+        if isinstance(module, str):
+            module = sys.modules.get(module) or __import__(module, fromlist=["_"])
+        name = f"{getattr(module, '__module__', '')}.{getattr(module, '__name__', repr(module))}"
+        if name not in _code_versions:
+            try:
+                source = inspect.getsourcefile(module)
+            except TypeError:  # builtins have no source
+                source = None
+            _code_versions[name] = (source and file_digest(source)) or name
+        parts.append((name, _code_versions[name]))
+    return object_digest(parts)
+
+
+def stage_key(stage: str, inputs: Iterable[Union[str, os.PathLike]] = (),
+              config: Optional[Mapping[str, Any]] = None,
+              code: Iterable[Union[str, ModuleType, Callable]] = ()) -> str:
+    """Cache key of a stage run: its name, input file contents, config and code.
+
+    A missing input file hashes as missing, so creating it changes the key.
+    """
+    return object_digest({
+        "stage": stage,
+        "inputs": sorted((os.path.abspath(path), file_digest(path)) for path in inputs),
+        "config": dict(config or {}),
+        "code": code_version(*code),
+    })
+
+
+def _manifest_path(stage: str, key: str) -> str:
+    return os.path.join(ARTIFACT_DIR, stage, f"{key}.json")
+
+
+def _valid(manifest: Dict[str, Any]) -> bool:
+    """True if every recorded output still exists with its recorded digest."""
+    return all(file_digest(output["path"]) == output["sha256"]
+               for output in manifest.get("outputs", {}).values())
+
+
+def lookup(stage: str, key: str) -> Optional[Dict[str, Any]]:
+    """The manifest stored for ``key``, or None if absent or its outputs changed.
+
+    Returns:
+        {"stage", "key", "created_at", "outputs": {name: {"path", "sha256"}},
+         "result": <whatever the stage stored>}
+    """
+    if DISABLED:
+        return None
+    try:
+        with open(_manifest_path(stage, key), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not _valid(manifest):
+        logger.info(f"Cached {stage} artifacts for {key[:12]} changed on disk; recomputing")
+        return None
+    _write_atomic(os.path.join(ARTIFACT_DIR, stage, "latest.json"),
+                  json.dumps(manifest, ensure_ascii=False).encode("utf-8"))
+    return manifest
+
+
+def store(stage: str, key: str, outputs: Mapping[str, Union[str, os.PathLike]],
+          result: Any = None) -> Dict[str, Any]:
+    """Record the files a stage wrote for ``key`` and mark them as its latest.
+
+    Args:
+        stage: Stage name.
+        key: ``stage_key`` of the run.
+        outputs: Output name -> path of a file the stage wrote; missing
+            files are left out.
+        result: JSON-serializable value returned with the manifest by ``lookup``.
+    """
+    recorded = {}
+    for name, path in outputs.items():
+        digest = file_digest(path) if path else None
+        if digest is not None:
+            recorded[name] = {"path": os.path.abspath(path), "sha256": digest}
+    manifest = {"stage": stage, "key": key, "created_at": time.time(),
+                "outputs": recorded, "result": result}
+    if DISABLED:
+        return manifest
+    payload = json.dumps(manifest, ensure_ascii=False, default=str).encode("utf-8")
+    _write_atomic(_manifest_path(stage, key), payload)
+    _write_atomic(os.path.join(ARTIFACT_DIR, stage, "latest.json"), payload)
+    return manifest
+
+
+def latest_output(stage: str, name: str) -> Optional[str]:
+    """Path of output ``name`` from the newest run recorded for ``stage``, if it still exists."""
+    if DISABLED:
+        return None
+    try:
+        with open(os.path.join(ARTIFACT_DIR, stage, "latest.json"), "r", encoding="utf-8") as f:
+            output = json.load(f)["outputs"].get(name)
+    except (OSError, ValueError, KeyError):
+        return None
+    if output and os.path.exists(output["path"]):
+        return output["path"]
+    return None
@@ -3,42 +3,91 @@ MissionControl (ctrl): Orchestrates agent workflows within ForgeNews.
 Ensures efficient deployment and monitoring of modular agents.
 """
 
+from collections.abc import MutableMapping
 from datetime import datetime
+import functools
+import importlib
 import json
 import os
 import sys
-from typing import Dict, Any, Callable, Optional, Tuple
+import threading
+import traceback
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Dict, Any, Callable, Iterator, List, Optional, Sequence, Tuple, Union
 from pathlib import Path
 
 # Add the parent directory to the Python path to make imports work
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
-from src.agents.conflict_agent import run as conflict_agent_run
-from src.agents.report_agent import run as report_agent_run
-from src.agents.substack_agent import run as substack_agent_run
-from src.agents.llm_report_agent import run as llm_report_agent_run
-from src.agents.ctrl_agent import run as ctrl_agent_run
-from src.agents.ai_news_agent import run as ai_news_agent_run
-from src.agents.insight_agent import InsightAgent
 import time
 
 # Import tool registry to check risk levels
 from src.core.tool_registry import registry as tool_registry
+from src.core.runlog import get_runlog
+from src.core.isolation import AgentProcessPool, AgentTimeout, get_pool
+from src.db.state_store import StateStore
 
-# Default state file, can be overridden for testing
-STATE_FILE = "pipeline_state.json"
+# Default state database, can be overridden for testing
+STATE_FILE = os.getenv("FORGENEWS_STATE_FILE", "pipeline_state.db")
+# JSON state file used before the SQLite store; imported into a new database
+LEGACY_STATE_FILE = "pipeline_state.json"
 
-# Global registry for agents
-AGENT_REGISTRY = {}
+class LazyAgentRegistry(MutableMapping):
+    """Agent name -> run callable, imported on first lookup.
+
+    Entries are "module:attribute" import paths (or callables). An agent's
+    module, and the dependencies it pulls in (pandas, OpenAI, ...), is only
+    imported when that agent is looked up, so importing ctrl stays cheap.
+    """
+
+    def __init__(self, entries: Dict[str, Union[str, Callable[[], Any]]]) -> None:
+        self._entries = dict(entries)
+
+    def __getitem__(self, agent_name: str) -> Callable[[], Any]:
+        entry = self._entries[agent_name]
+        if isinstance(entry, str):
+            module_name, _, attribute = entry.partition(":")
+            entry = importlib.import_module(module_name)
+            for part in attribute.split("."):
+                entry = getattr(entry, part)
+            self._entries[agent_name] = entry
+        return entry
+
+    def __contains__(self, agent_name: object) -> bool:
+        return agent_name in self._entries  # without importing the agent
+
+    def __setitem__(self, agent_name: str, entry: Union[str, Callable[[], Any]]) -> None:
+        self._entries[agent_name] = entry
+
+    def __delitem__(self, agent_name: str) -> None:
+        del self._entries[agent_name]
 
-# Auto register agents
-AGENT_REGISTRY["conflict_agent"] = conflict_agent_run
-AGENT_REGISTRY["report_agent"] = report_agent_run
-AGENT_REGISTRY["substack_agent"] = substack_agent_run
-AGENT_REGISTRY["llm_report_agent"] = llm_report_agent_run
-AGENT_REGISTRY["ctrl_agent"] = ctrl_agent_run
-AGENT_REGISTRY["ai_news_agent"] = ai_news_agent_run
-AGENT_REGISTRY["insight_agent"] = lambda: InsightAgent().run()
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def is_loaded(self, agent_name: str) -> bool:
+        """True once the agent's import path has been resolved."""
+        return not isinstance(self._entries[agent_name], str)
+
+
+def _run_insight_agent() -> Dict[str, Any]:
+    from src.agents.insight_agent import InsightAgent
+    return InsightAgent().run()
+
+
+# Global registry for agents
+AGENT_REGISTRY = LazyAgentRegistry({
+    "conflict_agent": "src.agents.conflict_agent:run",
+    "report_agent": "src.agents.report_agent:run",
+    "substack_agent": "src.agents.substack_agent:run",
+    "llm_report_agent": "src.agents.llm_report_agent:run",
+    "ctrl_agent": "src.agents.ctrl_agent:run",
+    "ai_news_agent": "src.agents.ai_news_agent:run",
+    "insight_agent": _run_insight_agent,
+})
 
 # Map of agent to associated tools
 AGENT_TOOLS = {
@@ -51,69 +100,78 @@ AGENT_TOOLS = {
     "insight_agent": ["analyze_conflict"],
 }
 
+# Data each agent reads and writes. run_pipeline orders agents that share
+# data and runs the rest concurrently.
+AGENT_IO: Dict[str, Dict[str, List[str]]] = {
+    "conflict_agent": {"inputs": [], "outputs": ["conflict_db", "raw_events"]},
+    "insight_agent": {"inputs": ["raw_events"], "outputs": ["insights"]},
+    "report_agent": {"inputs": ["conflict_db"], "outputs": ["summary"]},
+    "llm_report_agent": {"inputs": ["insights"], "outputs": ["narrative_report"]},
+    "substack_agent": {"inputs": ["conflict_db"], "outputs": ["newsletter"]},
+    "ctrl_agent": {"inputs": ["conflict_db", "insights"], "outputs": ["summary", "narrative_report"]},
+    "ai_news_agent": {"inputs": [], "outputs": ["ai_news"]},
+}
+
+PIPELINE_WORKERS = int(os.getenv("FORGENEWS_PIPELINE_WORKERS", "4"))
+
+# How execute_agent runs agents: "inline" in this process, or "process" in an
+# isolated worker with FORGENEWS_AGENT_TIMEOUT / FORGENEWS_AGENT_MEMORY_MB limits
+EXECUTION = os.getenv("FORGENEWS_EXECUTION", "inline")
+
+_stores: Dict[str, StateStore] = {}
+_stores_lock = threading.Lock()
+
+def get_state_store() -> StateStore:
+    """The state store for the current ``STATE_FILE``, opened once per process."""
+    with _stores_lock:
+        if STATE_FILE not in _stores:
+            _stores[STATE_FILE] = StateStore(STATE_FILE, legacy_json=LEGACY_STATE_FILE)
+        return _stores[STATE_FILE]
+
 def load_state() -> Dict[str, Any]:
-    """Load the pipeline state from the state file. Returns a dict."""
-    if not os.path.exists(STATE_FILE):
-        return {}
-    try:
-        with open(STATE_FILE, 'r') as f:
-            return json.load(f)
-    except Exception:
-        return {}
+    """Load the last run timestamp of every agent. Returns a dict."""
+    return {agent: row["last_run"] for agent, row in get_state_store().all().items()}
 
 def save_state(state: Dict[str, Any]) -> None:
-    """Save the given state dict to the state file."""
-    with open(STATE_FILE, 'w') as f:
-        json.dump(state, f)
+    """Set the last run timestamps in the given dict."""
+    store = get_state_store()
+    for agent_name, last_run in state.items():
+        store.set_last_run(agent_name, last_run)
 
 def check_last_run(agent_name: str, interval_hours: int) -> bool:
     """Check if enough time has passed since the last run of the given agent.\
     Returns True if the agent can be run (either it has never run, or the interval has passed.)."""
-    state = load_state()
-    if agent_name not in state:
+    last_run = get_state_store().last_run(agent_name)
+    if last_run is None:
         return True
     try:
-        last_run_time = datetime.fromisoformat(state[agent_name])
+        last_run_time = datetime.fromisoformat(last_run)
     except Exception:
         return True
     now = datetime.utcnow()
     diff_hours = (now - last_run_time).total_seconds() / 3600.0
     return diff_hours >= interval_hours
 
-def log_run(agent_name: str, result: bool) -> None:
-    """Log an agent run by updating its last run timestamp in the state file.\
-    The 'result' parameter can be used for additional processing if needed."""
-    state = load_state()
-    state[agent_name] = datetime.utcnow().isoformat()
-    save_state(state)
+def log_run(agent_name: str, result: bool, duration: Optional[float] = None) -> None:
+    """Log an agent run: its timestamp, outcome and duration, in one atomic update."""
+    get_state_store().record_run(agent_name, success=bool(result), duration=duration)
 
 # Helper to append entries to the run log
 def _append_runlog(agent_name: str, status: str, timestamp: str, duration: Optional[float] = None, 
                   tool_risks: Optional[Dict[str, str]] = None, level: str = "INFO") -> None:
-    runlog_path = os.path.join('logs', 'runlog.json')
+    log_entry = {
+        "timestamp": timestamp, 
+        "agent": agent_name, 
+        "status": status, 
+        "duration": duration,
+        "level": level
+    }
+    
+    # Add tool risk information if available
+    if tool_risks:
+        log_entry["tool_risks"] = tool_risks
     try:
-        os.makedirs(os.path.dirname(runlog_path), exist_ok=True)
-        if os.path.exists(runlog_path):
-            with open(runlog_path, 'r') as f:
-                logs = json.load(f)
-        else:
-            logs = []
-        
-        log_entry = {
-            "timestamp": timestamp, 
-            "agent": agent_name, 
-            "status": status, 
-            "duration": duration,
-            "level": level
-        }
-        
-        # Add tool risk information if available
-        if tool_risks:
-            log_entry["tool_risks"] = tool_risks
-            
-        logs.append(log_entry)
-        with open(runlog_path, 'w') as f:
-            json.dump(logs, f, indent=2)
+        get_runlog().append(log_entry)
     except Exception as e:
         print(f"Error logging to runlog: {str(e)}")
 
@@ -151,8 +209,21 @@ def check_tool_risks(agent_name: str, allow_high_risk: bool = False) -> Tuple[bo
     return True, tool_risks
 
 def execute_agent(agent_callable: Callable[..., Any], agent_name: str, 
-                 interval_hours: int = 24, allow_high_risk: bool = False) -> Any:
-    """Executes an agent if conditions are met, then logs the outcome."""
+                 interval_hours: int = 24, allow_high_risk: bool = False,
+                 isolation: Optional[str] = None, timeout: Optional[float] = None,
+                 memory_mb: Optional[int] = None,
+                 pool: Optional[AgentProcessPool] = None) -> Any:
+    """Executes an agent if conditions are met, then logs the outcome.
+
+    With ``isolation="process"`` (default ``EXECUTION``) the agent runs in a
+    worker process from ``pool`` (the shared pool by default), killed after
+    ``timeout`` seconds and limited to ``memory_mb``; ``agent_callable`` must
+    then be picklable. A timeout is logged as 'timeout' and re-raised as
+    ``AgentTimeout``.
+    """
+    isolation = isolation or EXECUTION
+    if isolation not in ("inline", "process"):
+        raise ValueError(f"isolation must be 'inline' or 'process', not {isolation!r}")
     status: str = 'blocked'
     start_time = time.time()
     timestamp = datetime.utcnow().isoformat()
@@ -171,18 +242,21 @@ def execute_agent(agent_callable: Callable[..., Any], agent_name: str,
     # Check whether we can run based on timing
     if check_last_run(agent_name, interval_hours):
         try:
-            result = agent_callable()
-            log_run(agent_name, result=True)
+            if isolation == "process":
+                result = (pool or get_pool()).run(agent_name, agent_callable, timeout=timeout, memory_mb=memory_mb)
+            else:
+                result = agent_callable()
             status = 'success'
             end_time = time.time()
             duration = end_time - start_time
+            log_run(agent_name, result=True, duration=duration)
             _append_runlog(agent_name, status, timestamp, duration, tool_risks, level="INFO")
             return result
         except Exception as e:
-            log_run(agent_name, result=False)
-            status = 'failure'
+            status = 'timeout' if isinstance(e, AgentTimeout) else 'failure'
             end_time = time.time()
             duration = end_time - start_time
+            log_run(agent_name, result=False, duration=duration)
             _append_runlog(agent_name, status, timestamp, duration, tool_risks, level="ERROR")
             raise e
     
@@ -191,3 +265,113 @@ def execute_agent(agent_callable: Callable[..., Any], agent_name: str,
     # No execution, duration = 0
     _append_runlog(agent_name, status, timestamp, 0, tool_risks, level="INFO")
     return {"status": "blocked", "message": "Run blocked due to interval constraint."}
+
+
+class PipelineNode:
+    """One step of a pipeline: a callable plus the data it reads and writes."""
+
+    def __init__(self, name: str, func: Callable[[], Any],
+                 inputs: Sequence[str] = (), outputs: Sequence[str] = ()) -> None:
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+
+
+def pipeline_dependencies(nodes: Sequence[PipelineNode]) -> Dict[str, List[str]]:
+    """The earlier nodes each node has to wait for.
+
+    Nodes are in pipeline order. A node waits for an earlier one when it reads
+    what that one writes, writes what it reads, or writes the same data;
+    otherwise they may run at the same time.
+    """
+    dependencies: Dict[str, List[str]] = {}
+    for i, node in enumerate(nodes):
+        reads, writes = set(node.inputs), set(node.outputs)
+        dependencies[node.name] = [
+            earlier.name for earlier in nodes[:i]
+            if set(earlier.outputs) & (reads | writes) or set(earlier.inputs) & writes
+        ]
+    return dependencies
+
+
+def run_dag(nodes: Sequence[PipelineNode], workers: int = PIPELINE_WORKERS) -> Dict[str, Dict[str, Any]]:
+    """Run pipeline nodes concurrently as their dependencies finish.
+
+    Up to ``workers`` nodes run at once in a thread pool. A node whose
+    dependency failed still runs, as in the sequential pipeline.
+
+    Returns:
+        Per node, in pipeline order: ``status`` ("success" or "exception"),
+        ``result`` or ``error``, and ``started``/``duration`` in seconds
+        from the start of the run.
+    """
+    dependencies = pipeline_dependencies(nodes)
+    by_name = {node.name: node for node in nodes}
+    records: Dict[str, Dict[str, Any]] = {}
+    pending = dict(dependencies)
+    running: Dict[Future, str] = {}
+    start = time.perf_counter()
+
+    def run_node(node: PipelineNode) -> Dict[str, Any]:
+        started = time.perf_counter()
+        record: Dict[str, Any] = {"started": round(started - start, 3)}
+        try:
+            record.update(status="success", result=node.func())
+        except Exception as e:
+            record.update(status="exception", error=str(e), traceback=traceback.format_exc())
+        record["duration"] = round(time.perf_counter() - started, 3)
+        return record
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        while pending or running:
+            ready = [name for name, needs in pending.items() if all(n in records for n in needs)]
+            for name in ready:
+                del pending[name]
+                running[pool.submit(run_node, by_name[name])] = name
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                records[running.pop(future)] = future.result()
+    return {node.name: records[node.name] for node in nodes}
+
+
+def _run_registered(agent_name: str) -> Any:
+    """Run a registered agent by name (in a worker process, without bookkeeping)."""
+    return AGENT_REGISTRY[agent_name]()
+
+
+def run_pipeline(agent_names: Sequence[str], interval_hours: int = 24, allow_high_risk: bool = False,
+                 workers: int = PIPELINE_WORKERS, executor: str = "thread",
+                 timeout: Optional[float] = None, memory_mb: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+    """Run registered agents as a DAG built from ``AGENT_IO``.
+
+    Each agent goes through ``execute_agent`` (risk and interval checks, run
+    log). With ``executor="process"`` the agent itself runs isolated in a pool
+    of ``workers`` processes, so CPU-bound agents do not share the GIL and
+    ``timeout``/``memory_mb`` apply to each agent; scheduling and bookkeeping
+    stay in this process.
+
+    Returns:
+        ``run_dag`` records per agent; unknown agents get status "not_found".
+    """
+    if executor not in ("thread", "process"):
+        raise ValueError(f"executor must be 'thread' or 'process', not {executor!r}")
+    known = [name for name in agent_names if name in AGENT_REGISTRY]
+    processes = AgentProcessPool(workers) if executor == "process" else None
+
+    def node_func(name: str) -> Callable[[], Any]:
+        if processes is None:
+            return lambda: execute_agent(AGENT_REGISTRY[name], name, interval_hours, allow_high_risk,
+                                         isolation="inline")
+        # the agent is looked up in the worker, so this process never imports it
+        return lambda: execute_agent(functools.partial(_run_registered, name), name, interval_hours,
+                                     allow_high_risk, isolation="process", timeout=timeout,
+                                     memory_mb=memory_mb, pool=processes)
+
+    nodes = [PipelineNode(name, node_func(name), **AGENT_IO.get(name, {})) for name in known]
+    try:
+        records = run_dag(nodes, workers)
+    finally:
+        if processes is not None:
+            processes.shutdown()
+    return {name: records.get(name, {"status": "not_found"}) for name in agent_names}
@@ -0,0 +1,309 @@
+"""
+Compact columnar container for ACLED events.
+
+Agents used to hand each other lists of ACLED dicts, one dict with 30-odd
+string keys per event. ``EventTable`` holds the same events as one array
+per column instead:
+
+- numeric columns (``NUMERIC_DTYPES``: coordinates, fatalities, timestamp)
+  are typed NumPy arrays
+- every other column is interned: an int32 code per event into a
+  vocabulary holding each distinct value once (-1 for a missing value), so
+  repeated country, actor, date and event-type strings are stored once
+
+Row access goes through ``EventRow``, a slotted read-only mapping over one
+row, so code written for event dicts (``event.get("fatalities", 0)``) works
+unchanged. Slicing and ``take`` share the vocabularies, and slices are
+NumPy views, so passing a table or part of it between agents copies
+nothing. ``from_records``/``to_records``, ``from_frame``/``to_frame`` and
+``to_json``/``from_json`` convert at the edges.
+"""
+
+import json
+import os
+import sys
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+# Add the parent directory to the Python path to make imports work
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+# Columns stored as typed arrays; integer columns use 0 for a missing value
+NUMERIC_DTYPES = {"latitude": "float64", "longitude": "float64", "fatalities": "int32", "timestamp": "int64"}
+
+# (data, vocabulary): codes into the vocabulary, or typed values when it is None
+Column = Tuple[np.ndarray, Optional[np.ndarray]]
+
+
+def _numeric(values: Sequence[Any], dtype: str) -> np.ndarray:
+    """Convert raw values (ACLED sends numbers as strings) to ``dtype``."""
+    try:
+        return np.array(values, dtype=dtype)
+    except (ValueError, TypeError):
+        pass
+    numeric = pd.to_numeric(pd.Series(values, dtype=object), errors="coerce")
+    if np.dtype(dtype).kind in "iu":
+        numeric = numeric.fillna(0)
+    return numeric.to_numpy(dtype=dtype)
+
+
+def _intern(values: Any) -> Column:
+    """Codes (-1 for missing) and the distinct values, in order of appearance."""
+    codes, vocab = pd.factorize(pd.Series(values, dtype=object))
+    return codes.astype(np.int32), np.asarray(vocab, dtype=object)
+
+
+def _python(value: Any) -> Any:
+    """A NumPy scalar as a plain Python value; None for NaN/NaT."""
+    if isinstance(value, np.datetime64):
+        return None if np.isnat(value) else pd.Timestamp(value)
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and value != value:
+        return None
+    return value
+
+
+class EventRow(Mapping):
+    """Read-only view of one row of an ``EventTable``."""
+
+    __slots__ = ("_table", "_index")
+
+    def __init__(self, table: "EventTable", index: int) -> None:
+        self._table = table
+        self._index = index
+
+    def __getitem__(self, key: str) -> Any:
+        data, vocab = self._table._columns[key]
+        value = data[self._index]
+        if vocab is None:
+            return _python(value)
+        return None if value < 0 else vocab[value]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._table._columns)
+
+    def __len__(self) -> int:
+        return len(self._table._columns)
+
+    def __repr__(self) -> str:
+        return f"EventRow({self.to_dict()!r})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.items())
+
+
+class EventTable:
+    """Events stored column by column; see the module docstring."""
+
+    def __init__(self, columns: Dict[str, Column], length: int) -> None:
+        self._columns = columns
+        self._length = length
+
+    # ─── Construction ─────────────────────────────────────────────────────
+
+    @classmethod
+    def from_records(cls, records: Iterable[Mapping]) -> "EventTable":
+        """Build a table from event dicts; a key missing from an event is a null."""
+        records = records if isinstance(records, list) else list(records)
+        names: Dict[str, None] = {}
+        keys = None
+        for record in records:
+            if record.keys() != keys:  # events of one feed mostly share their keys
+                keys = record.keys()
+                names.update(dict.fromkeys(keys))
+        columns = {}
+        for name in names:
+            values = [record.get(name) for record in records]
+            if name in NUMERIC_DTYPES:
+                columns[name] = (_numeric(values, NUMERIC_DTYPES[name]), None)
+            else:
+                columns[name] = _intern(values)
+        return cls(columns, len(records))
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame) -> "EventTable":
+        """Build a table from a DataFrame, reusing categorical codes and numeric arrays."""
+        columns = {}
+        for name in frame.columns:
+            series = frame[name]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                columns[name] = (series.cat.codes.to_numpy().astype(np.int32),
+                                 np.asarray(series.cat.categories, dtype=object))
+            elif series.dtype.kind in "biufM":
+                columns[name] = (series.to_numpy(), None)
+            else:
+                columns[name] = _intern(series.to_numpy(dtype=object))
+        return cls(columns, len(frame))
+
+    @classmethod
+    def from_dict(cls, payload: Dict[str, Any]) -> "EventTable":
+        """Inverse of ``to_dict``."""
+        columns = {}
+        for name, column in payload["columns"].items():
+            if "values" in column:
+                columns[name] = (np.asarray(column["codes"], dtype=np.int32),
+                                 np.asarray(column["values"], dtype=object))
+            elif column["dtype"].startswith("datetime"):
+                columns[name] = (pd.to_datetime(pd.Series(column["data"], dtype=object)).to_numpy(), None)
+            else:
+                columns[name] = (np.array([np.nan if v is None else v for v in column["data"]],
+                                          dtype=column["dtype"]), None)
+        return cls(columns, payload["length"])
+
+    @classmethod
+    def from_json(cls, text: Union[str, bytes]) -> "EventTable":
+        """Table from ``to_json`` output or from a JSON array of event dicts."""
+        payload = json.loads(text)
+        if isinstance(payload, list):
+            return cls.from_records(payload)
+        return cls.from_dict(payload)
+
+    @classmethod
+    def concat(cls, tables: Sequence["EventTable"]) -> "EventTable":
+        """Stack tables; vocabularies are merged and codes renumbered."""
+        tables = [table for table in tables if len(table)] or list(tables[:1])
+        if not tables:
+            return cls({}, 0)
+        if len(tables) == 1:
+            return tables[0]
+        names: Dict[str, None] = {}
+        for table in tables:
+            names.update(dict.fromkeys(table.columns))
+        length = sum(len(table) for table in tables)
+        columns = {}
+        for name in names:
+            parts = [table._columns.get(name) for table in tables]
+            typed = [part for part in parts if part is not None and part[1] is None]
+            if typed and all(part is None or part[1] is None for part in parts):
+                # a table without the column contributes nulls (0 for integers)
+                dtype = str(typed[0][0].dtype)
+                columns[name] = (np.concatenate([_numeric([None] * len(table), dtype) if part is None else part[0]
+                                                 for table, part in zip(tables, parts)]), None)
+                continue
+            # interned, or mixed with typed/absent parts: intern the decoded values
+            if typed or any(part is None for part in parts):
+                values = np.concatenate([table.column(name) if name in table._columns
+                                         else np.full(len(table), None, dtype=object) for table in tables])
+                columns[name] = _intern(values)
+                continue
+            vocab = pd.Index(np.concatenate([v for _, v in parts])).unique()
+            codes = []
+            for data, values in parts:
+                remap = np.append(vocab.get_indexer(values), -1).astype(np.int32)  # remap[-1] keeps nulls
+                codes.append(remap[data])
+            columns[name] = (np.concatenate(codes), np.asarray(vocab, dtype=object))
+        return cls(columns, length)
+
+    # ─── Access ───────────────────────────────────────────────────────────
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self._columns)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._columns
+
+    def __iter__(self) -> Iterator[EventRow]:
+        return (EventRow(self, i) for i in range(self._length))
+
+    def __getitem__(self, key: Any) -> Any:
+        """``table[i]`` is an ``EventRow``, ``table["col"]`` a column and
+        ``table[slice/mask/indices]`` a table of those rows."""
+        if isinstance(key, str):
+            return self.column(key)
+        if isinstance(key, (int, np.integer)):
+            index = int(key) + (self._length if key < 0 else 0)
+            if not 0 <= index < self._length:
+                raise IndexError(f"row {key} out of range for {self._length} events")
+            return EventRow(self, index)
+        return self.take(key)
+
+    def __repr__(self) -> str:
+        return f"EventTable({self._length} events, {len(self._columns)} columns)"
+
+    def column(self, name: str) -> np.ndarray:
+        """A column's values: the typed array itself, or decoded objects (None when missing)."""
+        data, vocab = self._columns[name]
+        if vocab is None:
+            return data
+        return np.append(vocab, None)[data]
+
+    def codes(self, name: str) -> Tuple[np.ndarray, np.ndarray]:
+        """(codes, vocabulary) of an interned column, for grouping without decoding."""
+        data, vocab = self._columns[name]
+        if vocab is None:
+            raise TypeError(f"column {name!r} is numeric, not interned")
+        return data, vocab
+
+    def take(self, rows: Any) -> "EventTable":
+        """The rows selected by a slice, boolean mask or index array.
+
+        Vocabularies are shared, and a slice gives views of the arrays.
+        """
+        if not isinstance(rows, slice):
+            rows = np.asarray(rows)
+            if rows.dtype == bool:
+                rows = np.flatnonzero(rows)
+        columns = {name: (data[rows], vocab) for name, (data, vocab) in self._columns.items()}
+        length = len(range(self._length)[rows]) if isinstance(rows, slice) else len(rows)
+        return EventTable(columns, length)
+
+    def select(self, names: Sequence[str]) -> "EventTable":
+        """A table with only the ``names`` columns (no copy)."""
+        return EventTable({name: self._columns[name] for name in names}, self._length)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the arrays and the vocabulary values."""
+        total = 0
+        for data, vocab in self._columns.values():
+            total += data.nbytes
+            if vocab is not None:
+                total += vocab.nbytes + sum(sys.getsizeof(value) for value in vocab)
+        return total
+
+    # ─── Conversion ───────────────────────────────────────────────────────
+
+    def to_frame(self, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """DataFrame with interned columns as categoricals and typed columns as is."""
+        frame = {}
+        for name in columns or self._columns:
+            data, vocab = self._columns[name]
+            frame[name] = data if vocab is None else pd.Categorical.from_codes(data, categories=vocab)
+        return pd.DataFrame(frame, columns=list(columns or self._columns))
+
+    def to_records(self, columns: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """Plain event dicts (every event has every column; missing values are None)."""
+        names = list(columns or self._columns)
+        values = []
+        for name in names:
+            data, vocab = self._columns[name]
+            if vocab is not None:
+                values.append(np.append(vocab, None)[data].tolist())
+            else:
+                values.append([_python(value) for value in data] if data.dtype.kind in "fM" else data.tolist())
+        return [dict(zip(names, row)) for row in zip(*values)]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable columnar form: codes plus values for interned columns."""
+        columns = {}
+        for name, (data, vocab) in self._columns.items():
+            if vocab is not None:
+                columns[name] = {"codes": data.tolist(), "values": [_python(v) for v in vocab]}
+            elif data.dtype.kind == "M":
+                columns[name] = {"dtype": str(data.dtype),
+                                 "data": [None if v is None else v.isoformat() for v in map(_python, data)]}
+            else:
+                columns[name] = {"dtype": str(data.dtype),
+                                 "data": [_python(v) for v in data] if data.dtype.kind == "f" else data.tolist()}
+        return {"length": self._length, "columns": columns}
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict())
@@ -0,0 +1,61 @@
+"""
+Shared HTTP session for ForgeNews fetchers.
+
+One pooled ``requests.Session`` per process keeps connections alive across
+requests and retries transient failures with jittered exponential backoff.
+"""
+
+import os
+import sys
+import threading
+from typing import Optional
+
+import requests  # type: ignore
+from requests.adapters import HTTPAdapter  # type: ignore
+from urllib3.util.retry import Retry
+
+# Add the parent directory to the Python path to make imports work
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+RETRY_TOTAL = int(os.getenv("FORGENEWS_HTTP_RETRIES", "4"))
+RETRY_BACKOFF = float(os.getenv("FORGENEWS_HTTP_BACKOFF", "0.5"))
+RETRY_JITTER = float(os.getenv("FORGENEWS_HTTP_JITTER", "0.5"))
+POOL_SIZE = int(os.getenv("FORGENEWS_HTTP_POOL", "16"))
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def build_session(retries: int = RETRY_TOTAL,
+                  backoff: float = RETRY_BACKOFF,
+                  jitter: float = RETRY_JITTER,
+                  pool_size: int = POOL_SIZE) -> requests.Session:
+    """Create a keep-alive session with bounded, jittered retries."""
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=retries,
+        status=retries,
+        backoff_factor=backoff,
+        backoff_jitter=jitter,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=pool_size, pool_maxsize=pool_size)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide session, creating it on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = build_session()
+    return _session
@@ -0,0 +1,198 @@
+"""
+On-disk HTTP cache for source fetchers.
+
+Responses are stored as ``<key>.body`` plus a ``<key>.json`` metadata file
+holding the ETag / Last-Modified validators and the fetch time. Within a
+source's TTL the body is served straight from disk; after that the request is
+revalidated with If-None-Match / If-Modified-Since and a 304 reuses the cached
+body. Secrets (API keys, emails) are left out of the cache key.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, Mapping, Optional, Tuple
+from urllib.parse import urlencode
+
+import requests  # type: ignore
+
+# Add the parent directory to the Python path to make imports work
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.core.http import get_session
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = os.getenv("FORGENEWS_HTTP_CACHE", os.path.join("data", ".http_cache"))
+OFFLINE = os.getenv("FORGENEWS_HTTP_OFFLINE", "").lower() in ("1", "true", "yes")
+DEFAULT_TTL = int(os.getenv("FORGENEWS_HTTP_TTL", "3600"))
+
+# Seconds a cached body is served without revalidating, per source id.
+# Override any of them with FORGENEWS_HTTP_TTL_<SOURCE>, e.g. FORGENEWS_HTTP_TTL_ARXIV.
+SOURCE_TTLS: Dict[str, int] = {
+    "arxiv": 12 * 3600,
+    "fred": 12 * 3600,
+    "stooq": 3600,
+    "gdelt": 900,
+}
+
+SECRET_PARAMS = frozenset({"api_key", "apikey", "key", "token", "email"})
+
+
+class CacheMiss(Exception):
+    """Raised in offline mode when a request has no cached response."""
+
+
+class CachedResponse:
+    """Minimal stand-in for ``requests.Response`` backed by the cache."""
+
+    def __init__(self, url: str, status_code: int, content: bytes,
+                 headers: Mapping[str, str], from_cache: bool) -> None:
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+        self.from_cache = from_cache
+
+    @property
+    def text(self) -> str:
+        content_type = self.headers.get("Content-Type", "")
+        encoding = "utf-8"
+        if "charset=" in content_type:
+            encoding = content_type.split("charset=", 1)[1].split(";")[0].strip() or encoding
+        return self.content.decode(encoding, errors="replace")
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+
+def source_ttl(source: Optional[str]) -> int:
+    if not source:
+        return DEFAULT_TTL
+    env = os.getenv(f"FORGENEWS_HTTP_TTL_{source.upper()}")
+    if env is not None:
+        return int(env)
+    return SOURCE_TTLS.get(source, DEFAULT_TTL)
+
+
+def cache_key(url: str, params: Optional[Dict[str, Any]] = None) -> str:
+    public = sorted((k, str(v)) for k, v in (params or {}).items()
+                    if v is not None and k.lower() not in SECRET_PARAMS)
+    return hashlib.sha256(f"{url}?{urlencode(public)}".encode("utf-8")).hexdigest()
+
+
+def _paths(key: str) -> Tuple[str, str]:
+    base = os.path.join(CACHE_DIR, key)
+    return f"{base}.body", f"{base}.json"
+
+
+def _read(key: str) -> Optional[Tuple[Dict[str, Any], bytes]]:
+    body_path, meta_path = _paths(key)
+    try:
+        with open(meta_path, "r") as f:
+            meta = json.load(f)
+        with open(body_path, "rb") as f:
+            return meta, f.read()
+    except (OSError, ValueError):
+        return None
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _write_meta(key: str, meta: Dict[str, Any]) -> None:
+    _write_atomic(_paths(key)[1], json.dumps(meta).encode("utf-8"))
+
+
+def store_response(url: str, content: bytes, params: Optional[Dict[str, Any]] = None,
+                   headers: Optional[Mapping[str, str]] = None,
+                   fetched_at: Optional[float] = None) -> str:
+    """Write a response body and its validators to the cache.
+
+    Also used by tests to seed a cache directory.
+
+    Returns:
+        The cache key the response was stored under.
+    """
+    headers = headers or {}
+    key = cache_key(url, params)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    body_path, _ = _paths(key)
+    _write_atomic(body_path, content)
+    _write_meta(key, {
+        "url": url,
+        "etag": headers.get("ETag"),
+        "last_modified": headers.get("Last-Modified"),
+        "content_type": headers.get("Content-Type"),
+        "fetched_at": time.time() if fetched_at is None else fetched_at,
+    })
+    return key
+
+
+def _from_cache(url: str, meta: Dict[str, Any], body: bytes) -> CachedResponse:
+    headers = {"Content-Type": meta["content_type"]} if meta.get("content_type") else {}
+    return CachedResponse(url, 200, body, headers, from_cache=True)
+
+
+def cached_get(url: str, params: Optional[Dict[str, Any]] = None,
+               source: Optional[str] = None, ttl: Optional[int] = None,
+               timeout: Any = 30) -> CachedResponse:
+    """GET ``url`` through the on-disk cache.
+
+    Args:
+        url: Request URL.
+        params: Query parameters; secret ones are sent but not part of the key.
+        source: Source id used to look up the TTL.
+        ttl: Explicit TTL in seconds, overriding the source default.
+        timeout: Passed through to ``requests``.
+
+    Returns:
+        A ``CachedResponse``; ``from_cache`` is True when no body was downloaded.
+
+    Raises:
+        CacheMiss: Offline mode is on and nothing is cached for the request.
+        requests.HTTPError: The server returned an error and nothing is cached.
+    """
+    key = cache_key(url, params)
+    cached = _read(key)
+    ttl = source_ttl(source) if ttl is None else ttl
+
+    if cached is not None:
+        meta, body = cached
+        if OFFLINE or time.time() - meta.get("fetched_at", 0) < ttl:
+            return _from_cache(url, meta, body)
+    elif OFFLINE:
+        raise CacheMiss(f"No cached response for {url} (offline mode)")
+
+    headers: Dict[str, str] = {}
+    if cached is not None:
+        if cached[0].get("etag"):
+            headers["If-None-Match"] = cached[0]["etag"]
+        if cached[0].get("last_modified"):
+            headers["If-Modified-Since"] = cached[0]["last_modified"]
+
+    try:
+        response = get_session().get(url, params=params, headers=headers, timeout=timeout)
+        if response.status_code == 304 and cached is not None:
+            meta, body = cached
+            meta["fetched_at"] = time.time()
+            _write_meta(key, meta)
+            return _from_cache(url, meta, body)
+        response.raise_for_status()
+    except requests.RequestException as e:
+        if cached is None:
+            raise
+        logger.warning(f"Serving stale cache for {url}: {e}")
+        return _from_cache(url, *cached)
+
+    store_response(url, response.content, params, response.headers)
+    return CachedResponse(url, response.status_code, response.content,
+                          response.headers, from_cache=False)
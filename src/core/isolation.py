@@ -0,0 +1,263 @@
+"""
+Process-isolated agent execution.
+
+``AgentProcessPool`` keeps a set of spawned worker processes. Each task runs
+one registered agent in an idle worker. The agent's stdout, stderr and
+logging output are sent back line by line as it runs, and the result is
+returned pickled over the worker's pipe. The parent enforces:
+
+- a wall-clock timeout: a worker that overruns is killed and replaced, and
+  the caller gets ``AgentTimeout``
+- a memory ceiling: ``RLIMIT_AS`` is set in the worker before each task, so
+  a runaway allocation fails inside the agent with ``MemoryError``
+
+Workers are recycled after ``MAX_TASKS`` tasks, and memory an agent
+allocates is freed with its worker rather than kept in the parent, so long
+pipelines keep a flat memory profile.
+"""
+
+import logging
+import multiprocessing
+import os
+import pickle
+import sys
+import threading
+import time
+import traceback
+from typing import Any, Callable, List, Optional, TextIO
+
+# Add the parent directory to the Python path to make imports work
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 0 disables the limit
+AGENT_TIMEOUT = float(os.getenv("FORGENEWS_AGENT_TIMEOUT", "0"))
+AGENT_MEMORY_MB = int(os.getenv("FORGENEWS_AGENT_MEMORY_MB", "0"))
+# tasks a worker runs before it is replaced
+MAX_TASKS = int(os.getenv("FORGENEWS_AGENT_MAX_TASKS", "20"))
+
+logger = logging.getLogger(__name__)
+
+
+class AgentTimeout(TimeoutError):
+    """An isolated agent ran past its timeout; its worker was killed."""
+
+
+class AgentProcessError(RuntimeError):
+    """An isolated agent raised, or its worker died.
+
+    ``remote_traceback`` holds the traceback from the worker, if any.
+    """
+
+    def __init__(self, message: str, remote_traceback: str = "") -> None:
+        super().__init__(message)
+        self.remote_traceback = remote_traceback
+
+
+# ─── Worker side ──────────────────────────────────────────────────────────
+
+
+class _PipeStream:
+    """File-like object sending each complete line to the parent."""
+
+    def __init__(self, conn: Any, name: str) -> None:
+        self._conn = conn
+        self._name = name
+        self._buffer = ""
+
+    def write(self, text: str) -> int:
+        self._buffer += text
+        if "\n" in self._buffer:
+            lines, self._buffer = self._buffer.rsplit("\n", 1)
+            self._conn.send(("log", self._name, lines + "\n"))
+        return len(text)
+
+    def flush(self) -> None:
+        if self._buffer:
+            self._conn.send(("log", self._name, self._buffer))
+            self._buffer = ""
+
+    def isatty(self) -> bool:
+        return False
+
+
+def _set_memory_limit(memory_mb: int) -> None:
+    try:
+        import resource
+    except ImportError:  # not available on Windows
+        return
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    soft = memory_mb * 1024 * 1024 if memory_mb else hard
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (soft, hard))
+
+
+def _resolve(agent_name: str, payload: Optional[bytes]) -> Callable[[], Any]:
+    if payload is not None:
+        return pickle.loads(payload)
+    from src.core.ctrl import AGENT_REGISTRY
+    return AGENT_REGISTRY[agent_name]
+
+
+def _worker_main(conn: Any) -> None:
+    """Run tasks received on ``conn`` until told to stop."""
+    sys.path.insert(0, ROOT_DIR)
+    sys.stdout = _PipeStream(conn, "stdout")
+    sys.stderr = _PipeStream(conn, "stderr")
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+        agent_name, payload, memory_mb = task
+        try:
+            _set_memory_limit(memory_mb)
+            result = _resolve(agent_name, payload)()
+            sys.stdout.flush()
+            sys.stderr.flush()
+            conn.send(("result", result))
+        except BaseException as e:  # MemoryError and SystemExit included
+            sys.stdout.flush()
+            sys.stderr.flush()
+            conn.send(("error", f"{type(e).__name__}: {e}", traceback.format_exc()))
+        finally:
+            _set_memory_limit(0)
+
+
+# ─── Parent side ──────────────────────────────────────────────────────────
+
+
+class _Worker:
+    def __init__(self, context: Any) -> None:
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.tasks = 0
+
+    def kill(self) -> None:
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(5)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class AgentProcessPool:
+    """A pool of at most ``size`` spawned worker processes; see the module docstring."""
+
+    def __init__(self, size: int = 2, max_tasks: int = MAX_TASKS) -> None:
+        self.size = max(1, size)
+        self.max_tasks = max_tasks
+        self._context = multiprocessing.get_context("spawn")
+        self._idle: List[_Worker] = []
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+
+    def _checkout(self) -> _Worker:
+        self._slots.acquire()
+        with self._lock:
+            while self._idle:
+                worker = self._idle.pop()
+                if worker.process.is_alive():
+                    return worker
+                worker.conn.close()
+        try:
+            return _Worker(self._context)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def _checkin(self, worker: Optional[_Worker]) -> None:
+        if worker is not None:
+            if worker.tasks >= self.max_tasks:
+                worker.stop()
+            else:
+                with self._lock:
+                    self._idle.append(worker)
+        self._slots.release()
+
+    def run(self, agent_name: str, func: Optional[Callable[[], Any]] = None,
+            timeout: Optional[float] = None, memory_mb: Optional[int] = None,
+            stdout: Optional[TextIO] = None, stderr: Optional[TextIO] = None) -> Any:
+        """Run an agent in a worker and return its result.
+
+        Args:
+            agent_name: Registered agent, looked up in the worker's ``AGENT_REGISTRY``.
+            func: Picklable callable to run instead of the registered agent.
+            timeout: Wall-clock seconds (``AGENT_TIMEOUT`` when None; 0 is unlimited).
+            memory_mb: Address space ceiling (``AGENT_MEMORY_MB`` when None; 0 is unlimited).
+            stdout, stderr: Where the agent's output is streamed (this process's by default).
+
+        Raises:
+            AgentTimeout: The agent overran ``timeout``.
+            AgentProcessError: The agent raised, or the worker died.
+        """
+        timeout = AGENT_TIMEOUT if timeout is None else timeout
+        memory_mb = AGENT_MEMORY_MB if memory_mb is None else memory_mb
+        payload = pickle.dumps(func) if func is not None else None
+        streams = {"stdout": stdout or sys.stdout, "stderr": stderr or sys.stderr}
+        deadline = time.monotonic() + timeout if timeout else None
+
+        worker: Optional[_Worker] = self._checkout()
+        try:
+            worker.tasks += 1
+            worker.conn.send((agent_name, payload, memory_mb))
+            while True:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and (remaining <= 0 or not worker.conn.poll(remaining)):
+                    worker.kill()
+                    worker = None
+                    raise AgentTimeout(f"Agent {agent_name} timed out after {timeout:g}s")
+                try:
+                    message = worker.conn.recv()
+                except (EOFError, OSError):
+                    worker.process.join(1)
+                    code = worker.process.exitcode
+                    worker.kill()
+                    worker = None
+                    raise AgentProcessError(f"Worker running {agent_name} exited (code {code})")
+                if message[0] == "log":
+                    streams[message[1]].write(message[2])
+                    streams[message[1]].flush()
+                elif message[0] == "result":
+                    return message[1]
+                else:
+                    raise AgentProcessError(message[1], message[2])
+        finally:
+            self._checkin(worker)
+
+    def shutdown(self) -> None:
+        """Stop the idle workers."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.stop()
+
+
+_pool: Optional[AgentProcessPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool(size: Optional[int] = None) -> AgentProcessPool:
+    """The process-wide pool, created on first use (``size`` defaults to 2)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = AgentProcessPool(size or 2)
+        return _pool
@@ -3,11 +3,19 @@ import os
 from pathlib import Path
 from typing import Dict, Any, Optional
 
+from src.core import artifact_cache
+
 # Define the path to the insights directory relative to the project root
 INSIGHTS_DIR = Path(__file__).resolve().parent.parent.parent / "data" / "processed" / "insights"
 
 def find_latest_insight_file() -> Optional[Path]:
-    """Finds the most recent conflict_insights_*.json file."""
+    """Finds the most recent conflict_insights_*.json file.
+
+    The file recorded by the last InsightAgent run wins over the newest name.
+    """
+    recorded = artifact_cache.latest_output("insights", "insights")
+    if recorded:
+        return Path(recorded)
     if not INSIGHTS_DIR.exists():
         print(f"Error: Insights directory not found at {INSIGHTS_DIR}")
         return None
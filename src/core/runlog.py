@@ -0,0 +1,219 @@
+"""
+Append-only run log of agent executions.
+
+Each entry is one JSON line appended to the active segment file under
+``RUNLOG_DIR`` (``runlog-YYYYMMDD-NNN.ndjson``). The active segment is sealed
+and a new one started when the UTC day changes or it reaches
+``MAX_BYTES``. ``index.json`` lists the sealed segments with the earliest and
+latest entry timestamps and their entry counts, and names the active
+segment. It is only rewritten on rotation, so an append costs one line
+write however long the log grows.
+
+Readers use the index to open only what they need: ``tail`` reads the last
+entries backwards from the newest segments, and ``read_range`` skips
+sealed segments outside the requested time range.
+
+Entries from the old ``logs/runlog.json`` array are copied into a sealed
+``runlog-legacy.ndjson`` segment the first time the log is opened.
+"""
+
+import json
+import os
+import sys
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+# Add the parent directory to the Python path to make imports work
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+RUNLOG_DIR = os.getenv("FORGENEWS_RUNLOG_DIR", os.path.join("logs", "runlog"))
+MAX_BYTES = int(os.getenv("FORGENEWS_RUNLOG_MAX_BYTES", str(5 * 1024 * 1024)))
+LEGACY_PATH = os.path.join("logs", "runlog.json")
+
+_BLOCK = 64 * 1024
+
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(value) if value else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _read_lines(path: str) -> Iterator[Dict[str, Any]]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    try:
+                        yield json.loads(line)
+                    except ValueError:  # a line cut short by a crash
+                        continue
+    except OSError:
+        return
+
+
+def _tail_lines(path: str, n: int) -> List[Dict[str, Any]]:
+    """The last ``n`` entries of a segment, read backwards in blocks."""
+    try:
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            position = f.tell()
+            buffer = b""
+            while position > 0 and buffer.count(b"\n") <= n:
+                size = min(_BLOCK, position)
+                position -= size
+                f.seek(position)
+                buffer = f.read(size) + buffer
+    except OSError:
+        return []
+    entries = []
+    for line in buffer.splitlines()[-n:] if n else []:
+        try:
+            entries.append(json.loads(line))
+        except ValueError:
+            continue
+    return entries
+
+
+class RunLog:
+    """Rotating NDJSON run log; see the module docstring."""
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: Optional[int] = None,
+                 legacy_path: Optional[str] = LEGACY_PATH) -> None:
+        self.directory = directory or RUNLOG_DIR
+        self.max_bytes = MAX_BYTES if max_bytes is None else max_bytes
+        self.legacy_path = legacy_path
+        self.index_path = os.path.join(self.directory, "index.json")
+        self._lock = threading.Lock()
+        self._index: Optional[Dict[str, Any]] = None
+
+    # ─── Index ────────────────────────────────────────────────────────────
+
+    def _load_index(self) -> Dict[str, Any]:
+        if self._index is None:
+            try:
+                with open(self.index_path, "r", encoding="utf-8") as f:
+                    self._index = json.load(f)
+            except (OSError, ValueError):
+                self._index = {"segments": [], "active": None}
+                os.makedirs(self.directory, exist_ok=True)
+                self._import_legacy()
+                self._save_index()
+        return self._index
+
+    def _save_index(self) -> None:
+        tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._index, f, indent=2)
+        os.replace(tmp_path, self.index_path)
+
+    def _summary(self, name: str) -> Dict[str, Any]:
+        """Index record of a segment: its time bounds and entry count."""
+        times = [entry.get("timestamp") for entry in _read_lines(self._path(name))]
+        times = [t for t in times if _parse_time(t)]
+        return {"file": name, "min": min(times, key=_parse_time, default=None),
+                "max": max(times, key=_parse_time, default=None), "count": len(times)}
+
+    def _import_legacy(self) -> None:
+        """Copy the entries of the old JSON-array run log into a sealed segment."""
+        if not self.legacy_path or not os.path.exists(self.legacy_path):
+            return
+        try:
+            with open(self.legacy_path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return
+        name = "runlog-legacy.ndjson"
+        with open(self._path(name), "w", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + "\n")
+        self._index["segments"].append(self._summary(name))
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _active(self, day: str) -> str:
+        """Name of the segment to append to, rotating by day and size."""
+        index = self._load_index()
+        active = index.get("active")
+        if active:
+            path = self._path(active)
+            same_day = active.split("-")[1] == day
+            if same_day and (not os.path.exists(path) or os.path.getsize(path) < self.max_bytes):
+                return active
+            index["segments"].append(self._summary(active))
+        sequence = sum(1 for s in index["segments"] if s["file"].startswith(f"runlog-{day}-"))
+        index["active"] = f"runlog-{day}-{sequence:03d}.ndjson"
+        self._save_index()
+        return index["active"]
+
+    def segments(self) -> List[Dict[str, Any]]:
+        """Index records of the sealed segments plus the active one (bounds None), oldest first."""
+        with self._lock:
+            index = self._load_index()
+            records = [dict(s) for s in index["segments"]]
+            if index.get("active"):
+                records.append({"file": index["active"], "min": None, "max": None, "count": None})
+        return records
+
+    # ─── Writing ──────────────────────────────────────────────────────────
+
+    def append(self, entry: Dict[str, Any]) -> None:
+        """Append one entry as a single line to the active segment."""
+        line = (json.dumps(entry) + "\n").encode("utf-8")
+        with self._lock:
+            name = self._active(datetime.utcnow().strftime("%Y%m%d"))
+            # O_APPEND: one write per entry, so lines never interleave
+            fd = os.open(self._path(name), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line)
+            finally:
+                os.close(fd)
+
+    # ─── Reading ──────────────────────────────────────────────────────────
+
+    def tail(self, n: int = 100) -> List[Dict[str, Any]]:
+        """The last ``n`` entries, oldest first."""
+        entries: List[Dict[str, Any]] = []
+        for record in reversed(self.segments()):
+            if len(entries) >= n:
+                break
+            entries = _tail_lines(self._path(record["file"]), n - len(entries)) + entries
+        return entries
+
+    def read_range(self, start: Optional[str] = None, end: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Entries with ``start <= timestamp <= end`` (ISO strings; None is open).
+
+        Sealed segments entirely outside the range are not opened. An
+        unparseable bound is ignored.
+        """
+        low, high = _parse_time(start), _parse_time(end)
+        entries = []
+        for record in self.segments():
+            seg_min, seg_max = _parse_time(record["min"]), _parse_time(record["max"])
+            if record["count"] is not None:
+                if not record["count"] or (low and seg_max < low) or (high and seg_min > high):
+                    continue
+            for entry in _read_lines(self._path(record["file"])):
+                stamp = _parse_time(entry.get("timestamp"))
+                if (low or high) and stamp is None:
+                    continue
+                if (low and stamp < low) or (high and stamp > high):
+                    continue
+                entries.append(entry)
+        return entries
+
+
+_default: Optional[RunLog] = None
+_default_lock = threading.Lock()
+
+
+def get_runlog() -> RunLog:
+    """The process-wide run log in ``RUNLOG_DIR``."""
+    global _default
+    with _default_lock:
+        if _default is None or _default.directory != RUNLOG_DIR:
+            _default = RunLog(RUNLOG_DIR)
+        return _default
@@ -0,0 +1,311 @@
+"""
+Columnar raw archive of ACLED events.
+
+Each ingestion run writes ``conflict_<date>.cols.zip``, merged with the
+file already there for that date: events are buffered
+into row groups and every column of a group is stored as its own deflated
+JSON array (``g00000/latitude.json`` ...), with a ``_meta.json`` listing the
+groups. Readers open only the members for the columns they ask for, so a map
+that needs latitude/longitude/event_type never decompresses or parses the
+notes and actor text. Numeric and date columns come back typed. Legacy
+``conflict_<date>.json`` arrays are still readable through the same API.
+"""
+
+import glob
+import json
+import os
+import re
+import sys
+import zipfile
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+# Add the parent directory to the Python path to make imports work
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+ARCHIVE_EXT = ".cols.zip"
+LEGACY_EXT = ".json"
+GROUP_ROWS = 5000
+_NAME_RE = re.compile(r"^conflict_(\d{4}-\d{2}-\d{2})(\.cols\.zip|\.json)$")
+
+# dtype applied by read_archive to known ACLED columns
+NUMERIC_COLUMNS = {"latitude": "float64", "longitude": "float64", "fatalities": "int64", "timestamp": "int64"}
+DATE_COLUMNS = ("event_date",)
+
+
+def archive_path(raw_dir: str, day: str) -> str:
+    return os.path.join(str(raw_dir), f"conflict_{day}{ARCHIVE_EXT}")
+
+
+def _member(group: int, column: str) -> str:
+    return f"g{group:05d}/{column}.json"
+
+
+class ArchiveWriter:
+    """Append events to a columnar archive in row groups of ``group_rows``.
+
+    Members go to a temporary file that replaces ``path`` on a clean exit
+    when at least one event was written; otherwise any existing archive is
+    kept. At most one row group is buffered in memory.
+
+    With ``merge=True`` the events of an existing archive at ``path`` are
+    carried over after the new ones, except those whose ``event_id_cnty``
+    was written again (a newer copy of the event), so a second run on the
+    same day adds to the day's archive instead of replacing it.
+    """
+
+    def __init__(self, path: str, group_rows: int = GROUP_ROWS, merge: bool = False) -> None:
+        self.path = str(path)
+        self.tmp_path = f"{self.path}.tmp"
+        self.group_rows = group_rows
+        self.merge = merge
+        self.count = 0
+        # ids written by this writer, to drop their older copies when merging
+        self._ids: set = set()
+        self.groups: List[Dict[str, Any]] = []
+        self._buffer: List[Dict[str, Any]] = []
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._zip: Optional[zipfile.ZipFile] = zipfile.ZipFile(
+            self.tmp_path, "w", compression=zipfile.ZIP_DEFLATED)
+
+    def __enter__(self) -> "ArchiveWriter":
+        return self
+
+    def write_all(self, events: Iterable[Dict[str, Any]]) -> None:
+        for event in events:
+            if self.merge and event.get("event_id_cnty") is not None:
+                self._ids.add(event["event_id_cnty"])
+            self._buffer.append(event)
+            self.count += 1
+            if len(self._buffer) >= self.group_rows:
+                self._flush_group()
+
+    def _flush_group(self) -> None:
+        if not self._buffer or self._zip is None:
+            return
+        columns: Dict[str, None] = {}
+        for event in self._buffer:
+            columns.update(dict.fromkeys(event))
+        group = len(self.groups)
+        for col in columns:
+            values = [event.get(col) for event in self._buffer]
+            self._zip.writestr(_member(group, col), json.dumps(values, separators=(",", ":")))
+        self.groups.append({"rows": len(self._buffer), "columns": list(columns)})
+        self._buffer = []
+
+    def close(self, keep: bool = True) -> None:
+        if self._zip is None:
+            return
+        if keep and self.merge and self.count and os.path.exists(self.path):
+            self.write_all(event for event in iter_archive(self.path)
+                           if event.get("event_id_cnty") is None or event["event_id_cnty"] not in self._ids)
+        if keep:
+            self._flush_group()
+            self._zip.writestr("_meta.json", json.dumps({"rows": self.count, "groups": self.groups}))
+        self._zip.close()
+        self._zip = None
+        if keep and self.count:
+            os.replace(self.tmp_path, self.path)
+        else:
+            os.remove(self.tmp_path)
+
+    def __exit__(self, exc_type: Any, *exc: Any) -> None:
+        self.close(keep=exc_type is None)
+
+
+def _legacy_events(path: str) -> List[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        raw = json.load(f)
+    records = raw.get("data") if isinstance(raw, dict) else raw
+    if not isinstance(records, list):
+        return []
+    # Older runs wrapped each event as {"flagged": ..., "event": {...}}
+    records = [r["event"] if isinstance(r, dict) and "event" in r else r for r in records]
+    return [r for r in records if isinstance(r, dict)]
+
+
+def _read_meta(path: str) -> Dict[str, Any]:
+    with zipfile.ZipFile(path) as zf:
+        return json.loads(zf.read("_meta.json"))
+
+
+def _iter_groups(path: str, columns: Optional[List[str]],
+                 groups: Optional[Iterable[int]] = None) -> Iterator[Tuple[int, Dict[str, List[Any]]]]:
+    """Yield ``(rows, {column: values})`` for each row group of ``path``, or only ``groups``."""
+    with zipfile.ZipFile(path) as zf:
+        meta = json.loads(zf.read("_meta.json"))
+        wanted_groups = range(len(meta["groups"])) if groups is None else groups
+        for group in wanted_groups:
+            info = meta["groups"][group]
+            wanted = info["columns"] if columns is None else columns
+            values: Dict[str, List[Any]] = {}
+            for col in wanted:
+                if col in info["columns"]:
+                    values[col] = json.loads(zf.read(_member(group, col)))
+                else:
+                    values[col] = [None] * info["rows"]
+            yield info["rows"], values
+
+
+def iter_archive(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield the events stored in an archive file, one at a time."""
+    path = str(path)
+    if not path.endswith(ARCHIVE_EXT):
+        yield from _legacy_events(path)
+        return
+    for rows, values in _iter_groups(path, None):
+        for i in range(rows):
+            # fields missing from an event are stored as null, so nulls are dropped
+            yield {col: vals[i] for col, vals in values.items() if vals[i] is not None}
+
+
+def _typed(values: List[Any], dtype: Optional[str]) -> Any:
+    """Convert one column of raw values to ``dtype``."""
+    if dtype is None:
+        return pd.Series(values, dtype=object)
+    if dtype == "category":
+        cat = pd.Categorical(values)
+        # ACLED uses "" for a missing actor/location; treat it as missing
+        return cat.remove_categories([""]) if "" in cat.categories else cat
+    if dtype.startswith("datetime"):
+        return pd.to_datetime(pd.Series(values), errors="coerce")
+    try:
+        return np.array(values, dtype=dtype)
+    except (ValueError, TypeError):
+        numeric = pd.to_numeric(pd.Series(values), errors="coerce")
+        if np.dtype(dtype).kind in "iu":
+            numeric = numeric.fillna(0)
+        return numeric.astype(dtype).to_numpy()
+
+
+def _combine(parts: List[Any], dtype: Optional[str]) -> Any:
+    if len(parts) == 1:
+        return parts[0]
+    if dtype == "category":
+        return union_categoricals(parts, sort_categories=True)
+    if isinstance(parts[0], np.ndarray):
+        return np.concatenate(parts)
+    return pd.concat(parts, ignore_index=True)
+
+
+def _legacy_group(path: str, columns: Optional[List[str]]) -> Tuple[int, Dict[str, List[Any]]]:
+    events = _legacy_events(path)
+    wanted = columns or list(dict.fromkeys(col for event in events for col in event))
+    return len(events), {col: [e.get(col) for e in events] for col in wanted}
+
+
+def _group_frame(groups: Iterable[Tuple[int, Dict[str, List[Any]]]], columns: Optional[List[str]],
+                 dtypes: Optional[Dict[str, str]]) -> pd.DataFrame:
+    """Concatenate raw row groups into one typed DataFrame."""
+    types: Dict[str, str] = dict(NUMERIC_COLUMNS, **{col: "datetime64[ns]" for col in DATE_COLUMNS})
+    types.update(dtypes or {})
+
+    parts: Dict[str, List[Any]] = {}
+    rows = 0
+    for group_rows, values in groups:
+        for col in parts.keys() - values.keys():
+            # column absent from this group: pad with nulls
+            values[col] = [None] * group_rows
+        for col, vals in values.items():
+            if col not in parts:
+                parts[col] = [_typed([None] * rows, types.get(col))] if rows else []
+            parts[col].append(_typed(vals, types.get(col)))
+        rows += group_rows
+
+    if not rows:
+        return pd.DataFrame(columns=columns)
+    order = columns or list(parts)
+    return pd.DataFrame({col: _combine(parts[col], types.get(col)) for col in order}, columns=order)
+
+
+def read_archive(paths: Any, columns: Optional[List[str]] = None,
+                 dtypes: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+    """Load one or more archive files into a typed DataFrame.
+
+    Args:
+        paths: An archive path or a list of them, read in order.
+        columns: Columns to load; all columns when omitted. Only these
+            members are decompressed, and missing fields come back as nulls.
+        dtypes: Per-column dtype overrides (e.g. ``"category"``,
+            ``"float32"``), applied group by group as the file is read.
+
+    Returns:
+        DataFrame with ``latitude``/``longitude`` as float, ``fatalities``
+        and ``timestamp`` as int and ``event_date`` as datetime unless
+        ``dtypes`` says otherwise.
+    """
+    if isinstance(paths, (str, os.PathLike)):
+        paths = [paths]
+
+    def groups() -> Iterator[Tuple[int, Dict[str, List[Any]]]]:
+        for path in map(str, paths):
+            if path.endswith(ARCHIVE_EXT):
+                yield from _iter_groups(path, columns)
+            else:
+                yield _legacy_group(path, columns)
+
+    return _group_frame(groups(), columns, dtypes)
+
+
+def read_rows(path: str, rows: Iterable[int], dtypes: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+    """Load the events at positions ``rows`` of one archive, in that order.
+
+    Only the row groups holding them are decompressed, and only the wanted
+    rows are typed. The frame has every column of the file, typed as by
+    ``read_archive``.
+    """
+    path = str(path)
+    rows = np.asarray(list(rows), dtype=np.int64)
+    if not path.endswith(ARCHIVE_EXT):
+        frame = _group_frame([_legacy_group(path, None)], None, dtypes)
+        return frame.iloc[rows].reset_index(drop=True)
+
+    meta = _read_meta(path)
+    sizes = np.array([info["rows"] for info in meta["groups"]], dtype=np.int64)
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    wanted = np.unique(rows)
+    wanted_groups = np.searchsorted(starts, wanted, side="right") - 1
+    groups = np.unique(wanted_groups)
+    columns = list(dict.fromkeys(col for info in meta["groups"] for col in info["columns"]))
+
+    picked: Dict[str, List[Any]] = {col: [] for col in columns}
+    for group, (_, values) in zip(groups, _iter_groups(path, columns, groups.tolist())):
+        local = (wanted[wanted_groups == group] - starts[group]).tolist()
+        for col, vals in values.items():
+            picked[col].extend(vals[i] for i in local)
+
+    frame = _group_frame([(len(wanted), picked)], columns, dtypes)
+    # frame holds the distinct wanted rows in file order
+    return frame.iloc[np.searchsorted(wanted, rows)].reset_index(drop=True)
+
+
+def list_archives(raw_dir: str, start: Optional[str] = None,
+                  end: Optional[str] = None) -> List[Tuple[str, str]]:
+    """Return ``(date, path)`` pairs for archives in ``raw_dir``, oldest first.
+
+    ``start``/``end`` (inclusive ISO dates) select files by the date in their
+    name, so a range query never opens files outside it. When both a
+    columnar and a legacy file exist for a date, the columnar one wins.
+    """
+    by_day: Dict[str, str] = {}
+    for path in glob.glob(os.path.join(str(raw_dir), "conflict_*")):
+        match = _NAME_RE.match(os.path.basename(path))
+        if not match:
+            continue
+        day, ext = match.groups()
+        if (start and day < start) or (end and day > end):
+            continue
+        if ext == ARCHIVE_EXT or day not in by_day:
+            by_day[day] = path
+    return sorted(by_day.items())
+
+
+def latest_archive(raw_dir: str) -> Optional[str]:
+    """Path of the most recently modified archive in ``raw_dir``, if any."""
+    archives = [path for _, path in list_archives(raw_dir)]
+    return max(archives, key=os.path.getmtime) if archives else None
@@ -1,17 +1,62 @@
 import sqlite3
 import os
 import sys
-from typing import Dict
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
 
 # Add the parent directory to the Python path to make imports work
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
 DB_PATH = os.path.join(os.path.dirname(__file__), "conflict_data.db")
 
-def init_db():
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("""
+# Table columns paired with the ACLED field that feeds them
+EVENT_COLUMNS: List[Tuple[str, str]] = [
+    ("id", "event_id_cnty"),
+    ("event_date", "event_date"),
+    ("event_type", "event_type"),
+    ("sub_event_type", "sub_event_type"),
+    ("actor1", "actor1"),
+    ("actor2", "actor2"),
+    ("assoc_actor_1", "assoc_actor_1"),
+    ("assoc_actor_2", "assoc_actor_2"),
+    ("fatalities", "fatalities"),
+    ("region", "region"),
+    ("country", "country"),
+    ("admin1", "admin1"),
+    ("admin2", "admin2"),
+    ("city", "location"),
+    ("lat", "latitude"),
+    ("lon", "longitude"),
+    ("source", "source"),
+    ("description", "notes"),
+    ("tags", "tags"),
+    ("acled_timestamp", "timestamp"),
+]
+
+INSERT_SQL = (
+    "INSERT OR IGNORE INTO conflict_events ("
+    + ", ".join(col for col, _ in EVENT_COLUMNS)
+    + ") VALUES ("
+    + ", ".join("?" for _ in EVENT_COLUMNS)
+    + ");"
+)
+
+# Insert new events and overwrite existing ones when ACLED has a newer revision
+UPSERT_SQL = (
+    INSERT_SQL.replace("INSERT OR IGNORE", "INSERT", 1)[:-1]
+    + " ON CONFLICT (id) DO UPDATE SET "
+    + ", ".join(f"{col} = excluded.{col}" for col, _ in EVENT_COLUMNS if col != "id")
+    + " WHERE excluded.acled_timestamp > IFNULL(conflict_events.acled_timestamp, -1);"
+)
+
+def _connect(db_path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL;")
+    conn.execute("PRAGMA synchronous=NORMAL;")
+    return conn
+
+def _create_schema(conn: sqlite3.Connection) -> None:
+    conn.execute("""
         CREATE TABLE IF NOT EXISTS conflict_events (
             id TEXT PRIMARY KEY,
             event_date TEXT,
@@ -35,22 +80,261 @@ def init_db():
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         );
     """)
-    conn.commit()
-    conn.close()
 
-def insert_event(event: Dict) -> None:
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("""
-        INSERT OR IGNORE INTO conflict_events (
-            id, event_date, event_type, sub_event_type, actor1, actor2,
-            assoc_actor_1, assoc_actor_2, fatalities, region, country,
-            admin1, admin2, city, lat, lon, source, description, tags
-        ) VALUES (
-            :event_id_cnty, :event_date, :event_type, :sub_event_type, :actor1, :actor2,
-            :assoc_actor_1, :assoc_actor_2, :fatalities, :region, :country,
-            :admin1, :admin2, :location, :latitude, :longitude, :source, :notes, :tags
+# daily_rollup is keyed on these columns; NULLs are stored as '' so the
+# primary key (and the upsert in the triggers) treats them as one group.
+ROLLUP_COLUMNS = ["event_date", "country", "admin1", "city", "event_type"]
+ROLLUP_KEY = ", ".join(ROLLUP_COLUMNS)
+
+def _rollup_key_values(row: str) -> str:
+    prefix = f"{row}." if row else ""
+    return ", ".join(f"IFNULL({prefix}{col}, '')" for col in ROLLUP_COLUMNS)
+
+def _rollup_add(row: str) -> str:
+    return f"""
+            INSERT INTO daily_rollup ({ROLLUP_KEY}, event_count, fatalities)
+            VALUES ({_rollup_key_values(row)}, 1, IFNULL({row}.fatalities, 0))
+            ON CONFLICT ({ROLLUP_KEY}) DO UPDATE SET
+                event_count = event_count + 1,
+                fatalities = fatalities + excluded.fatalities;"""
+
+def _rollup_remove(row: str) -> str:
+    match = " AND ".join(f"{col} = IFNULL({row}.{col}, '')" for col in ROLLUP_COLUMNS)
+    return f"""
+            UPDATE daily_rollup SET
+                event_count = event_count - 1,
+                fatalities = fatalities - IFNULL({row}.fatalities, 0)
+            WHERE {match};
+            DELETE FROM daily_rollup WHERE event_count <= 0 AND {match};"""
+
+def _add_column(table: str, column: str, declaration: str) -> Callable[[sqlite3.Connection], None]:
+    """Migration step adding a column unless the table already has it."""
+    def step(conn: sqlite3.Connection) -> None:
+        if column not in {row[1] for row in conn.execute(f"PRAGMA table_info({table});")}:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {declaration};")
+    return step
+
+# Ordered schema migrations; PRAGMA user_version records how many have run.
+# A step is an SQL statement or a callable taking the connection.
+MIGRATIONS: List[List[Union[str, Callable[[sqlite3.Connection], None]]]] = [
+    # 1: date-leading indexes for the report_agent summary queries
+    [
+        "CREATE INDEX IF NOT EXISTS idx_events_date_type ON conflict_events (event_date, event_type);",
+        "CREATE INDEX IF NOT EXISTS idx_events_date_country ON conflict_events (event_date, country);",
+        "CREATE INDEX IF NOT EXISTS idx_events_date_city ON conflict_events (event_date, city);",
+    ],
+    # 2: pre-aggregated daily counts kept in step with conflict_events by triggers
+    [
+        """
+        CREATE TABLE IF NOT EXISTS daily_rollup (
+            event_date TEXT NOT NULL,
+            country TEXT NOT NULL,
+            admin1 TEXT NOT NULL,
+            city TEXT NOT NULL,
+            event_type TEXT NOT NULL,
+            event_count INTEGER NOT NULL DEFAULT 0,
+            fatalities INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (event_date, country, admin1, city, event_type)
+        ) WITHOUT ROWID;
+        """,
+        f"""
+        INSERT INTO daily_rollup ({ROLLUP_KEY}, event_count, fatalities)
+        SELECT {_rollup_key_values("")}, COUNT(*), IFNULL(SUM(fatalities), 0)
+        FROM conflict_events
+        GROUP BY 1, 2, 3, 4, 5;
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_rollup_insert AFTER INSERT ON conflict_events
+        BEGIN
+            {_rollup_add("NEW")}
+        END;
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_rollup_delete AFTER DELETE ON conflict_events
+        BEGIN
+            {_rollup_remove("OLD")}
+        END;
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_rollup_update AFTER UPDATE ON conflict_events
+        BEGIN
+            {_rollup_remove("OLD")}
+            {_rollup_add("NEW")}
+        END;
+        """,
+    ],
+    # 3: ACLED revision timestamps and per-region ingestion high-water marks
+    [
+        _add_column("conflict_events", "acled_timestamp", "INTEGER"),
+        """
+        CREATE TABLE IF NOT EXISTS ingest_watermarks (
+            region TEXT PRIMARY KEY,
+            last_event_date TEXT NOT NULL,
+            last_timestamp INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         );
-    """, event)
+        """,
+    ],
+]
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """Create the base table and apply any pending migrations.
+
+    Each migration runs in its own ``BEGIN IMMEDIATE`` transaction, DDL
+    included, together with the ``user_version`` bump: a crash rolls it
+    back whole, and a second process migrating the same database waits for
+    the lock and then sees the new version instead of applying it again.
+
+    Returns:
+        The schema version after migrating.
+    """
+    _create_schema(conn)
     conn.commit()
-    conn.close() 
\ No newline at end of file
+    while True:
+        conn.execute("BEGIN IMMEDIATE;")
+        try:
+            # read under the write lock: another connection may have migrated meanwhile
+            version = conn.execute("PRAGMA user_version;").fetchone()[0]
+            if version >= len(MIGRATIONS):
+                conn.execute("COMMIT;")
+                return version
+            for step in MIGRATIONS[version]:
+                if callable(step):
+                    step(conn)
+                else:
+                    conn.execute(step)
+            conn.execute(f"PRAGMA user_version = {version + 1};")
+            conn.execute("COMMIT;")
+        except BaseException:
+            conn.execute("ROLLBACK;")
+            raise
+
+# Database files this process has already migrated
+_migrated: set = set()
+
+def init_db(db_path: Optional[str] = None) -> None:
+    db_path = db_path or DB_PATH
+    conn = _connect(db_path)
+    try:
+        migrate(conn)
+    finally:
+        conn.close()
+    _migrated.add(os.path.abspath(db_path))
+
+def ensure_db(db_path: Optional[str] = None) -> None:
+    """``init_db`` once per database file and process, for read paths."""
+    db_path = db_path or DB_PATH
+    if os.path.abspath(db_path) in _migrated and os.path.exists(db_path):
+        return
+    init_db(db_path)
+
+def _event_row(event: Dict[str, Any]) -> Tuple[Any, ...]:
+    return tuple(event.get(field) for _, field in EVENT_COLUMNS)
+
+
+class ConflictEventWriter:
+    """Long-lived writer for ``conflict_events``.
+
+    Keeps one connection open in WAL mode with ``synchronous=NORMAL`` and
+    loads events with ``executemany`` in chunked transactions, so a batch of
+    events costs one commit per chunk instead of one per row.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, chunk_size: int = 5000) -> None:
+        self.db_path = db_path or DB_PATH
+        self.chunk_size = chunk_size
+        self.conn = _connect(self.db_path)
+        migrate(self.conn)
+        _migrated.add(os.path.abspath(self.db_path))
+
+    def __enter__(self) -> "ConflictEventWriter":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def insert_events(self, events: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+        """Insert events, skipping ids that already exist.
+
+        Returns:
+            Dict with the number of rows ``inserted`` and ``ignored``.
+        """
+        inserted = ignored = 0
+        rows = map(_event_row, events)
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                break
+            with self.conn:
+                # rowcount excludes the rows the rollup triggers touch
+                added = self.conn.executemany(INSERT_SQL, chunk).rowcount
+            inserted += added
+            ignored += len(chunk) - added
+        return {"inserted": inserted, "ignored": ignored}
+
+    def upsert_events(self, events: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+        """Insert events and apply revisions with a newer ACLED ``timestamp``.
+
+        Updated rows go through the update trigger, so ``daily_rollup``
+        stays consistent with revised dates, locations or fatalities.
+
+        Returns:
+            Dict with the number of rows ``inserted``, ``updated`` and
+            ``ignored`` (already stored at the same or a newer revision).
+        """
+        inserted = updated = ignored = 0
+        rows = map(_event_row, events)
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                break
+            ids = list({row[0] for row in chunk})
+            with self.conn:
+                existing = sum(
+                    self.conn.execute(
+                        f"SELECT COUNT(*) FROM conflict_events WHERE id IN ({', '.join('?' for _ in part)})",
+                        part,
+                    ).fetchone()[0]
+                    for part in (ids[i:i + 500] for i in range(0, len(ids), 500))
+                )
+                changed = self.conn.executemany(UPSERT_SQL, chunk).rowcount
+            added = len(ids) - existing
+            inserted += added
+            updated += changed - added
+            ignored += len(chunk) - changed
+        return {"inserted": inserted, "updated": updated, "ignored": ignored}
+
+    def get_watermark(self, region: str) -> Optional[Dict[str, Any]]:
+        """Return the ingestion high-water mark for ``region``, if any."""
+        row = self.conn.execute(
+            "SELECT last_event_date, last_timestamp FROM ingest_watermarks WHERE region = ?;",
+            (region,),
+        ).fetchone()
+        if row is None:
+            return None
+        return {"last_event_date": row[0], "last_timestamp": row[1]}
+
+    def set_watermark(self, region: str, last_event_date: str, last_timestamp: int) -> None:
+        """Advance the high-water mark for ``region``; it never moves backwards."""
+        with self.conn:
+            self.conn.execute(
+                """
+                INSERT INTO ingest_watermarks (region, last_event_date, last_timestamp)
+                VALUES (?, ?, ?)
+                ON CONFLICT (region) DO UPDATE SET
+                    last_event_date = MAX(last_event_date, excluded.last_event_date),
+                    last_timestamp = MAX(last_timestamp, excluded.last_timestamp),
+                    updated_at = CURRENT_TIMESTAMP;
+                """,
+                (region, last_event_date, int(last_timestamp)),
+            )
+
+
+def insert_event(event: Dict) -> None:
+    with ConflictEventWriter() as writer:
+        writer.insert_events([event])
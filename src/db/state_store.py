@@ -0,0 +1,172 @@
+"""
+SQLite store for the pipeline state (per-agent run history).
+
+One row per agent in ``agent_state``: the last run, last success and last
+failure timestamps, the last duration, and run/failure counts. Each
+``record_run`` is a single upsert, so concurrent runners update their own
+agent's row atomically instead of rewriting a shared JSON file. The
+database runs in WAL mode, so readers such as the API dashboard never wait
+for a writer.
+
+``last_run`` is served from a short in-process cache (``CACHE_TTL``
+seconds) that this process's own writes keep current.
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+# Add the parent directory to the Python path to make imports work
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+CACHE_TTL = float(os.getenv("FORGENEWS_STATE_CACHE_TTL", "2"))
+
+STATE_COLUMNS = ["last_run", "last_success", "last_failure", "last_duration", "run_count", "failure_count"]
+
+UPSERT_SQL = """
+    INSERT INTO agent_state (agent, last_run, last_success, last_failure, last_duration, run_count, failure_count)
+    VALUES (:agent, :at, :success_at, :failure_at, :duration, :runs, :failures)
+    ON CONFLICT (agent) DO UPDATE SET
+        last_run = excluded.last_run,
+        last_success = IFNULL(excluded.last_success, agent_state.last_success),
+        last_failure = IFNULL(excluded.last_failure, agent_state.last_failure),
+        last_duration = IFNULL(excluded.last_duration, agent_state.last_duration),
+        run_count = agent_state.run_count + excluded.run_count,
+        failure_count = agent_state.failure_count + excluded.failure_count;
+"""
+
+
+def _connect(db_path: str, readonly: bool = False) -> sqlite3.Connection:
+    if readonly:
+        conn = sqlite3.connect(f"file:{os.path.abspath(db_path)}?mode=ro", uri=True, check_same_thread=False)
+    else:
+        conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL;")
+        conn.execute("PRAGMA synchronous=NORMAL;")
+    conn.execute("PRAGMA busy_timeout=5000;")
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def _create_schema(conn: sqlite3.Connection) -> None:
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS agent_state (
+            agent TEXT PRIMARY KEY,
+            last_run TEXT,
+            last_success TEXT,
+            last_failure TEXT,
+            last_duration REAL,
+            run_count INTEGER NOT NULL DEFAULT 0,
+            failure_count INTEGER NOT NULL DEFAULT 0
+        );
+    """)
+
+
+class StateStore:
+    """Per-agent run state in SQLite; see the module docstring."""
+
+    def __init__(self, db_path: str, legacy_json: Optional[str] = None) -> None:
+        """
+        Args:
+            db_path: SQLite database file, created if missing.
+            legacy_json: Old ``{agent: last_run}`` JSON state file; its
+                entries are imported when the database is created.
+        """
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._cache: Dict[str, Dict[str, Any]] = {}
+        self._cache_time = 0.0
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = _connect(db_path)
+        with self._lock:
+            _create_schema(self._conn)
+            if legacy_json and os.path.exists(legacy_json):
+                self._import_legacy(legacy_json)
+
+    def _import_legacy(self, path: str) -> None:
+        if self._conn.execute("SELECT 1 FROM agent_state LIMIT 1").fetchone():
+            return
+        try:
+            with open(path, "r") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO agent_state (agent, last_run, run_count) VALUES (?, ?, 1)",
+            [(agent, last_run) for agent, last_run in state.items() if isinstance(last_run, str)])
+
+    # ─── Writing ──────────────────────────────────────────────────────────
+
+    def record_run(self, agent: str, success: bool, duration: Optional[float] = None,
+                   at: Optional[str] = None) -> Dict[str, Any]:
+        """Record one run of ``agent`` in a single atomic upsert; returns its new row."""
+        at = at or datetime.utcnow().isoformat()
+        params = {"agent": agent, "at": at, "duration": duration, "runs": 1,
+                  "success_at": at if success else None, "failure_at": None if success else at,
+                  "failures": 0 if success else 1}
+        with self._lock:
+            self._conn.execute(UPSERT_SQL, params)
+            row = self._row(agent)
+            self._cache[agent] = row
+        return row
+
+    def set_last_run(self, agent: str, last_run: str) -> None:
+        """Overwrite only the last-run timestamp (the old ``save_state`` semantics)."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO agent_state (agent, last_run) VALUES (?, ?) "
+                "ON CONFLICT (agent) DO UPDATE SET last_run = excluded.last_run;", (agent, last_run))
+            self._cache[agent] = self._row(agent)
+
+    # ─── Reading ──────────────────────────────────────────────────────────
+
+    def _row(self, agent: str) -> Optional[Dict[str, Any]]:
+        row = self._conn.execute(
+            f"SELECT {', '.join(STATE_COLUMNS)} FROM agent_state WHERE agent = ?", (agent,)).fetchone()
+        return dict(row) if row else None
+
+    def get(self, agent: str) -> Optional[Dict[str, Any]]:
+        """An agent's state row, from the cache when it is fresh."""
+        with self._lock:
+            if time.monotonic() - self._cache_time > CACHE_TTL:
+                self._cache = {}
+                self._cache_time = time.monotonic()
+            if agent not in self._cache:
+                self._cache[agent] = self._row(agent)
+            return self._cache[agent]
+
+    def last_run(self, agent: str) -> Optional[str]:
+        row = self.get(agent)
+        return row["last_run"] if row else None
+
+    def all(self) -> Dict[str, Dict[str, Any]]:
+        """Every agent's state row, read from the database."""
+        with self._lock:
+            rows = self._conn.execute(f"SELECT agent, {', '.join(STATE_COLUMNS)} FROM agent_state").fetchall()
+        return {row["agent"]: {col: row[col] for col in STATE_COLUMNS} for row in rows}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def read_state(db_path: str) -> Dict[str, Dict[str, Any]]:
+    """Every agent's state row through a read-only connection ({} if there is no database).
+
+    Used by the API so that reading never takes a write lock.
+    """
+    if not os.path.exists(db_path):
+        return {}
+    conn = _connect(db_path, readonly=True)
+    try:
+        rows = conn.execute(f"SELECT agent, {', '.join(STATE_COLUMNS)} FROM agent_state").fetchall()
+    except sqlite3.Error:
+        return {}
+    finally:
+        conn.close()
+    return {row["agent"]: {col: row[col] for col in STATE_COLUMNS} for row in rows}
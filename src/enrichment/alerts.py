@@ -0,0 +1,290 @@
+"""
+Strategic alert detection for ACLED event frames.
+
+Alerts come from a pipeline of detectors registered in ``DETECTORS``. Each
+detector takes an ``AlertTables`` and returns a list of alert dicts. The
+tables (per site, per country, per country and event type, actors seen per
+window) are each built once, on first use, with a single grouping pass over
+the events. A detector therefore reads small precomputed tables instead of
+filtering the full frame for every location, country or actor, and alert
+generation stays linear in the number of events.
+"""
+
+import os
+import sys
+from functools import cached_property
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Add the parent directory to the Python path to make imports work
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.enrichment.profiles import ACTOR_COLUMNS, actor_table, group_codes, group_stats, top_counts
+
+RECENT_DAYS = 30
+# actors seen within this many days before the recent window don't count as history
+HISTORY_GAP_DAYS = 60
+SEVERITY_ORDER = {"High": 0, "Medium": 1, "Low": 2}
+
+Alert = Dict[str, Any]
+
+
+class AlertTables:
+    """Group tables shared by the alert detectors, each computed on first use.
+
+    Args:
+        data: Events with ``event_date``, ``country``, ``location``,
+            ``event_type`` and ``fatalities``, or a pre-aggregated table of
+            them carrying a ``weight`` column.
+        actors: Optional table with ``actor1``/``actor2`` columns next to the
+            same columns as ``data``, for when ``data`` is aggregated without
+            actors. Defaults to ``data``.
+        weight: Column holding the number of events per row, if any.
+    """
+
+    def __init__(self, data: pd.DataFrame, actors: Optional[pd.DataFrame] = None,
+                 weight: Optional[str] = None, recent_days: int = RECENT_DAYS,
+                 history_gap_days: int = HISTORY_GAP_DAYS) -> None:
+        self.data = data
+        self.actors = data if actors is None else actors
+        self.weight = weight
+        dates = data['event_date']
+        self.recent_cutoff = dates.max() - pd.Timedelta(days=recent_days)
+        self.older_cutoff = self.recent_cutoff - pd.Timedelta(days=history_gap_days)
+        self.recent = (dates >= self.recent_cutoff).to_numpy()
+        self.historical = (dates < self.recent_cutoff).to_numpy()
+
+    def _group_table(self, keys: List[str]) -> Tuple[np.ndarray, pd.DataFrame]:
+        """Per-row group ids (-1 for a missing key) and per-group totals."""
+        ids, index = group_codes(self.data, keys)
+        valid = ids >= 0
+        fatalities = self.data['fatalities'].to_numpy(dtype=np.float64)
+        events = self.data[self.weight].to_numpy(dtype=np.float64) if self.weight else None
+
+        def total(mask: np.ndarray, weights: Optional[np.ndarray] = None) -> np.ndarray:
+            counts = np.bincount(ids[mask], weights=None if weights is None else weights[mask],
+                                 minlength=len(index))
+            return counts.astype(np.int64)
+
+        table = pd.DataFrame({
+            'events': total(valid, events),
+            'fatalities': total(valid, fatalities),
+            'recent_events': total(valid & self.recent, events),
+            'historical_events': total(valid & self.historical, events),
+            'recent_fatalities': total(valid & self.recent, fatalities),
+        }, index=index)
+        return ids, table
+
+    @cached_property
+    def _sites(self) -> Tuple[np.ndarray, pd.DataFrame]:
+        return self._group_table(['country', 'location'])
+
+    @property
+    def site_ids(self) -> np.ndarray:
+        return self._sites[0]
+
+    @property
+    def sites(self) -> pd.DataFrame:
+        """Totals per (country, location)."""
+        return self._sites[1]
+
+    @cached_property
+    def countries(self) -> pd.DataFrame:
+        """Totals per country, with first/last event date and first row position."""
+        ids, table = self._group_table(['country'])
+        dates = self.data['event_date'].to_numpy(dtype="datetime64[ns]")
+        dated = (ids >= 0) & ~np.isnat(dates)
+        first = np.full(len(table), np.iinfo(np.int64).max)
+        last = np.full(len(table), np.iinfo(np.int64).min)
+        np.minimum.at(first, ids[dated], dates[dated].view("i8"))
+        np.maximum.at(last, ids[dated], dates[dated].view("i8"))
+        undated = first > last
+        first[undated] = last[undated]  # NaT
+        table['first_date'] = first.view("datetime64[ns]")
+        table['last_date'] = last.view("datetime64[ns]")
+        first_row = np.full(len(table), len(ids))
+        np.minimum.at(first_row, ids[ids >= 0], np.flatnonzero(ids >= 0))
+        table['first_row'] = first_row
+        return table
+
+    @cached_property
+    def country_event_types(self) -> pd.DataFrame:
+        """Totals per (country, event_type)."""
+        return self._group_table(['country', 'event_type'])[1]
+
+    def actors_seen(self, start: Any = None, end: Any = None) -> Set[Any]:
+        """Actors named in events dated on or after ``start`` and before ``end``."""
+        frame = self.actors
+        mask = np.ones(len(frame), dtype=bool)
+        if start is not None:
+            mask &= (frame['event_date'] >= start).to_numpy()
+        if end is not None:
+            mask &= (frame['event_date'] < end).to_numpy()
+        seen: Set[Any] = set()
+        for col in ACTOR_COLUMNS:
+            seen.update(frame.loc[mask, col].dropna().unique())
+        return seen
+
+    def actor_events(self, actors: List[Any]) -> pd.DataFrame:
+        """(event, actor) rows for ``actors``, as built by ``actor_table``."""
+        keep = ['country', 'event_type', 'fatalities', 'event_date'] + ([self.weight] if self.weight else [])
+        return actor_table(self.actors, actors, keep=keep)
+
+
+def emerging_hotspots(tables: AlertTables) -> List[Alert]:
+    """Sites with at least 3 recent events that make up over 70% of their history."""
+    sites = tables.sites
+    hits = sites[(sites['recent_events'] >= 3) & (sites['events'] >= 5)
+                 & (sites['recent_events'] / sites['events'] > 0.7)]
+    if hits.empty:
+        return []
+
+    # event type mix of just the flagged sites
+    hit_ids = np.flatnonzero(sites.index.isin(hits.index))
+    rows = np.isin(tables.site_ids, hit_ids)
+    columns = ['event_type'] + ([tables.weight] if tables.weight else [])
+    subset = tables.data.loc[rows, columns].assign(site=tables.site_ids[rows])
+    event_types = top_counts(subset, 'site', 'event_type', 2, weight=tables.weight)
+
+    alerts = []
+    for site, ((country, location), row) in zip(hit_ids, hits.iterrows()):
+        event_type_str = ", ".join(event_types.get(site, {}).keys())
+        alerts.append({
+            "type": "Emerging Hotspot",
+            "severity": "High" if row['fatalities'] > 10 else "Medium",
+            "location": {
+                "country": country,
+                "location": location
+            },
+            "description": f"Rapid escalation of conflict in {location}, {country} with {row['recent_events']} recent events ({event_type_str})."
+        })
+    return alerts
+
+
+def fatality_spikes(tables: AlertTables) -> List[Alert]:
+    """Countries whose last-30-day fatalities exceed twice their monthly average."""
+    countries = tables.countries
+    days = (countries['last_date'] - countries['first_date']).dt.days
+    candidates = countries[(countries['recent_fatalities'] > 0) & (countries['events'] >= 10) & (days > 0)]
+
+    alerts = []
+    for country, row in candidates.iterrows():
+        months = days[country] / 30
+        historical_monthly_avg = int(row['fatalities']) / months
+        recent_monthly = int(row['recent_fatalities'])
+        if recent_monthly / historical_monthly_avg > 2:
+            alerts.append({
+                "type": "Fatality Spike",
+                "severity": "High" if recent_monthly > 50 else "Medium",
+                "location": {
+                    "country": country
+                },
+                "description": f"Significant increase in fatalities in {country} with {recent_monthly} fatalities in the last 30 days, compared to historical average of {int(historical_monthly_avg)} per month."
+            })
+    return alerts
+
+
+def new_actors(tables: AlertTables) -> List[Alert]:
+    """Actors active in the recent window but absent before the history gap."""
+    recent = tables.actors_seen(start=tables.recent_cutoff)
+    historical = tables.actors_seen(end=tables.older_cutoff)
+    actors = sorted(a for a in recent - historical if a and not pd.isna(a) and len(str(a)) > 3)
+    if not actors:
+        return []
+
+    events = tables.actor_events(actors)
+    stats = group_stats(events, 'actor', weight=tables.weight)
+    countries = top_counts(events, 'actor', 'country', 2, weight=tables.weight)
+    event_types = top_counts(events, 'actor', 'event_type', 2, weight=tables.weight)
+
+    alerts = []
+    for actor in actors:
+        if stats.loc[actor, 'events'] < 3:
+            continue
+        actor_countries = list(countries.get(actor, {}))
+        fatalities = int(stats.loc[actor, 'fatalities'])
+        alerts.append({
+            "type": "New Actor",
+            "severity": "High" if fatalities > 20 else "Medium",
+            "location": {
+                "countries": actor_countries
+            },
+            "description": f"Emergence of new conflict actor: {actor} in {', '.join(actor_countries)}. Associated with {', '.join(event_types.get(actor, {}))} events and {fatalities} fatalities."
+        })
+    return alerts
+
+
+def dynamic_shifts(tables: AlertTables) -> List[Alert]:
+    """Event types whose share of a country's recent events jumped or is new."""
+    countries = tables.countries
+    eligible = countries[(countries['events'] >= 10) & (countries['recent_events'] >= 5)
+                         & (countries['historical_events'] >= 5)]
+    types = tables.country_event_types.reset_index()
+    types = types[types['country'].isin(eligible.index) & (types['recent_events'] > 0)].copy()
+    if types.empty:
+        return []
+
+    # each type's share of the country's recent / historical events with a known type
+    by_country = types.groupby('country', observed=True, sort=False)
+    types['recent_share'] = types['recent_events'] / by_country['recent_events'].transform('sum')
+    historical_totals = tables.country_event_types['historical_events'] \
+        .groupby(level='country', observed=True).sum()
+    types['historical_share'] = types['historical_events'] / types['country'].map(historical_totals).astype(float)
+    shift = (types['historical_events'] > 0) & (types['recent_share'] - types['historical_share'] > 0.2)
+    emerging = (types['historical_events'] == 0) & (types['recent_share'] > 0.25)
+    hits = types[shift | emerging].assign(
+        first_row=lambda t: t['country'].map(countries['first_row']).astype(int))
+    # countries in order of appearance, most common recent types first
+    hits = hits.sort_values(['first_row', 'recent_events', 'event_type'],
+                            ascending=[True, False, True], kind='stable')
+
+    alerts = []
+    for row in hits.itertuples(index=False):
+        share = row.recent_share
+        if row.historical_events > 0:
+            alerts.append({
+                "type": "Conflict Dynamic Shift",
+                "severity": "Medium",
+                "location": {
+                    "country": row.country
+                },
+                "description": f"Significant shift toward {row.event_type} events in {row.country}. This event type now represents {int(share*100)}% of recent events, up from {int(row.historical_share*100)}% historically."
+            })
+        else:
+            alerts.append({
+                "type": "New Conflict Dynamic",
+                "severity": "High",
+                "location": {
+                    "country": row.country
+                },
+                "description": f"Emergence of {row.event_type} as a significant new conflict dynamic in {row.country}, representing {int(share*100)}% of recent events."
+            })
+    return alerts
+
+
+# Detectors run in registration order
+DETECTORS: Dict[str, Callable[[AlertTables], List[Alert]]] = {}
+
+
+def register_detector(name: str, detector: Callable[[AlertTables], List[Alert]]) -> None:
+    DETECTORS[name] = detector
+
+
+def detect_alerts(data: Any, detectors: Optional[Iterable[str]] = None) -> List[Alert]:
+    """Run the registered detectors (or the named subset) and sort by severity.
+
+    ``data`` is an event frame or a prepared ``AlertTables``.
+    """
+    tables = data if isinstance(data, AlertTables) else AlertTables(data)
+    alerts: List[Alert] = []
+    for name in (detectors if detectors is not None else list(DETECTORS)):
+        alerts.extend(DETECTORS[name](tables))
+    return sorted(alerts, key=lambda x: SEVERITY_ORDER.get(x["severity"], 3))
+
+
+register_detector('emerging_hotspot', emerging_hotspots)
+register_detector('fatality_spike', fatality_spikes)
+register_detector('new_actor', new_actors)
+register_detector('dynamic_shift', dynamic_shifts)
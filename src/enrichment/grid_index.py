@@ -0,0 +1,163 @@
+"""
+Spatial grid index for ACLED event coordinates.
+
+The globe is cut into a regular latitude/longitude grid of ``CELL_DEG``
+degree cells (0.1 degrees is about 11 km at the equator). Each cell has an
+integer id, ``row * columns + column`` counted from (-90, -180), so cell ids
+can be computed for millions of points with a few NumPy operations and
+stored next to the events, grouped like any other key and sent to maps in
+place of raw points.
+
+``GridIndex`` keeps a set of points sorted by cell for bounding-box and
+radius queries and for density ranking.
+"""
+
+import os
+import sys
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Add the parent directory to the Python path to make imports work
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+CELL_DEG = float(os.getenv("FORGENEWS_GRID_DEG", "0.1"))
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEG = np.pi * EARTH_RADIUS_KM / 180
+
+
+def grid_shape(cell_deg: float = CELL_DEG) -> Tuple[int, int]:
+    """(rows, columns) of the grid."""
+    return int(np.ceil(180 / cell_deg)), int(np.ceil(360 / cell_deg))
+
+
+def cell_ids(lat, lon, cell_deg: float = CELL_DEG) -> np.ndarray:
+    """Cell id of each point; -1 where a coordinate is missing or out of range."""
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    rows, columns = grid_shape(cell_deg)
+    valid = (lat >= -90) & (lat <= 90) & (lon >= -180) & (lon <= 180)  # False for NaN
+    row = np.minimum(np.floor((np.where(valid, lat, 0) + 90) / cell_deg), rows - 1).astype(np.int64)
+    column = (np.floor((np.where(valid, lon, 0) + 180) / cell_deg).astype(np.int64)) % columns
+    return np.where(valid, row * columns + column, -1)
+
+
+def cell_centers(cells, cell_deg: float = CELL_DEG) -> Tuple[np.ndarray, np.ndarray]:
+    """(latitude, longitude) of the center of each cell."""
+    row, column = np.divmod(np.asarray(cells, dtype=np.int64), grid_shape(cell_deg)[1])
+    return -90 + (row + 0.5) * cell_deg, -180 + (column + 0.5) * cell_deg
+
+
+def haversine_km(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Great-circle distance in km between points given in degrees."""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=np.float64)) for v in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def rank_cells(cells, weights=None, k: Optional[int] = None, cell_deg: float = CELL_DEG) -> pd.DataFrame:
+    """Cells by total weight (event count by default), densest first.
+
+    Returns a frame with ``cell``, ``latitude``, ``longitude`` (cell center)
+    and ``count`` columns; ties are broken by cell id and cells with id -1
+    are left out.
+    """
+    cells = np.asarray(cells, dtype=np.int64)
+    valid = cells >= 0
+    unique, inverse = np.unique(cells[valid], return_inverse=True)
+    counts = np.bincount(inverse, weights=None if weights is None else np.asarray(weights, dtype=np.float64)[valid],
+                         minlength=len(unique))
+    order = np.argsort(-counts, kind="stable")[:k]
+    lat, lon = cell_centers(unique[order], cell_deg)
+    return pd.DataFrame({"cell": unique[order], "latitude": lat, "longitude": lon,
+                         "count": counts[order].astype(np.int64)})
+
+
+class GridIndex:
+    """Points bucketed by grid cell, sorted so each cell's points are contiguous."""
+
+    def __init__(self, lat, lon, cell_deg: float = CELL_DEG) -> None:
+        self.lat = np.asarray(lat, dtype=np.float64)
+        self.lon = np.asarray(lon, dtype=np.float64)
+        self.cell_deg = cell_deg
+        self.columns = grid_shape(cell_deg)[1]
+        self.point_cells = cell_ids(self.lat, self.lon, cell_deg)
+
+        self._order = np.argsort(self.point_cells, kind="stable")
+        ordered = self.point_cells[self._order]
+        skip = int(np.searchsorted(ordered, 0))  # points without a cell sort first
+        self.cells, starts, self.counts = np.unique(ordered[skip:], return_index=True, return_counts=True)
+        self._starts = starts + skip
+
+    def __len__(self) -> int:
+        return len(self.lat)
+
+    def _points_in(self, positions: np.ndarray) -> np.ndarray:
+        """Indices of the points in the cells at ``positions`` of ``self.cells``."""
+        counts = self.counts[positions]
+        if not counts.sum():
+            return np.empty(0, dtype=np.int64)
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        return self._order[np.repeat(self._starts[positions], counts) + offsets]
+
+    def _candidates(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float) -> np.ndarray:
+        """Points in the cells overlapping the box; ``min_lon > max_lon`` crosses the antimeridian."""
+        rows = grid_shape(self.cell_deg)[0]
+        row, column = np.divmod(self.cells, self.columns)
+        low_row, high_row = (int(np.clip(np.floor((v + 90) / self.cell_deg), 0, rows - 1)) for v in (min_lat, max_lat))
+        low_col, high_col = (int(np.clip(np.floor((v + 180) / self.cell_deg), 0, self.columns - 1))
+                             for v in (min_lon, max_lon))
+        in_rows = (row >= low_row) & (row <= high_row)
+        if min_lon <= max_lon:
+            in_columns = (column >= low_col) & (column <= high_col)
+        else:
+            in_columns = (column >= low_col) | (column <= high_col)
+        if max_lon >= 180:
+            in_columns |= column == 0  # longitude 180 is stored as -180
+        return self._points_in(np.flatnonzero(in_rows & in_columns))
+
+    def bbox(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float) -> np.ndarray:
+        """Sorted indices of the points inside the box (edges included).
+
+        A box with ``min_lon > max_lon`` wraps across the antimeridian.
+        """
+        points = self._candidates(min_lat, min_lon, max_lat, max_lon)
+        lat, lon = self.lat[points], self.lon[points]
+        inside = (lat >= min_lat) & (lat <= max_lat)
+        if min_lon <= max_lon:
+            inside &= (lon >= min_lon) & (lon <= max_lon)
+        else:
+            inside &= (lon >= min_lon) | (lon <= max_lon)
+        return np.sort(points[inside])
+
+    def radius(self, lat: float, lon: float, km: float) -> np.ndarray:
+        """Sorted indices of the points within ``km`` of (lat, lon)."""
+        dlat = km / KM_PER_DEG
+        min_lat, max_lat = lat - dlat, lat + dlat
+        if min_lat <= -90 or max_lat >= 90 or np.cos(np.radians(max(abs(min_lat), abs(max_lat)))) * 180 <= dlat:
+            # the circle reaches a pole or spans all longitudes
+            min_lon, max_lon = -180.0, 180.0
+        else:
+            dlon = dlat / np.cos(np.radians(max(abs(min_lat), abs(max_lat))))
+            min_lon, max_lon = lon - dlon, lon + dlon
+            # wrap across the antimeridian
+            if min_lon < -180:
+                min_lon += 360
+            elif max_lon > 180:
+                max_lon -= 360
+        points = self._candidates(min_lat, min_lon, max_lat, max_lon)
+        near = haversine_km(lat, lon, self.lat[points], self.lon[points]) <= km
+        return np.sort(points[near])
+
+    def density(self, points: Optional[np.ndarray] = None, weights=None, k: Optional[int] = None) -> pd.DataFrame:
+        """Cells ranked by point count (or summed ``weights``), as by ``rank_cells``.
+
+        ``points`` limits the ranking to those point indices, e.g. the
+        result of a ``bbox`` or ``radius`` query.
+        """
+        cells = self.point_cells if points is None else self.point_cells[points]
+        if weights is not None:
+            weights = np.asarray(weights, dtype=np.float64)
+            weights = weights if points is None else weights[points]
+        return rank_cells(cells, weights, k, self.cell_deg)
@@ -0,0 +1,231 @@
+"""
+Persistent aggregate state for incremental InsightAgent runs.
+
+Instead of recomputing every insight from the full event history, the agent
+keeps an ``InsightState`` on disk and folds each new raw archive into it:
+
+- ``events``: daily totals per (event_date, country, location, event_type,
+  cell), where ``cell`` is the event's spatial grid cell (``grid_index``)
+- ``actors``: daily totals per (event_date, country, event_type, actor1, actor2)
+- ``ledger``: one compact row per event (id, source archive and row, the key
+  columns above, fatalities, coordinates and cell), used to take back the
+  contribution of events that ACLED revises and to find sample events
+
+Both tables carry ``n`` (events) and ``fatalities`` and feed the profile and
+alert engines as weighted rows, so a daily run only aggregates the new
+events and regroups the tables instead of rereading years of archives.
+Events are identified by ``event_id_cnty``: a later copy of an event
+replaces the earlier one, and re-merging a rewritten archive replaces
+everything that came from it.
+"""
+
+import logging
+import os
+import pickle
+import sys
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+# Add the parent directory to the Python path to make imports work
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.enrichment.grid_index import CELL_DEG, cell_ids
+from src.enrichment.profiles import group_codes
+
+logger = logging.getLogger(__name__)
+
+STATE_FILE = "insight_state.pkl"
+STATE_VERSION = 2
+
+EVENT_KEYS = ["event_date", "country", "location", "event_type", "cell"]
+ACTOR_KEYS = ["event_date", "country", "event_type", "actor1", "actor2"]
+LEDGER_COLUMNS = ["event_date", "country", "location", "event_type", "actor1", "actor2",
+                  "fatalities", "latitude", "longitude"]
+# raw archive columns the state is built from
+STATE_COLUMNS = ["event_id_cnty"] + LEDGER_COLUMNS
+
+
+def event_ids(frame: pd.DataFrame) -> np.ndarray:
+    """uint64 hash of each event's ``event_id_cnty``; 0 where it is missing."""
+    if "event_id_cnty" not in frame.columns:
+        return np.zeros(len(frame), dtype=np.uint64)
+    ids = frame["event_id_cnty"].astype(object)
+    hashed = pd.util.hash_pandas_object(ids, index=False).to_numpy().copy()
+    hashed[ids.isna().to_numpy()] = 0
+    return hashed
+
+
+def file_stamp(path: str) -> List[int]:
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def concat_frames(frames: Sequence[pd.DataFrame]) -> pd.DataFrame:
+    """``pd.concat`` that keeps categorical columns categorical."""
+    frames = [frame for frame in frames if len(frame)] or list(frames[:1])
+    if len(frames) == 1:
+        return frames[0].reset_index(drop=True)
+    result = pd.concat(frames, ignore_index=True)
+    for col in result.columns:
+        parts = [frame[col] for frame in frames if col in frame.columns]
+        if not any(isinstance(part.dtype, pd.CategoricalDtype) for part in parts):
+            continue
+        if len(parts) == len(frames) and all(isinstance(part.dtype, pd.CategoricalDtype) for part in parts):
+            result[col] = union_categoricals(parts, sort_categories=True)
+        elif not isinstance(result[col].dtype, pd.CategoricalDtype):
+            result[col] = result[col].astype("category")
+    return result
+
+
+def aggregate(frame: pd.DataFrame, keys: Sequence[str], weight: Optional[str] = None) -> pd.DataFrame:
+    """Sum events (``n``) and ``fatalities`` per combination of ``keys``.
+
+    Null keys form groups of their own so totals are preserved. ``weight``
+    names a column of events per row when ``frame`` is already aggregated;
+    groups whose events sum to zero are dropped. Rows come out sorted by key.
+    """
+    ids, groups = group_codes(frame, keys, dropna=False)
+    if not isinstance(groups, pd.MultiIndex):
+        groups = pd.MultiIndex.from_arrays([groups])
+    events = np.bincount(ids, weights=None if weight is None else frame[weight].to_numpy(dtype=np.float64),
+                         minlength=len(groups))
+    fatalities = np.bincount(ids, weights=frame["fatalities"].to_numpy(dtype=np.float64),
+                             minlength=len(groups))
+
+    table = {}
+    for key, level, codes in zip(keys, groups.levels, groups.codes):
+        values = pd.Categorical.from_codes(codes, categories=level)
+        table[key] = values if isinstance(frame[key].dtype, pd.CategoricalDtype) \
+            else values.astype(frame[key].dtype)
+    table["n"] = events.astype(np.int64)
+    table["fatalities"] = fatalities.astype(np.int64)
+    result = pd.DataFrame(table)
+    return result[result["n"] != 0].reset_index(drop=True)
+
+
+def _negate(table: pd.DataFrame) -> pd.DataFrame:
+    return table.assign(n=-table["n"], fatalities=-table["fatalities"])
+
+
+def _ledger_rows(path: str, frame: pd.DataFrame, cell_deg: float = CELL_DEG) -> pd.DataFrame:
+    """Ledger rows for the events read from archive ``path``."""
+    rows = {}
+    for col in LEDGER_COLUMNS:
+        rows[col] = frame[col].array if col in frame.columns else pd.Categorical([None] * len(frame))
+    ledger = pd.DataFrame(rows)
+    ledger["event_date"] = pd.to_datetime(ledger["event_date"], errors="coerce")
+    for col in ("country", "location", "event_type", "actor1", "actor2"):
+        if not isinstance(ledger[col].dtype, pd.CategoricalDtype):
+            ledger[col] = ledger[col].astype("category")
+    ledger["fatalities"] = pd.to_numeric(ledger["fatalities"], errors="coerce").fillna(0).astype("int32")
+    for col in ("latitude", "longitude"):
+        ledger[col] = pd.to_numeric(ledger[col], errors="coerce").astype("float32")
+    # cell from the float32 coordinates so it matches what the ledger stores
+    ledger["cell"] = cell_ids(ledger["latitude"], ledger["longitude"], cell_deg)
+    ledger.insert(0, "_row", np.arange(len(frame), dtype=np.int32))
+    ledger.insert(0, "_file", pd.Categorical([os.path.basename(str(path))] * len(frame)))
+    ledger.insert(0, "_id", event_ids(frame))
+    return ledger
+
+
+def _latest_copies(ledger: pd.DataFrame) -> pd.DataFrame:
+    """Drop all but the last copy of each event id (events without an id are kept)."""
+    ids = ledger["_id"].to_numpy()
+    repeated = pd.Series(ids).duplicated(keep="last").to_numpy() & (ids != 0)
+    return ledger[~repeated]
+
+
+class InsightState:
+    """Aggregate tables behind the InsightAgent insights, updated batch by batch."""
+
+    def __init__(self, cell_deg: float = CELL_DEG) -> None:
+        self.version = STATE_VERSION
+        self.cell_deg = cell_deg
+        self.ledger: Optional[pd.DataFrame] = None
+        self.events: Optional[pd.DataFrame] = None
+        self.actors: Optional[pd.DataFrame] = None
+        # archive basename -> [size, mtime_ns] when it was merged
+        self.files: Dict[str, List[int]] = {}
+        self.source_file: Optional[str] = None
+
+    def __len__(self) -> int:
+        return 0 if self.ledger is None else len(self.ledger)
+
+    def pending(self, paths: Iterable[str]) -> List[str]:
+        """The archives in ``paths`` that are new or changed since they were merged."""
+        return [path for path in paths
+                if self.files.get(os.path.basename(str(path))) != file_stamp(path)]
+
+    def merge(self, batches: Sequence[Tuple[str, pd.DataFrame]]) -> int:
+        """Fold ``(archive path, events)`` batches, oldest first, into the state.
+
+        Returns the number of events added or replaced.
+        """
+        if not batches:
+            return 0
+        added = _latest_copies(concat_frames([_ledger_rows(path, frame, self.cell_deg) for path, frame in batches]))
+        sources = [os.path.basename(str(path)) for path, _ in batches]
+
+        removed = None
+        if self.ledger is not None:
+            ids = added["_id"].to_numpy()
+            replaced = np.isin(self.ledger["_id"].to_numpy(), ids[ids != 0]) \
+                | self.ledger["_file"].isin(sources).to_numpy()
+            removed = self.ledger[replaced]
+            self.ledger = concat_frames([self.ledger[~replaced], added])
+        else:
+            self.ledger = added.reset_index(drop=True)
+
+        self.events = self._update(self.events, removed, added, EVENT_KEYS)
+        self.actors = self._update(self.actors, removed, added, ACTOR_KEYS)
+        for path, _ in batches:
+            if os.path.exists(path):
+                self.files[os.path.basename(str(path))] = file_stamp(path)
+        self.source_file = sources[-1]
+        logger.info(f"Merged {len(added)} events from {len(batches)} archive(s); "
+                    f"{0 if removed is None else len(removed)} replaced, {len(self.ledger)} in state")
+        return len(added)
+
+    @staticmethod
+    def _update(table: Optional[pd.DataFrame], removed: Optional[pd.DataFrame],
+                added: pd.DataFrame, keys: List[str]) -> pd.DataFrame:
+        parts = [] if table is None else [table]
+        if removed is not None and len(removed):
+            parts.append(_negate(aggregate(removed, keys)))
+        parts.append(aggregate(added, keys))
+        if len(parts) == 1:
+            return parts[0]
+        return aggregate(concat_frames(parts), keys, weight="n")
+
+    def save(self, path: Any) -> None:
+        """Pickle the state to ``path``, replacing it atomically."""
+        path = str(path)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Any) -> "InsightState":
+        """The state saved at ``path``, or an empty one if there is none (or it is outdated).
+
+        A state built with another grid cell size is outdated too.
+        """
+        try:
+            with open(str(path), "rb") as f:
+                state = pickle.load(f)
+        except FileNotFoundError:
+            return cls()
+        if not isinstance(state, cls) or getattr(state, "version", None) != STATE_VERSION:
+            logger.warning(f"Ignoring insight state in {path} from another version; rebuilding")
+            return cls()
+        if state.cell_deg != CELL_DEG:
+            logger.warning(f"Insight state in {path} uses {state.cell_deg} degree cells, not {CELL_DEG}; rebuilding")
+            return cls()
+        return state
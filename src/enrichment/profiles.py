@@ -0,0 +1,268 @@
+"""
+Vectorized group profiles for ACLED event frames.
+
+The country, event-type and actor profiles in InsightAgent all have the same
+shape: event count, fatality sum, top-k breakdowns of other columns and a
+trend factor comparing the first and last quarter of the group's date range.
+This module computes them for every group at once with a few groupby/agg
+calls instead of filtering the frame once per group.
+
+Rows may carry a ``weight`` column (events per row), so the same functions
+run over pre-aggregated tables. Top-k breakdowns are ordered by count, with
+ties broken by value so results are deterministic.
+"""
+
+import os
+import sys
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+# Add the parent directory to the Python path to make imports work
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+ACTOR_COLUMNS = ("actor1", "actor2")
+
+# trend_factor above/below these is reported as increasing/decreasing
+TREND_THRESHOLD = 0.1
+
+
+def _codes(series: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """Integer codes (-1 for null) and the sorted distinct values of ``series``."""
+    if isinstance(series.dtype, pd.CategoricalDtype) and series.cat.categories.is_monotonic_increasing:
+        # reuse the categorical codes, renumbered to the categories in use
+        codes = series.cat.codes.to_numpy().astype(np.int64)
+        categories = series.cat.categories
+        seen = np.bincount(codes[codes >= 0], minlength=len(categories)) > 0
+        remap = np.full(len(categories) + 1, -1, dtype=np.int64)  # remap[-1] keeps nulls at -1
+        remap[:-1][seen] = np.arange(int(seen.sum()))
+        return remap[codes], np.asarray(categories[seen], dtype=object)
+    codes, uniques = pd.factorize(series, sort=True)
+    return codes, np.asarray(uniques, dtype=object)
+
+
+def group_codes(df: pd.DataFrame, keys: Sequence[str], dropna: bool = True) -> Tuple[np.ndarray, pd.Index]:
+    """Per-row group ids for the combination of ``keys`` and the groups they index.
+
+    Ids are -1 for rows with a null in any key, unless ``dropna`` is False
+    and nulls form groups of their own (NaN in the index). Groups are the
+    observed key combinations in sorted order, as an Index (one key) or
+    MultiIndex.
+    """
+    codes, uniques = zip(*(_codes(df[key]) for key in keys))
+    if not dropna:
+        # shift so null (-1) gets code 0
+        codes = [c + 1 for c in codes]
+    sizes = [len(values) + (not dropna) for values in uniques]
+    valid = np.logical_and.reduce([c >= 0 for c in codes])
+    flat = np.zeros(len(df), dtype=np.int64)
+    for c, size in zip(codes, sizes):
+        flat = flat * size + c
+    flat = flat[valid]
+
+    # dense remapping when the key grid is small, sparse otherwise
+    if int(np.prod(sizes, dtype=np.float64)) <= 1 << 22:
+        present = np.flatnonzero(np.bincount(flat, minlength=int(np.prod(sizes))))
+        remap = np.full(int(np.prod(sizes)), -1, dtype=np.int64)
+        remap[present] = np.arange(len(present))
+        inverse = remap[flat]
+    else:
+        present, inverse = np.unique(flat, return_inverse=True)
+    ids = np.full(len(df), -1, dtype=np.int64)
+    ids[valid] = inverse
+
+    positions = np.unravel_index(present, sizes) if sizes else ()
+    if not dropna:
+        positions = [p - 1 for p in positions]
+    if len(keys) == 1:
+        # position -1 (null) picks the appended NaN
+        groups = pd.Index(np.append(uniques[0], np.nan)[positions[0]], name=keys[0])
+    else:
+        groups = pd.MultiIndex(levels=list(uniques), codes=list(positions), names=list(keys))
+    return ids, groups
+
+
+def _weights(df: pd.DataFrame, weight: Optional[str]) -> Optional[np.ndarray]:
+    return df[weight].to_numpy(dtype=np.float64) if weight else None
+
+
+def _sums(codes: np.ndarray, size: int, weights: Optional[np.ndarray]) -> np.ndarray:
+    return np.bincount(codes, weights=weights, minlength=size)
+
+
+def trend_label(factor: float) -> str:
+    if factor > TREND_THRESHOLD:
+        return "increasing"
+    if factor < -TREND_THRESHOLD:
+        return "decreasing"
+    return "stable"
+
+
+def _trend_factors(codes: np.ndarray, size: int, dates: np.ndarray,
+                   weights: Optional[np.ndarray]) -> np.ndarray:
+    dated = (codes >= 0) & ~np.isnat(dates)
+    codes, dates = codes[dated], dates[dated]
+    if weights is not None:
+        weights = weights[dated]
+
+    # per-group first/last date; groups without dates keep NaT bounds
+    first = np.full(size, np.iinfo(np.int64).max)
+    last = np.full(size, np.iinfo(np.int64).min)
+    np.minimum.at(first, codes, dates.view("i8"))
+    np.maximum.at(last, codes, dates.view("i8"))
+    has_dates = _sums(codes, size, None) > 0
+    first[~has_dates] = last[~has_dates]
+    first, last = first.view("datetime64[ns]"), last.view("datetime64[ns]")
+    quarter = (last - first) / 4
+
+    recent_rows = dates >= (last - quarter)[codes]
+    early_rows = dates <= (first + quarter)[codes]
+    recent = _sums(codes[recent_rows], size, None if weights is None else weights[recent_rows])
+    early = _sums(codes[early_rows], size, None if weights is None else weights[early_rows])
+
+    factors = np.where(early > 0, (recent - early) / np.where(early > 0, early, 1),
+                       np.where(recent > 0, 1.0, 0.0))
+    factors[~has_dates] = 0.0
+    return factors
+
+
+def trend_factors(df: pd.DataFrame, key: str, weight: Optional[str] = None) -> pd.Series:
+    """Per-group change between the first and last quarter of its date range.
+
+    For each group the range ``[first, last]`` of ``event_date`` is split in
+    four; the factor is ``(recent - early) / early`` where ``recent`` counts
+    events on or after ``last - range/4`` and ``early`` those on or before
+    ``first + range/4``. Groups without dates get 0.
+    """
+    codes, keys = _codes(df[key])
+    dates = df["event_date"].to_numpy(dtype="datetime64[ns]")
+    factors = _trend_factors(codes, len(keys), dates, _weights(df, weight))
+    return pd.Series(factors, index=pd.Index(keys, name=key), name="trend_factor")
+
+
+def group_stats(df: pd.DataFrame, key: str, weight: Optional[str] = None) -> pd.DataFrame:
+    """Events, fatalities, fatality rate and trend factor for every ``key``.
+
+    Returns a frame indexed by ``key`` (sorted, groups with a null key
+    dropped) with columns ``events``, ``fatalities``, ``fatality_rate`` and
+    ``trend_factor``.
+    """
+    codes, keys = _codes(df[key])
+    valid = codes >= 0
+    weights = _weights(df, weight)
+    events = _sums(codes[valid], len(keys), None if weights is None else weights[valid])
+    fatalities = _sums(codes[valid], len(keys), df["fatalities"].to_numpy(dtype=np.float64)[valid])
+    dates = df["event_date"].to_numpy(dtype="datetime64[ns]")
+    return pd.DataFrame({
+        "events": events.astype(np.int64),
+        "fatalities": fatalities.astype(np.int64),
+        "fatality_rate": fatalities / np.where(events > 0, events, 1),
+        "trend_factor": _trend_factors(codes, len(keys), dates, weights),
+    }, index=pd.Index(keys, name=key))
+
+
+def _ranked(df: pd.DataFrame, key: str, by: str, k: Optional[int], weight: Optional[str],
+            fatalities: bool = False) -> Tuple[np.ndarray, np.ndarray, np.ndarray, Optional[np.ndarray]]:
+    """(key, by) pairs ordered by key, then count (descending), then value.
+
+    Returns ``(keys, values, counts, fatalities)`` arrays cut to ``k`` pairs
+    per key; ``fatalities`` is None unless asked for.
+    """
+    key_codes, keys = _codes(df[key])
+    by_codes, values = _codes(df[by])
+    valid = (key_codes >= 0) & (by_codes >= 0)
+    pairs = key_codes[valid].astype(np.int64) * len(values) + by_codes[valid]
+    weights = _weights(df, weight)
+    weights = None if weights is None else weights[valid]
+
+    # dense counting when the key x value grid is small, sparse otherwise
+    if len(keys) * len(values) <= 1 << 22:
+        inverse, size = pairs, len(keys) * len(values)
+    else:
+        unique_pairs, inverse = np.unique(pairs, return_inverse=True)
+        size = len(unique_pairs)
+    counts = _sums(inverse, size, weights)
+    present = np.flatnonzero(counts > 0)
+    pair_ids = present if size == len(keys) * len(values) else unique_pairs[present]
+    counts = counts[present]
+    deaths = None
+    if fatalities:
+        deaths = _sums(inverse, size, df["fatalities"].to_numpy(dtype=np.float64)[valid])[present]
+
+    key_idx, value_idx = np.divmod(pair_ids, len(values))
+    order = np.lexsort((value_idx, -counts, key_idx))
+    if k is not None and len(order):
+        grouped = key_idx[order]
+        starts = np.flatnonzero(np.r_[True, grouped[1:] != grouped[:-1]])
+        rank = np.arange(len(order)) - np.repeat(starts, np.diff(np.r_[starts, len(order)]))
+        order = order[rank < k]
+    return (keys[key_idx[order]], values[value_idx[order]], counts[order].astype(np.int64),
+            None if deaths is None else deaths[order].astype(np.int64))
+
+
+def top_counts(df: pd.DataFrame, key: str, by: str, k: Optional[int] = None,
+               weight: Optional[str] = None) -> Dict[Any, Dict[Any, int]]:
+    """``{key: {value_of_by: count}}`` with the ``k`` most frequent values per key."""
+    keys, values, counts, _ = _ranked(df, key, by, k, weight)
+    result: Dict[Any, Dict[Any, int]] = {}
+    for group, value, count in zip(keys, values, counts.tolist()):
+        result.setdefault(group, {})[value] = count
+    return result
+
+
+def top_groups(df: pd.DataFrame, key: str, by: str, k: Optional[int] = None,
+               weight: Optional[str] = None) -> Dict[Any, List[Tuple[Any, int, int]]]:
+    """``{key: [(value_of_by, count, fatalities), ...]}``, most frequent first."""
+    keys, values, counts, deaths = _ranked(df, key, by, k, weight, fatalities=True)
+    result: Dict[Any, List[Tuple[Any, int, int]]] = {}
+    for group, value, count, fatalities in zip(keys, values, counts.tolist(), deaths.tolist()):
+        result.setdefault(group, []).append((value, count, fatalities))
+    return result
+
+
+def top_values(series: pd.Series, k: int, weights: Optional[pd.Series] = None) -> List[Any]:
+    """The ``k`` most frequent non-null values of ``series``, ties by value."""
+    codes, values = _codes(series)
+    valid = codes >= 0
+    counts = _sums(codes[valid], len(values),
+                   None if weights is None else weights.to_numpy(dtype=np.float64)[valid])
+    order = np.lexsort((np.arange(len(values)), -counts))
+    order = order[counts[order] > 0][:k]
+    return values[order].tolist()
+
+
+def actor_table(df: pd.DataFrame, actors: Optional[Iterable[Any]] = None,
+                columns: Sequence[str] = ACTOR_COLUMNS,
+                keep: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """Melt the actor columns into one row per (event, actor).
+
+    Each event appears once for every distinct actor it names, with the
+    actor in an ``actor`` column next to the event's columns (or only the
+    ``keep`` columns). An event with the same actor on both sides counts
+    once. ``actors`` limits the table to those actors.
+    """
+    wanted = None if actors is None else list(actors)
+    if keep is not None:
+        df = df[list(dict.fromkeys([*keep, *columns]))]
+    parts, names = [], []
+    for i, col in enumerate(columns):
+        mask = df[col].notna()
+        if wanted is not None:
+            mask &= df[col].isin(wanted)
+        part = df[mask]
+        for earlier in columns[:i]:
+            # categoricals with different categories can't be compared directly
+            same = part[col].astype(object).to_numpy() == part[earlier].astype(object).to_numpy()
+            part = part[~same]
+        parts.append(part)
+        names.append(part[col])
+
+    if all(isinstance(name.dtype, pd.CategoricalDtype) for name in names):
+        actor = union_categoricals(names, sort_categories=True)
+    else:
+        actor = pd.concat(names, ignore_index=True).to_numpy()
+    table = pd.concat(parts, ignore_index=True)
+    table["actor"] = actor
+    return table
@@ -39,7 +39,7 @@ def generate_daily_brief() -> str:
         raise FileNotFoundError("Brief not generated yet. Run pipeline first.")
     return brief_path.read_text()
 
-from src.scoring.scorer import score_insight
+from src.scoring.scorer import score_insights
 
 @mcp.tool()
 def score_text(domain: str, title: str, body: str) -> dict:
@@ -51,7 +51,7 @@ def score_text(domain: str, title: str, body: str) -> dict:
         "source_id": "ad-hoc",
         "event_date": datetime.utcnow().date().isoformat()
     }
-    return score_insight(base)
+    return score_insights([base])[0]
 
 from mcp.server.fastmcp.prompts import base
 
@@ -0,0 +1,138 @@
+"""
+Rolling novelty memory for the scorer.
+
+Words are kept in per-day buckets (``day -> {word: count}``) together with a
+running total per word, so expiring the window means dropping whole days and
+checking whether a word was seen recently is a single dict lookup. The index
+is loaded from disk once per process and written back with ``flush()``.
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional, Set
+import atexit
+import json
+import os
+
+
+class NoveltyIndex:
+    """In-process inverted index of words seen over the last ``window_days``."""
+
+    def __init__(self, path: str, window_days: int = 30) -> None:
+        self.path = path
+        self.window_days = window_days
+        self.days: Dict[str, Dict[str, int]] = {}
+        self.totals: Dict[str, int] = {}
+        self.dirty = False
+        self._cutoff: Optional[str] = None
+        self._load()
+
+    # --- persistence -------------------------------------------------
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r") as f:
+                raw = json.load(f)
+        except (OSError, ValueError):
+            return
+        if isinstance(raw, dict) and "days" in raw:
+            self.days = {d: dict(words) for d, words in raw["days"].items()}
+        else:
+            # Legacy layout: {word: [iso_date, ...]}
+            for word, dates in raw.items():
+                for d in dates:
+                    bucket = self.days.setdefault(d, {})
+                    bucket[word] = bucket.get(word, 0) + 1
+            self.dirty = True
+        for bucket in self.days.values():
+            for word, count in bucket.items():
+                self.totals[word] = self.totals.get(word, 0) + count
+        self.expire()
+
+    def flush(self) -> None:
+        """Write the index back to disk if it changed since the last flush."""
+        if not self.dirty:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"window_days": self.window_days, "days": self.days}, f)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+    # --- window maintenance ------------------------------------------
+    def expire(self, today: Optional[datetime] = None, force: bool = False) -> None:
+        """Drop every day bucket that has fallen out of the rolling window.
+
+        The buckets are only scanned when the cutoff day has moved since the
+        last call, unless ``force`` is set.
+        """
+        now = today or datetime.utcnow()
+        cutoff = (now - timedelta(days=self.window_days)).date().isoformat()
+        if cutoff == self._cutoff and not force:
+            return
+        self._cutoff = cutoff
+        for day in [d for d in self.days if d < cutoff]:
+            for word, count in self.days.pop(day).items():
+                remaining = self.totals.get(word, 0) - count
+                if remaining > 0:
+                    self.totals[word] = remaining
+                else:
+                    self.totals.pop(word, None)
+            self.dirty = True
+
+    # --- queries / updates -------------------------------------------
+    def __contains__(self, word: str) -> bool:
+        return word in self.totals
+
+    def update(self, words: Iterable[str], day: Optional[str] = None) -> None:
+        """Record ``words`` as seen on ``day`` (defaults to today, UTC)."""
+        self.expire()
+        day = day or datetime.utcnow().date().isoformat()
+        bucket = self.days.setdefault(day, {})
+        for word in words:
+            bucket[word] = bucket.get(word, 0) + 1
+            self.totals[word] = self.totals.get(word, 0) + 1
+            self.dirty = True
+
+    def update_many(self, word_sets: Iterable[Set[str]], day: Optional[str] = None) -> None:
+        """Record several documents' word sets in one pass."""
+        counts: Dict[str, int] = {}
+        for words in word_sets:
+            for word in words:
+                counts[word] = counts.get(word, 0) + 1
+        if not counts:
+            return
+        self.expire()
+        day = day or datetime.utcnow().date().isoformat()
+        bucket = self.days.setdefault(day, {})
+        for word, count in counts.items():
+            bucket[word] = bucket.get(word, 0) + count
+            self.totals[word] = self.totals.get(word, 0) + count
+        self.dirty = True
+
+
+_INDEXES: Dict[str, NoveltyIndex] = {}
+
+
+def get_index(path: str, window_days: int = 30) -> NoveltyIndex:
+    """Return the process-wide index for ``path``, loading it on first use."""
+    idx = _INDEXES.get(path)
+    if idx is None or idx.window_days != window_days:
+        idx = NoveltyIndex(path, window_days)
+        _INDEXES[path] = idx
+    return idx
+
+
+def flush_all() -> None:
+    """Flush every loaded index; registered to run at interpreter exit."""
+    for idx in _INDEXES.values():
+        try:
+            idx.flush()
+        except OSError as e:
+            print(f"Error flushing novelty index {idx.path}: {e}")
+
+
+atexit.register(flush_all)
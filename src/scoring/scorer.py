@@ -4,37 +4,40 @@ from textwrap import shorten
 from collections import defaultdict
 import re, math, os, json
 
+from src.scoring.novelty import get_index
+
 # --- naive TF-IDF novelty memory (rolling 30-day) -----------
 MEM_PATH = os.getenv("FORGENEWS_NOVELTY_MEM", "data/.novelty_index.json")
 WINDOW_DAYS = 30
+WORD_RE = re.compile(r"\b\w{4,}\b")
 
-def _load_index():
-    if os.path.exists(MEM_PATH):
-        return json.loads(open(MEM_PATH).read())
-    return {}
+def _tokenize(text: str) -> set:
+    return {w.lower() for w in WORD_RE.findall(text)}
 
-def _save_index(idx):
-    os.makedirs(os.path.dirname(MEM_PATH), exist_ok=True)
-    with open(MEM_PATH, "w") as f:
-        json.dump(idx, f)
+class _SeenWords:
+    """Membership view over the novelty memory plus words seen earlier in a batch."""
 
-def novelty_score(text: str) -> float:
-    idx = _load_index()
-    today = datetime.utcnow().date().isoformat()
-    words = {w.lower() for w in re.findall(r"\b\w{4,}\b", text)}
+    def __init__(self, idx, batch_words: set) -> None:
+        self.idx = idx
+        self.batch_words = batch_words
+
+    def __contains__(self, word: str) -> bool:
+        return word in self.batch_words or word in self.idx
+
+def _novelty_from_words(words: set, idx) -> float:
     seen = sum(1 for w in words if w in idx)
-    score = 1 - (seen / max(1, len(words)))
-    # update
-    for w in words:
-        idx.setdefault(w, []).append(today)
-    # prune old
-    cutoff = (datetime.utcnow() - timedelta(days=WINDOW_DAYS)).date().isoformat()
-    for w in list(idx):
-        idx[w] = [d for d in idx[w] if d >= cutoff]
-        if not idx[w]:
-            del idx[w]
-    _save_index(idx)
-    return round(score, 2)
+    return round(1 - (seen / max(1, len(words))), 2)
+
+def flush_novelty_index() -> None:
+    """Persist the novelty memory; call once at the end of a run."""
+    get_index(MEM_PATH, WINDOW_DAYS).flush()
+
+def novelty_score(text: str) -> float:
+    idx = get_index(MEM_PATH, WINDOW_DAYS)
+    words = _tokenize(text)
+    score = _novelty_from_words(words, idx)
+    idx.update(words)
+    return score
 
 # ---------- relevance (keyword overlap to domain keywords) ---------
 DOMAIN_KEYWORDS = {
@@ -45,7 +48,8 @@ DOMAIN_KEYWORDS = {
 
 def relevance_score(domain: str, text: str) -> float:
     base = DOMAIN_KEYWORDS[domain]
-    overlap = sum(1 for w in base if w in text.lower())
+    lowered = text.lower()
+    overlap = sum(1 for w in base if w in lowered)
     return round(min(1, overlap / len(base)), 2)
 
 # ---------- volatility (markets only) ------------------------------
@@ -53,11 +57,10 @@ def volatility_score(change_percent: float) -> float:
     return round(min(1, abs(change_percent) / 5), 2)  # >5% day move = 1.0
 
 # ---------- wrapper -------------------------------------------------
-def score_insight(insight_dict: dict) -> dict:
+def _apply_scores(insight_dict: dict, novelty: float, relevance: float) -> dict:
     dom = insight_dict["domain"]
-    txt = f"{insight_dict['title']} {insight_dict['body']}"
-    insight_dict["novelty"] = novelty_score(txt)
-    insight_dict["relevance"] = relevance_score(dom, txt)
+    insight_dict["novelty"] = novelty
+    insight_dict["relevance"] = relevance
     if dom == "markets":
         pct = insight_dict.get("change_pct", 0)
         insight_dict["volatility"] = volatility_score(pct)
@@ -66,4 +69,29 @@ def score_insight(insight_dict: dict) -> dict:
         "high" if insight_dict["relevance"] > 0.8 and insight_dict["novelty"] > 0.5 else
         "medium" if insight_dict["relevance"] > 0.5 else "low"
     )
-    return insight_dict 
\ No newline at end of file
+    return insight_dict
+
+def score_insight(insight_dict: dict) -> dict:
+    dom = insight_dict["domain"]
+    txt = f"{insight_dict['title']} {insight_dict['body']}"
+    return _apply_scores(insight_dict, novelty_score(txt), relevance_score(dom, txt))
+
+def score_insights(insights: list) -> list:
+    """Score a batch of insight dicts in place and return them.
+
+    Produces the same scores as calling ``score_insight`` on each row in
+    order: a row's novelty still counts words from earlier rows in the batch,
+    but each text is tokenized once and the novelty memory is updated once.
+    """
+    idx = get_index(MEM_PATH, WINDOW_DAYS)
+    batch_words: set = set()
+    seen = _SeenWords(idx, batch_words)
+    word_sets = []
+    for ins in insights:
+        txt = f"{ins['title']} {ins['body']}"
+        words = _tokenize(txt)
+        _apply_scores(ins, _novelty_from_words(words, seen), relevance_score(ins["domain"], txt))
+        batch_words |= words
+        word_sets.append(words)
+    idx.update_many(word_sets)
+    return insights
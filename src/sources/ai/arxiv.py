@@ -1,14 +1,12 @@
-import requests
 import xml.etree.ElementTree as ET
 import datetime
-from src.scoring.scorer import score_insight
+from src.core.http_cache import cached_get
+from src.scoring.scorer import score_insights
 
 def fetch(category="cs.AI"):
     """Fetch arXiv RSS feed for a specific category."""
     url = f"https://export.arxiv.org/rss/{category}"
-    response = requests.get(url, timeout=30)
-    response.raise_for_status()
-    return response.text
+    return cached_get(url, source="arxiv", timeout=30).text
 
 def normalize(raw_xml):
     """Parse XML and normalize to consistent format."""
@@ -24,13 +22,13 @@ def normalize(raw_xml):
         description = item.find("description").text
         summary = description[:500] if description else ""
         
-        results.append(score_insight({
+        results.append({
             "domain": "ai",
             "title": title,
             "body": summary,
             "source_id": "arxiv",
             "event_date": today,
             "url": link
-        }))
+        })
     
-    return results 
\ No newline at end of file
+    return score_insights(results) 
\ No newline at end of file
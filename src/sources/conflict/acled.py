@@ -1,6 +1,6 @@
 import os
 import requests
-from src.scoring.scorer import score_insight
+from src.scoring.scorer import score_insights
 
 API_BASE = "https://api.acleddata.com/acled/read"
 
@@ -33,7 +33,7 @@ def normalize(raw):
     for event in raw:
         headline = f"{event['actor1']} - {event['actor2']} conflict"
         summary = event["notes"]
-        normalized.append(score_insight({
+        normalized.append({
             "domain": "conflict",
             "title": headline,
             "body": summary,
@@ -44,5 +44,5 @@ def normalize(raw):
             "lat": event["latitude"],
             "lon": event["longitude"],
             "fatalities": event["fatalities"]
-        }))
-    return normalized 
\ No newline at end of file
+        })
+    return score_insights(normalized) 
\ No newline at end of file
@@ -1,5 +1,6 @@
 from datetime import date
-import requests, csv, io, gzip, json
+import csv, io, gzip, json
+from src.core.http_cache import cached_get
 
 BASE = "https://api.gdeltproject.org/api/v2/events/search"
 
@@ -10,8 +11,7 @@ def fetch(keyword: str = "conflict", maxrows: int = 250):
         "maxrecords": maxrows,
         "sort": "HybridRel"
     }
-    resp = requests.get(BASE, params=params, timeout=30)
-    resp.raise_for_status()
+    resp = cached_get(BASE, params=params, source="gdelt", timeout=30)
     return resp.json()["features"]
 
 def normalize(raw):
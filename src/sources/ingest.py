@@ -0,0 +1,136 @@
+"""
+Parallel ingestion of every source in the registry.
+
+Each source fetch runs concurrently: modules that expose an async
+``afetch()`` are awaited directly, everything else has its sync ``fetch()``
+run in a thread pool. Fetches are bounded by a per-source timeout and a
+global concurrency cap; a source that fails or times out is reported and
+skipped, and the rest of the results are still returned.
+"""
+
+import asyncio
+import inspect
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+# Add the parent directory to the Python path to make imports work
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.sources.loader import load_registry, get_source
+
+logger = logging.getLogger(__name__)
+
+DOMAINS = ["conflict", "ai", "markets"]
+SOURCE_TIMEOUT = float(os.getenv("FORGENEWS_SOURCE_TIMEOUT", "60"))
+MAX_CONCURRENCY = int(os.getenv("FORGENEWS_INGEST_CONCURRENCY", "8"))
+
+
+async def _fetch_one(mod: Any, timeout: float, semaphore: asyncio.Semaphore,
+                     executor: ThreadPoolExecutor) -> Any:
+    async with semaphore:
+        afetch = getattr(mod, "afetch", None)
+        if afetch is not None and inspect.iscoroutinefunction(afetch):
+            pending = afetch()
+        else:
+            pending = asyncio.get_running_loop().run_in_executor(executor, mod.fetch)
+        return await asyncio.wait_for(pending, timeout)
+
+
+async def afetch_sources(sources: List[Tuple[str, str, Any, float]],
+                         max_concurrency: int = MAX_CONCURRENCY) -> Dict[str, Dict[str, Any]]:
+    """Fetch ``(domain, source_id, module, timeout)`` entries concurrently.
+
+    Returns:
+        Mapping of ``"domain/source_id"`` to a status dict holding ``raw``
+        (on success) or ``error``, plus the elapsed ``seconds``.
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    executor = ThreadPoolExecutor(max_workers=max(1, max_concurrency), thread_name_prefix="ingest")
+
+    async def run(domain: str, source_id: str, mod: Any, timeout: float) -> Tuple[str, Dict[str, Any]]:
+        key = f"{domain}/{source_id}"
+        started = time.perf_counter()
+        try:
+            raw = await _fetch_one(mod, timeout, semaphore, executor)
+            status: Dict[str, Any] = {"status": "ok", "raw": raw}
+        except asyncio.TimeoutError:
+            status = {"status": "timeout", "error": f"no response within {timeout:.0f}s"}
+        except Exception as e:
+            status = {"status": "error", "error": str(e)}
+        status["seconds"] = round(time.perf_counter() - started, 3)
+        return key, status
+
+    try:
+        results = await asyncio.gather(*(run(*src) for src in sources))
+    finally:
+        # Timed-out sync fetches keep their thread; don't wait for them here
+        executor.shutdown(wait=False, cancel_futures=True)
+    return dict(results)
+
+
+def _run_coroutine(coro: Any) -> Any:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    # Called from inside an event loop (e.g. the API): use a private loop
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, coro).result()
+
+
+def ingest_sources(registry: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+                   domains: Optional[List[str]] = None,
+                   timeout: float = SOURCE_TIMEOUT,
+                   max_concurrency: int = MAX_CONCURRENCY) -> Dict[str, Any]:
+    """Fetch all registry sources in parallel and normalize the results.
+
+    Normalization runs afterwards in registry order, so scoring sees the
+    same sequence of insights as a sequential run would.
+
+    Args:
+        registry: Source registry; loaded from config when omitted.
+        domains: Domains to ingest, defaults to conflict, ai and markets.
+        timeout: Default per-source fetch timeout in seconds; a registry
+            entry may override it with its own ``timeout`` key.
+        max_concurrency: Maximum number of fetches in flight at once.
+
+    Returns:
+        Dict with the combined ``insights`` list and per-source ``sources``
+        status (``ok``, ``timeout`` or ``error``, count and timing).
+    """
+    registry = registry if registry is not None else load_registry()
+    sources: List[Tuple[str, str, Any, float]] = []
+    report: Dict[str, Dict[str, Any]] = {}
+    for dom in domains or DOMAINS:
+        for src_meta in registry.get(dom, []):
+            key = f"{dom}/{src_meta['id']}"
+            try:
+                mod = get_source(dom, src_meta["id"])
+            except (ImportError, ValueError) as e:
+                report[key] = {"status": "error", "error": str(e), "seconds": 0.0}
+                continue
+            sources.append((dom, src_meta["id"], mod, float(src_meta.get("timeout", timeout))))
+
+    fetched = _run_coroutine(afetch_sources(sources, max_concurrency)) if sources else {}
+
+    insights: List[Dict[str, Any]] = []
+    for dom, source_id, mod, _ in sources:
+        key = f"{dom}/{source_id}"
+        status = fetched[key]
+        if status["status"] == "ok":
+            try:
+                normalized = mod.normalize(status.pop("raw"))
+                insights.extend(normalized)
+                status["count"] = len(normalized)
+                logger.info(f"Collected {len(normalized)} insights from {key} in {status['seconds']}s")
+            except Exception as e:
+                status.update(status="error", error=str(e))
+        if status["status"] != "ok":
+            logger.error(f"Error processing {key}: {status['error']}")
+        report[key] = status
+
+    return {"insights": insights, "sources": report}
@@ -1,4 +1,5 @@
-import requests, os, datetime
+import os, datetime
+from src.core.http_cache import cached_get
 
 URL = "https://api.stlouisfed.org/fred/series/observations"
 
@@ -10,7 +11,7 @@ def fetch(series_id="T10Y2Y"):
         "sort_order": "desc",
         "limit": 10
     }
-    data = requests.get(URL, params=params, timeout=20).json()
+    data = cached_get(URL, params=params, source="fred", timeout=20).json()
     return data["observations"]
 
 def normalize(raw):
@@ -1,12 +1,13 @@
 import pandas as pd
-import requests, io
-from src.scoring.scorer import score_insight
+import io
+from src.core.http_cache import cached_get
+from src.scoring.scorer import score_insights
 
 BASE = "https://stooq.com/q/l/?s={symbol}&f=sd2t2ohlcv&h&e=csv"
 
 def fetch(symbol="^spx"):
     url = BASE.format(symbol=symbol.lower())
-    csv_bytes = requests.get(url, timeout=15).content
+    csv_bytes = cached_get(url, source="stooq", timeout=15).content
     df = pd.read_csv(io.BytesIO(csv_bytes))
     return df.to_dict(orient="records")
 
@@ -21,7 +22,7 @@ def normalize(raw):
         title = f"{row['Symbol']} moved {change_pct:.2f}% on {row['Date']}"
         body = f"Open: {row['Open']}, Close: {row['Close']}, High: {row['High']}, Low: {row['Low']}, Volume: {row['Volume']}"
         
-        norm.append(score_insight({
+        norm.append({
             "domain": "markets",
             "title": title,
             "body": body,
@@ -34,5 +35,5 @@ def normalize(raw):
             "low": row["Low"],
             "volume": row["Volume"],
             "change_pct": change_pct
-        }))
-    return norm 
\ No newline at end of file
+        })
+    return score_insights(norm) 
\ No newline at end of file
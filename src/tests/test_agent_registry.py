@@ -0,0 +1,32 @@
+"""
+Tests for the lazy agent registry in ctrl.
+"""
+import json
+import os
+import subprocess
+import sys
+
+from src.core.ctrl import AGENT_REGISTRY, LazyAgentRegistry
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+HEAVY_MODULES = ["pandas", "numpy", "matplotlib", "folium", "openai", "boto3", "requests"]
+
+
+def _heavy_after(code):
+    probe = f"{code}\nimport sys, json\nprint(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    out = subprocess.run([sys.executable, "-c", probe], cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def test_importing_ctrl_loads_no_agent_dependencies():
+    assert _heavy_after("import src.core.ctrl") == []
+    assert _heavy_after("from src.core.ctrl import AGENT_REGISTRY\nAGENT_REGISTRY['ai_news_agent']()") == []
+
+
+def test_entries_resolve_on_first_lookup():
+    registry = LazyAgentRegistry({"dumps": "json:dumps", "path_join": "os.path:join"})
+    assert "dumps" in registry and len(registry) == 2 and not registry.is_loaded("dumps")
+    assert registry["dumps"] is json.dumps and registry.is_loaded("dumps")
+    registry["dummy"] = lambda: {"status": "success"}
+    assert registry["dummy"]() == {"status": "success"}
+    assert set(AGENT_REGISTRY) >= {"conflict_agent", "insight_agent", "llm_report_agent", "ai_news_agent"}
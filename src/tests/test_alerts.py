@@ -0,0 +1,63 @@
+"""
+Unit tests for the strategic alert detector pipeline.
+"""
+import pandas as pd
+
+from src.enrichment import alerts
+from src.enrichment.alerts import AlertTables, detect_alerts
+
+
+def _frame():
+    rows = []
+    # Mali: protests for three months, then mostly battles with a new actor
+    for day in range(0, 90, 3):
+        rows.append(("2025-01-01", day, "Mali", "Bamako", "Protests", "Protesters", None, 0))
+    for day in range(92, 120, 4):
+        rows.append(("2025-01-01", day, "Mali", "Gao", "Battles", "New Front", "Army", 5))
+    # Chad: a quiet site that flares up in the last month
+    for day in range(0, 90, 10):
+        rows.append(("2025-01-01", day, "Chad", "Abeche", "Riots", "Rioters", None, 0))
+    for day in range(100, 120, 4):
+        rows.append(("2025-01-01", day, "Chad", "Camp", "Violence against civilians", "Militia", None, 3))
+    df = pd.DataFrame(rows, columns=["start", "day", "country", "location", "event_type",
+                                     "actor1", "actor2", "fatalities"])
+    df["event_date"] = pd.to_datetime(df.pop("start")) + pd.to_timedelta(df.pop("day"), unit="D")
+    for col in ["country", "location", "event_type", "actor1", "actor2"]:
+        df[col] = df[col].astype("category")
+    return df
+
+
+def test_tables_aggregate_recent_and_historical_events():
+    tables = AlertTables(_frame())
+    assert tables.sites.loc[("Chad", "Camp"), "recent_events"] == 5
+    assert tables.countries.loc["Mali", "historical_events"] == 29
+    assert tables.country_event_types.loc[("Mali", "Battles"), "recent_events"] == 7
+    assert tables.actors_seen(start=tables.recent_cutoff) >= {"New Front", "Militia", "Army"}
+
+
+def test_detectors_find_each_alert_type_in_severity_order():
+    found = detect_alerts(_frame())
+    by_type = {}
+    for alert in found:
+        by_type.setdefault(alert["type"], []).append(alert)
+
+    assert [a["location"] for a in by_type["Emerging Hotspot"]] == [
+        {"country": "Chad", "location": "Camp"}, {"country": "Mali", "location": "Gao"}]
+    assert by_type["Emerging Hotspot"][0]["description"].endswith(
+        "with 5 recent events (Violence against civilians).")
+    assert {a["location"]["country"] for a in by_type["Fatality Spike"]} == {"Chad", "Mali"}
+    assert [a["description"].split(":")[1].split(" in ")[0].strip() for a in by_type["New Actor"]] == [
+        "Army", "New Front", "Militia"]
+    assert by_type["New Conflict Dynamic"][0]["location"] == {"country": "Mali"}
+    severities = [a["severity"] for a in found]
+    assert severities == sorted(severities, key=alerts.SEVERITY_ORDER.get)
+
+
+def test_registered_detectors_can_be_selected_and_extended(monkeypatch):
+    monkeypatch.setattr(alerts, "DETECTORS", dict(alerts.DETECTORS))
+    alerts.register_detector("busy_country", lambda t: [
+        {"type": "Busy", "severity": "Low", "location": {"country": c}, "description": ""}
+        for c in t.countries.index[t.countries["events"] > 30]])
+
+    assert [a["type"] for a in detect_alerts(_frame(), ["busy_country"])] == ["Busy"]
+    assert detect_alerts(_frame())[-1]["type"] == "Busy"
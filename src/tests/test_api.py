@@ -2,17 +2,43 @@
 Integration tests for the ForgeNews FastAPI /run-agent/ endpoint.
 """
 
+import json
 import os
 import sys
+import threading
+import time
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
+import pytest
 from fastapi.testclient import TestClient
 from api.main import app
-from core.ctrl import AGENT_REGISTRY
+# the registry api.main looks agents up in
+from src.core.ctrl import AGENT_REGISTRY
 
 # Set up test client
 client = TestClient(app)
 
+
+@pytest.fixture(autouse=True)
+def isolated_state(tmp_path, monkeypatch):
+    """Keeps execute_agent's state database and run log out of the repo."""
+    from src.core import ctrl, runlog
+    monkeypatch.setattr(ctrl, "STATE_FILE", str(tmp_path / "state.db"))
+    monkeypatch.setattr(runlog, "RUNLOG_DIR", str(tmp_path / "runlog"))
+    yield
+    ctrl.get_state_store().close()
+
+
+def _wait_for_job(job_id, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/jobs/{job_id}").json()
+        if job["status"] in ("success", "failed", "blocked"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
 def test_run_agent_success(monkeypatch):
     """
     Tests that a registered dummy agent executes and returns 200 OK.
@@ -26,11 +52,62 @@ def test_run_agent_success(monkeypatch):
     # Inject dummy agent into registry
     AGENT_REGISTRY["dummy_agent"] = dummy_agent
 
-    # Send POST request with correct agent
+    # Send POST request with correct agent, waiting for the run to finish
     response = client.post("/run-agent/", json={
         "agent_name": "dummy_agent",
-        "input_text": "Simulate test run"
+        "input_text": "Simulate test run",
+        "wait": True
     })
 
     assert response.status_code == 200, f"Expected 200 OK but got {response.status_code}"
     assert response.json()["status"] == "Agent executed successfully."
+
+
+def test_run_agent_returns_a_job_and_stays_responsive():
+    """
+    A slow agent runs in the background while other requests are served.
+    """
+    release = threading.Event()
+
+    def slow_agent():
+        release.wait(10)
+        return {"status": "success", "answer": 42}
+
+    AGENT_REGISTRY["slow_agent"] = slow_agent
+    response = client.post("/run-agent/", json={"agent_name": "slow_agent", "input_text": "Test"})
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+
+    assert client.get("/dashboard/").status_code == 200
+    assert client.get(f"/jobs/{job_id}").json()["status"] in ("queued", "running")
+
+    release.set()
+    job = _wait_for_job(job_id)
+    assert job["status"] == "success" and job["result"]["answer"] == 42
+    assert [event["status"] for event in job["events"]] == ["queued", "running", "success"]
+
+    lines = [json.loads(line) for line in client.get(f"/jobs/{job_id}/events").text.splitlines()]
+    assert [line["status"] for line in lines] == ["queued", "running", "success", "result"]
+    assert client.get("/jobs/unknown").status_code == 404
+
+
+def test_failed_agent_job():
+    def broken_agent():
+        raise RuntimeError("no data")
+
+    AGENT_REGISTRY["broken_agent"] = broken_agent
+    job_id = client.post("/run-agent/", json={"agent_name": "broken_agent", "input_text": "Test"}).json()["job_id"]
+    job = _wait_for_job(job_id)
+    assert job["status"] == "failed" and job["error"] == "RuntimeError: no data"
+
+
+def test_run_agent_rejects_bad_parameters():
+    """Invalid request bodies get 422 and queue no job."""
+    AGENT_REGISTRY["dummy_agent"] = lambda: {"status": "success"}
+    queued = len(client.get("/jobs/").json()["jobs"])
+    for body in ({"agent_name": "dummy_agent", "interval_hours": "soon"},
+                 {"agent_name": "dummy_agent", "interval_hours": -1},
+                 {"agent_name": "dummy_agent", "wait": "maybe"},
+                 {"input_text": "no agent"}):
+        assert client.post("/run-agent/", json=body).status_code == 422
+    assert len(client.get("/jobs/").json()["jobs"]) == queued
@@ -0,0 +1,59 @@
+"""
+Tests for the content-addressed artifact cache.
+"""
+import os
+import random
+
+import pytest
+
+from src.agents.insight_agent import InsightAgent
+from src.core import artifact_cache
+from src.tests.test_insight_state import _events, _write
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(artifact_cache, "ARTIFACT_DIR", str(tmp_path / "artifacts"))
+    monkeypatch.setattr(artifact_cache, "_digests", None)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path / "artifacts"
+
+
+def test_keys_follow_inputs_and_outputs_are_checked(tmp_path):
+    source, output = tmp_path / "in.txt", tmp_path / "out.txt"
+    source.write_text("a")
+    key = artifact_cache.stage_key("demo", [source], {"n": 1}, code=[artifact_cache])
+    assert key == artifact_cache.stage_key("demo", [source], {"n": 1}, code=[artifact_cache])
+    assert key != artifact_cache.stage_key("demo", [source], {"n": 2}, code=[artifact_cache])
+
+    assert artifact_cache.lookup("demo", key) is None
+    output.write_text("result")
+    artifact_cache.store("demo", key, {"out": output, "skipped": None}, result={"rows": 3})
+    cached = artifact_cache.lookup("demo", key)
+    assert cached["result"] == {"rows": 3} and list(cached["outputs"]) == ["out"]
+    assert artifact_cache.latest_output("demo", "out") == str(output)
+
+    source.write_text("b")
+    assert artifact_cache.stage_key("demo", [source], {"n": 1}, code=[artifact_cache]) != key
+    output.write_text("edited")  # an output changed on disk invalidates the entry
+    assert artifact_cache.lookup("demo", key) is None
+
+
+def test_insight_agent_reuses_insights_until_the_archive_changes(tmp_path):
+    raw_dir, processed_dir = tmp_path / "raw", tmp_path / "processed"
+    rng = random.Random(11)
+    _write(raw_dir, "2025-02-01", _events(rng, range(0, 60), 1))
+
+    first = InsightAgent(raw_data_dir=raw_dir, processed_data_dir=processed_dir)
+    insights = first.run()
+    assert not first.cache_hit and os.path.exists(first.insights_path)
+
+    second = InsightAgent(raw_data_dir=raw_dir, processed_data_dir=processed_dir)
+    assert second.run() == insights
+    assert second.cache_hit and second.data is None
+    assert second.insights_path == os.path.abspath(first.insights_path)
+    assert artifact_cache.latest_output("insights", "insights") == os.path.abspath(first.insights_path)
+
+    _write(raw_dir, "2025-02-01", _events(rng, range(0, 70), 1))
+    third = InsightAgent(raw_data_dir=raw_dir, processed_data_dir=processed_dir)
+    assert third.run()["metadata"]["total_events"] == 70 and not third.cache_hit
@@ -8,20 +8,18 @@ import subprocess
 import json
 
 
-def test_cli_example_agent(monkeypatch):
+def test_cli_example_agent(tmp_path):
     """Ensure CLI script executes ``ai_news_agent`` successfully."""
     root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
     script = os.path.join(root, 'scripts', 'run_agent.py')
 
-    # Ensure no previous state to avoid blocking on interval
-    state_file = os.path.join(root, 'pipeline_state.json')
-    if os.path.exists(state_file):
-        os.remove(state_file)
-
     # Point PYTHONPATH to stub modules so heavy dependencies aren't required
     stub_dir = os.path.join(os.path.dirname(__file__), "stubs")
     env = os.environ.copy()
     env["PYTHONPATH"] = stub_dir + os.pathsep + env.get("PYTHONPATH", "")
+    # Fresh state database and run log so the interval never blocks and the repo stays clean
+    env["FORGENEWS_STATE_FILE"] = str(tmp_path / "pipeline_state.db")
+    env["FORGENEWS_RUNLOG_DIR"] = str(tmp_path / "runlog")
 
     # Execute the CLI script with ai_news_agent
     result = subprocess.run(
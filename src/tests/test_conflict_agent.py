@@ -21,35 +21,86 @@ def test_flag_event_wraps_event():
     assert 'flagged' in result and 'event' in result
     assert result['event'] == sample
 
-def test_run_returns_success_and_data(monkeypatch):
+def test_run_returns_success_and_data(monkeypatch, tmp_path):
     """Ensure run() returns success status and data list of flagged events."""
-    dummy_events = [{'id': 1}, {'id': 2}]
-    # Patch get_conflict_feed to return dummy_events
-    monkeypatch.setattr('agents.conflict_agent.get_conflict_feed', lambda: dummy_events)
-    # Patch flag_event to mark flagged True
-    monkeypatch.setattr('agents.conflict_agent.flag_event', lambda e: {'flagged': True, 'event': e})
+    import agents.conflict_agent as mod
+    from src.db import sqlite_writer
+    monkeypatch.setattr(sqlite_writer, 'DB_PATH', str(tmp_path / 'events.db'))
+    monkeypatch.setattr(mod, 'RAW_DIR', tmp_path / 'raw')
+    monkeypatch.delenv('ACLED_REGION', raising=False)
+    dummy_events = [{'event_id_cnty': 'E1', 'fatalities': 0, 'timestamp': 1},
+                    {'event_id_cnty': 'E2', 'fatalities': 25, 'timestamp': 2}]
+    # Patch the page stream run() reads from
+    def fake_pages(date_range=None, on_window=None, **kwargs):
+        yield dummy_events
+        for day, _ in mod._date_windows(*date_range):
+            on_window(day, True)
+    monkeypatch.setattr(mod, 'iter_conflict_pages', fake_pages)
 
     result = run()
     assert result['status'] == 'success'
+    assert result['fetched'] == 2
+    assert result['db'] == {'inserted': 2, 'updated': 0, 'ignored': 0}
+    # only flagged events are returned in data
     assert isinstance(result['data'], list)
-    assert all(item.get('flagged') for item in result['data'])
+    assert [item['event']['event_id_cnty'] for item in result['data']] == ['E2']
+    assert all(item.get('flagged') and item['flags'] == ['fatalities'] for item in result['data'])
 
 def test_get_conflict_feed_with_region_and_date_range(monkeypatch):
     """Ensure get_conflict_feed applies region and date_range parameters to the API request."""
-    fake_events = [{'fatalities': 0}]
+    import threading
+    seen_days = []
+    lock = threading.Lock()
     class FakeResp:
         status_code = 200
+        def __init__(self, day):
+            self.day = day
         def json(self):
-            return {'data': fake_events}
-    def fake_get(url, params):
-        assert params['region'] == 'TestRegion'
-        assert params['start_date'] == '2021-01-01'
-        assert params['end_date'] == '2021-12-31'
-        return FakeResp()
+            return {'data': [{'fatalities': 0, 'event_date': self.day}]}
+        def raise_for_status(self):
+            pass
+    class FakeSession:
+        def get(self, url, params=None, timeout=None):
+            assert params['region'] == 'TestRegion'
+            # the range is requested one day at a time
+            assert params['start_date'] == params['end_date']
+            assert '2021-01-01' <= params['start_date'] <= '2021-12-31'
+            with lock:
+                seen_days.append(params['start_date'])
+            return FakeResp(params['start_date'])
     monkeypatch.setenv('ACLED_API_KEY', 'dummy_key')
-    monkeypatch.setattr('agents.conflict_agent.requests.get', fake_get)
+    monkeypatch.setenv('ACLED_EMAIL', 'dummy@example.com')
+    monkeypatch.setattr('agents.conflict_agent._get_session', lambda: FakeSession())
     data = get_conflict_feed(limit=5, region='TestRegion', date_range=('2021-01-01','2021-12-31'))
-    assert data == fake_events
+    assert len(seen_days) == 365 and len(set(seen_days)) == 365
+    assert min(seen_days) == '2021-01-01' and max(seen_days) == '2021-12-31'
+    # merged in date order and cut to the limit
+    assert data == [{'fatalities': 0, 'event_date': f'2021-01-0{d}'} for d in range(1, 6)]
+
+def test_get_conflict_feed_splits_range_into_concurrent_days(monkeypatch):
+    """Ensure multi-day ranges are fetched as per-day windows and returned in date order."""
+    import threading
+    seen_days = []
+    lock = threading.Lock()
+    class FakeResp:
+        def __init__(self, day):
+            self.day = day
+        def raise_for_status(self):
+            pass
+        def json(self):
+            return {'data': [{'event_date': self.day}]}
+    class FakeSession:
+        def get(self, url, params=None, timeout=None):
+            assert params['start_date'] == params['end_date']
+            with lock:
+                seen_days.append(params['start_date'])
+            return FakeResp(params['start_date'])
+    monkeypatch.setenv('ACLED_API_KEY', 'dummy_key')
+    monkeypatch.setenv('ACLED_EMAIL', 'dummy@example.com')
+    monkeypatch.setattr('agents.conflict_agent._get_session', lambda: FakeSession())
+    data = get_conflict_feed(limit=10, date_range=('2021-01-30', '2021-02-02'))
+    assert sorted(seen_days) == ['2021-01-30', '2021-01-31', '2021-02-01', '2021-02-02']
+    assert [e['event_date'] for e in data] == ['2021-01-30', '2021-01-31', '2021-02-01', '2021-02-02']
 
 def test_flag_event_threshold():
     """Ensure flag_event marks events correctly based on threshold."""
@@ -58,31 +109,203 @@ def test_flag_event_threshold():
     assert flag_event(low, threshold=10)['flagged'] is False
     assert flag_event(high, threshold=10)['flagged'] is True
 
-def test_get_conflict_feed_defaults_to_today(monkeypatch):
-    """Ensure get_conflict_feed defaults to today's date for start_date and end_date."""
+def test_flag_events_sets_one_bit_per_rule():
+    """Ensure flag_events evaluates every rule over the batch and returns a bitmask."""
+    import agents.conflict_agent as mod
+    events = [
+        {'fatalities': '12', 'event_type': 'Protests', 'actor1': 'Rebels', 'region': 'Western Africa'},
+        {'fatalities': 'n/a', 'event_type': 'Battles', 'actor2': 'wagner group', 'region': 'Middle East'},
+        {'fatalities': 0, 'event_type': 'Riots', 'actor1': '', 'region': None},
+    ]
+    rules = {'fatalities': 10, 'event_types': ['battles'], 'actors': ['Wagner Group'], 'regions': ['Western Africa']}
+    flags = mod.flag_events(events, rules)
+    assert flags.tolist() == [mod.FLAG_FATALITIES | mod.FLAG_REGION, mod.FLAG_EVENT_TYPE | mod.FLAG_ACTOR, 0]
+    assert mod.flag_names(flags[1]) == ['event_type', 'actor']
+    assert mod.flag_events(events).tolist() == [mod.FLAG_FATALITIES, 0, 0]
+
+def test_get_conflict_feed_defaults_to_yesterday(monkeypatch):
+    """Ensure get_conflict_feed defaults to yesterday's date for start_date and end_date."""
     # Prepare fake response
     fake_events = []
     class FakeResp:
         status_code = 200
         def json(self):
             return {'data': fake_events}
+        def raise_for_status(self):
+            pass
 
     # Monkeypatch date to return a fixed date
     import agents.conflict_agent as mod
     import datetime
     monkeypatch.setenv('ACLED_API_KEY', 'dummy_key')
-    class FakeDate:
+    monkeypatch.setenv('ACLED_EMAIL', 'dummy@example.com')
+    class FakeDate(datetime.date):
         @classmethod
         def today(cls):
             return datetime.date(2025, 4, 19)
     monkeypatch.setattr(mod, 'date', FakeDate)
-    # Patch requests.get
-    def fake_get(url, params):
-        assert params['start_date'] == '2025-04-19'
-        assert params['end_date'] == '2025-04-19'
-        return FakeResp()
-    monkeypatch.setattr('agents.conflict_agent.requests.get', fake_get)
+    # Patch the shared HTTP session
+    requested = []
+    class FakeSession:
+        def get(self, url, params=None, timeout=None):
+            requested.append((params['start_date'], params['end_date']))
+            return FakeResp()
+    monkeypatch.setattr('agents.conflict_agent._get_session', lambda: FakeSession())
 
     # Call without date_range
     data = get_conflict_feed()
     assert data == fake_events
+    assert requested == [('2025-04-18', '2025-04-18')]
+
+def test_run_fetches_delta_since_watermark(monkeypatch, tmp_path):
+    """Ensure run() backfills from the stored watermark and only asks for newer revisions."""
+    import datetime
+    import agents.conflict_agent as mod
+    from src.db import sqlite_writer
+    db_path = str(tmp_path / 'events.db')
+    monkeypatch.setattr(sqlite_writer, 'DB_PATH', db_path)
+    monkeypatch.setattr(mod, 'RAW_DIR', tmp_path / 'raw')
+    monkeypatch.delenv('ACLED_REGION', raising=False)
+    class FakeDate(datetime.date):
+        @classmethod
+        def today(cls):
+            return datetime.date(2025, 4, 20)
+    monkeypatch.setattr(mod, 'date', FakeDate)
+    with sqlite_writer.ConflictEventWriter(db_path) as writer:
+        writer.set_watermark('all', '2025-04-10', 1000)
+    calls = []
+    def fake_pages(limit=5000, region=None, date_range=None, updated_since=None, on_window=None, **kwargs):
+        calls.append((date_range, updated_since))
+        yield [{'event_id_cnty': 'E1', 'event_date': '2025-04-12', 'fatalities': 0, 'timestamp': 1500}]
+        for day, _ in mod._date_windows(*date_range):
+            on_window(day, True)
+    monkeypatch.setattr(mod, 'iter_conflict_pages', fake_pages)
+
+    result = run()
+    assert calls == [(('2025-04-10', '2025-04-19'), 1000)]
+    assert result['db'] == {'inserted': 1, 'updated': 0, 'ignored': 0}
+    with sqlite_writer.ConflictEventWriter(db_path) as writer:
+        assert writer.get_watermark('all') == {'last_event_date': '2025-04-19', 'last_timestamp': 1500}
+
+def test_run_streams_pages_into_db_archive_and_flags(monkeypatch, tmp_path):
+    """Ensure run() handles each page as it arrives and keeps only flagged events."""
+    import agents.conflict_agent as mod
+    from src.db import sqlite_writer
+    monkeypatch.setattr(sqlite_writer, 'DB_PATH', str(tmp_path / 'events.db'))
+    monkeypatch.setattr(mod, 'RAW_DIR', tmp_path / 'raw')
+    monkeypatch.delenv('ACLED_REGION', raising=False)
+    stored = []
+    def fake_pages(limit=5000, region=None, date_range=None, updated_since=None, **kwargs):
+        for start in (0, 3):
+            yield [{'event_id_cnty': f'E{i}', 'fatalities': i * 4, 'timestamp': i} for i in range(start, start + 3)]
+            # the previous page is already in the DB before the next is fetched
+            with sqlite_writer.ConflictEventWriter() as writer:
+                stored.append(writer.conn.execute('SELECT COUNT(*) FROM conflict_events').fetchone()[0])
+    monkeypatch.setattr(mod, 'iter_conflict_pages', fake_pages)
+
+    result = run()
+    assert stored == [3, 6]
+    assert result['fetched'] == 6
+    assert [item['event']['event_id_cnty'] for item in result['data']] == ['E3', 'E4', 'E5']
+    from src.db.raw_archive import iter_archive, latest_archive
+    archive = list(iter_archive(latest_archive(tmp_path / 'raw')))
+    assert [e['event_id_cnty'] for e in archive] == [f'E{i}' for i in range(6)]
+
+def test_iter_conflict_pages_stops_at_limit(monkeypatch):
+    """Ensure streamed pages across concurrent day windows honour the overall limit."""
+    import agents.conflict_agent as mod
+    class FakeResp:
+        def __init__(self, day):
+            self.day = day
+        def raise_for_status(self):
+            pass
+        def json(self):
+            return {'data': [{'event_date': self.day}] * 2}
+    class FakeSession:
+        def get(self, url, params=None, timeout=None):
+            return FakeResp(params['start_date'])
+    monkeypatch.setenv('ACLED_API_KEY', 'dummy_key')
+    monkeypatch.setenv('ACLED_EMAIL', 'dummy@example.com')
+    monkeypatch.setattr(mod, '_get_session', lambda: FakeSession())
+    pages = list(mod.iter_conflict_pages(limit=5, date_range=('2021-01-01', '2021-01-05')))
+    assert sum(len(p) for p in pages) == 5
+    assert all(len(p) <= 2 for p in pages)
+
+def _paged_session(events_per_day, seen=None):
+    """Fake ACLED session serving ``events_per_day`` events per day, ``limit`` per page."""
+    class FakeResp:
+        def __init__(self, data):
+            self.data = data
+        def raise_for_status(self):
+            pass
+        def json(self):
+            return {'data': self.data}
+    class FakeSession:
+        def get(self, url, params=None, timeout=None):
+            day, size, page = params['start_date'], params['limit'], params.get('page', 1)
+            if seen is not None:
+                seen.append((day, page))
+            events = [{'event_id_cnty': f'{day}-{i}', 'event_date': day, 'fatalities': 0, 'timestamp': 2000 + i}
+                      for i in range(events_per_day)]
+            return FakeResp(events[(page - 1) * size:page * size])
+    return FakeSession()
+
+def test_run_pages_past_the_page_size_and_resumes_after_the_cap(monkeypatch, tmp_path):
+    """Ensure a run keeps paging, and a capped run advances the watermark over the days it finished."""
+    import datetime
+    import agents.conflict_agent as mod
+    from src.db import sqlite_writer
+    from src.db.raw_archive import iter_archive, list_archives
+    db_path = str(tmp_path / 'events.db')
+    monkeypatch.setattr(sqlite_writer, 'DB_PATH', db_path)
+    monkeypatch.setattr(mod, 'RAW_DIR', tmp_path / 'raw')
+    monkeypatch.delenv('ACLED_REGION', raising=False)
+    monkeypatch.setenv('ACLED_API_KEY', 'dummy_key')
+    monkeypatch.setenv('ACLED_EMAIL', 'dummy@example.com')
+    class FakeDate(datetime.date):
+        @classmethod
+        def today(cls):
+            return datetime.date(2025, 4, 20)
+    monkeypatch.setattr(mod, 'date', FakeDate)
+    # one worker, so days are fetched in date order; 3 events per day over 2 pages
+    monkeypatch.setattr(mod, 'ACLED_MAX_CONCURRENCY', 1)
+    monkeypatch.setattr(mod, 'ACLED_PAGE_SIZE', 2)
+    monkeypatch.setattr(mod, '_get_session', lambda: _paged_session(3))
+    with sqlite_writer.ConflictEventWriter(db_path) as writer:
+        writer.set_watermark('all', '2025-04-10', 1000)
+
+    # the cap cuts 2025-04-12 short: resume from the last day fetched in full
+    monkeypatch.setattr(mod, 'ACLED_MAX_EVENTS', 7)
+    assert mod.run()['fetched'] == 7
+    with sqlite_writer.ConflictEventWriter(db_path) as writer:
+        assert writer.get_watermark('all') == {'last_event_date': '2025-04-11', 'last_timestamp': 1000}
+
+    # uncapped, the rest of the range is paged through and the mark reaches yesterday
+    monkeypatch.setattr(mod, 'ACLED_MAX_EVENTS', 0)
+    assert mod.run()['fetched'] == 27
+    with sqlite_writer.ConflictEventWriter(db_path) as writer:
+        assert writer.get_watermark('all') == {'last_event_date': '2025-04-19', 'last_timestamp': 2002}
+        assert writer.conn.execute('SELECT COUNT(*) FROM conflict_events').fetchone()[0] == 30
+
+    # both runs were merged into the day's archive
+    [(day, path)] = list_archives(tmp_path / 'raw')
+    assert day == '2025-04-19'
+    assert len({e['event_id_cnty'] for e in iter_archive(path)}) == len(list(iter_archive(path))) == 30
+
+def test_iter_conflict_pages_reports_complete_windows(monkeypatch):
+    """Ensure on_window marks a day complete only once all its pages were yielded."""
+    import agents.conflict_agent as mod
+    monkeypatch.setenv('ACLED_API_KEY', 'dummy_key')
+    monkeypatch.setenv('ACLED_EMAIL', 'dummy@example.com')
+    monkeypatch.setattr(mod, 'ACLED_MAX_CONCURRENCY', 1)
+    seen = []
+    monkeypatch.setattr(mod, '_get_session', lambda: _paged_session(3, seen))
+    windows = {}
+    pages = list(mod.iter_conflict_pages(limit=2, date_range=('2021-01-01', '2021-01-03'), max_events=5,
+                                         on_window=windows.__setitem__))
+    assert sum(len(p) for p in pages) == 5
+    assert windows == {'2021-01-01': True}
+    windows.clear()
+    list(mod.iter_conflict_pages(limit=2, date_range=('2021-01-01', '2021-01-01'), max_events=0,
+                                 on_window=windows.__setitem__))
+    assert windows == {'2021-01-01': True}
@@ -10,7 +10,7 @@ import pytest
 from core.ctrl import check_last_run, log_run, load_state, save_state
 
 # Test setup: use a temporary pipeline state file
-TEST_STATE_FILE = "test_pipeline_state.json"
+TEST_STATE_FILE = "test_pipeline_state.db"
 
 def setup_module(module):
     """Redirects state file path for testing."""
@@ -19,9 +19,12 @@ def setup_module(module):
 
 
 def teardown_module(module):
-    """Cleans up the test state file."""
-    if os.path.exists(TEST_STATE_FILE):
-        os.remove(TEST_STATE_FILE)
+    """Cleans up the test state database."""
+    from core import ctrl
+    ctrl.get_state_store().close()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(TEST_STATE_FILE + suffix):
+            os.remove(TEST_STATE_FILE + suffix)
 
 
 def test_initial_check_last_run_returns_true():
@@ -40,4 +43,45 @@ def test_log_run_creates_state_entry():
 def test_check_last_run_after_logging():
     """Should return False if interval hasn't passed yet and True when interval=0."""
     assert check_last_run("test_agent", 24) is False
-    assert check_last_run("test_agent", 0) is True 
\ No newline at end of file
+    assert check_last_run("test_agent", 0) is True 
+
+def test_pipeline_dependencies_follow_agent_io():
+    """Agents wait only for the agents whose data they read or overwrite."""
+    from core.ctrl import AGENT_IO, PipelineNode, pipeline_dependencies
+    nodes = [PipelineNode(name, None, **AGENT_IO[name])
+             for name in ["conflict_agent", "ai_news_agent", "insight_agent", "llm_report_agent", "substack_agent"]]
+    assert pipeline_dependencies(nodes) == {
+        "conflict_agent": [],
+        "ai_news_agent": [],
+        "insight_agent": ["conflict_agent"],
+        "llm_report_agent": ["insight_agent"],
+        "substack_agent": ["conflict_agent"],
+    }
+
+
+def test_run_dag_overlaps_independent_nodes_and_records_timings():
+    """Independent nodes run concurrently; a failing node does not stop the others."""
+    import threading
+    from core.ctrl import PipelineNode, run_dag
+    both_running = threading.Barrier(2, timeout=5)
+    order = []
+
+    def step(name, fail=False):
+        def func():
+            if name in ("a", "b"):
+                both_running.wait()  # deadlocks unless a and b overlap
+            order.append(name)
+            if fail:
+                raise ValueError("boom")
+            return name.upper()
+        return func
+
+    records = run_dag([
+        PipelineNode("a", step("a"), outputs=["x"]),
+        PipelineNode("b", step("b", fail=True), outputs=["y"]),
+        PipelineNode("c", step("c"), inputs=["x", "y"]),
+    ], workers=2)
+    assert order[-1] == "c"
+    assert records["a"]["result"] == "A" and records["c"]["status"] == "success"
+    assert records["b"]["status"] == "exception" and records["b"]["error"] == "boom"
+    assert records["c"]["started"] >= records["a"]["started"] + records["a"]["duration"] - 0.01
@@ -0,0 +1,64 @@
+"""
+Unit tests for the columnar EventTable.
+"""
+import json
+
+import numpy as np
+import pandas as pd
+
+from src.agents.conflict_agent import flag_event
+from src.core.event_table import EventRow, EventTable
+
+
+def _events():
+    return [
+        {"event_id_cnty": "MLI1", "country": "Mali", "event_type": "Battles",
+         "latitude": "14.5", "longitude": "-4.2", "fatalities": "12"},
+        {"event_id_cnty": "MLI2", "country": "Mali", "event_type": "Protests",
+         "latitude": "", "longitude": "-4.1", "fatalities": "0", "notes": "march"},
+        {"event_id_cnty": "TCD1", "country": "Chad", "event_type": "Battles",
+         "latitude": "12.1", "longitude": "15.0"},
+    ]
+
+
+def test_records_are_interned_and_typed():
+    table = EventTable.from_records(_events())
+    assert len(table) == 3 and table.columns[-1] == "notes"
+    codes, vocab = table.codes("country")
+    assert list(codes) == [0, 0, 1] and list(vocab) == ["Mali", "Chad"]
+    assert table["fatalities"].dtype == np.int32 and list(table["fatalities"]) == [12, 0, 0]
+    assert np.isnan(table["latitude"][1])
+
+    row = table[0]
+    assert isinstance(row, EventRow) and not hasattr(row, "__dict__")
+    assert row["country"] == "Mali" and row.get("notes") is None and row.get("missing", 1) == 1
+    assert flag_event(row)["flagged"] and not flag_event(table[-1])["flagged"]
+    assert table.to_records()[2] == {"event_id_cnty": "TCD1", "country": "Chad", "event_type": "Battles",
+                                     "latitude": 12.1, "longitude": 15.0, "fatalities": 0, "notes": None}
+
+
+def test_slices_share_arrays_and_concat_merges_vocabularies():
+    table = EventTable.from_records(_events())
+    head = table[:2]
+    assert np.shares_memory(head["latitude"], table["latitude"])
+    assert head.codes("country")[1] is table.codes("country")[1]
+    assert [r["event_id_cnty"] for r in table[table["fatalities"] == 0]] == ["MLI2", "TCD1"]
+
+    other = EventTable.from_records([{"event_id_cnty": "SDN1", "country": "Sudan", "fatalities": 3}])
+    both = EventTable.concat([table, other])
+    assert list(both["country"]) == ["Mali", "Mali", "Chad", "Sudan"]
+    assert list(both["fatalities"]) == [12, 0, 0, 3] and np.isnan(both["latitude"][3])
+
+
+def test_frame_and_json_round_trips():
+    table = EventTable.from_records(_events())
+    frame = table.to_frame()
+    assert isinstance(frame["country"].dtype, pd.CategoricalDtype)
+    assert frame["fatalities"].tolist() == [12, 0, 0]
+    assert EventTable.from_frame(frame).to_records() == table.to_records()
+
+    frame = frame.assign(event_date=pd.to_datetime(["2025-01-01", None, "2025-01-03"]))
+    restored = EventTable.from_json(EventTable.from_frame(frame).to_json())
+    assert restored.to_records() == EventTable.from_frame(frame).to_records()
+    assert restored[1]["event_date"] is None
+    assert EventTable.from_json(json.dumps(_events())).to_records() == table.to_records()
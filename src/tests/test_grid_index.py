@@ -0,0 +1,47 @@
+"""
+Unit tests for the spatial grid index.
+"""
+import numpy as np
+
+from src.enrichment.grid_index import GridIndex, cell_centers, cell_ids, haversine_km, rank_cells
+
+
+def _points(n=20000, seed=1):
+    rng = np.random.default_rng(seed)
+    lat, lon = rng.uniform(-90, 90, n), rng.uniform(-180, 180, n)
+    lat[:5] = np.nan
+    return lat, lon
+
+
+def test_cell_ids_and_centers():
+    cells = cell_ids([0.05, 0.05, 90, -90, np.nan, 12.0], [0.05, 0.07, 180, -180, 10, 200], cell_deg=0.1)
+    assert cells[0] == cells[1] >= 0
+    assert cells[2] >= 0 and cells[3] == 0
+    assert list(cells[4:]) == [-1, -1]
+    lat, lon = cell_centers(cells[:1], cell_deg=0.1)
+    assert np.allclose([lat[0], lon[0]], [0.05, 0.05])
+
+
+def test_bbox_and_radius_match_a_scan():
+    lat, lon = _points()
+    index = GridIndex(lat, lon, cell_deg=1.0)
+    for box in [(10, 20, 15, 30), (-5, 170, 5, -170), (80, -180, 90, 180)]:
+        min_lat, min_lon, max_lat, max_lon = box
+        in_lon = (lon >= min_lon) & (lon <= max_lon) if min_lon <= max_lon else (lon >= min_lon) | (lon <= max_lon)
+        expected = np.flatnonzero((lat >= min_lat) & (lat <= max_lat) & in_lon)
+        assert np.array_equal(index.bbox(*box), expected)
+    for lat0, lon0, km in [(10, 20, 500), (0, 179.5, 800), (88, 0, 600)]:
+        expected = np.flatnonzero(haversine_km(lat0, lon0, lat, lon) <= km)
+        assert np.array_equal(index.radius(lat0, lon0, km), expected)
+
+
+def test_density_ranks_cells_by_count_and_weight():
+    index = GridIndex([1.01, 1.02, 1.03, 5.0, 5.01, -40.0, np.nan], [1.0, 1.01, 1.02, 5.0, 5.0, 3.0, 0.0],
+                      cell_deg=0.5)
+    ranked = index.density()
+    assert list(ranked["count"]) == [3, 2, 1]
+    assert np.allclose(ranked.loc[0, ["latitude", "longitude"]].astype(float), [1.25, 1.25])
+    weighted = index.density(weights=[1, 1, 1, 0, 0, 9, 1], k=1)
+    assert list(weighted["count"]) == [9] and weighted.loc[0, "latitude"] == -39.75
+    assert list(index.density(points=np.array([3, 4]))["count"]) == [2]
+    assert rank_cells(np.array([-1, -1])).empty
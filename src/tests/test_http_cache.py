@@ -0,0 +1,87 @@
+"""
+Unit tests for the on-disk HTTP cache used by source fetchers.
+"""
+import time
+
+import pytest
+
+from src.core import http_cache
+from src.sources.ai import arxiv
+
+
+RSS = b"""<rss><channel>
+<item><title>Sparse agents</title><link>https://arxiv.org/abs/1</link><description>New method</description></item>
+</channel></rss>"""
+
+
+class FakeResp:
+    def __init__(self, status_code, content=b"", headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise http_cache.requests.HTTPError(str(self.status_code))
+
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        self.calls.append({"url": url, "params": params, "headers": headers})
+        return self.responses.pop(0)
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(http_cache, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(http_cache, "OFFLINE", False)
+    return tmp_path
+
+
+def _no_network():
+    raise AssertionError("network used")
+
+
+def test_fetch_runs_from_seeded_cache_offline(cache_dir, monkeypatch):
+    http_cache.store_response("https://export.arxiv.org/rss/cs.AI", RSS, fetched_at=0)
+    monkeypatch.setattr(http_cache, "OFFLINE", True)
+    monkeypatch.setattr(http_cache, "get_session", _no_network)
+
+    assert arxiv.fetch() == RSS.decode()
+    with pytest.raises(http_cache.CacheMiss):
+        arxiv.fetch("cs.LG")
+
+
+def test_fresh_entry_skips_network_and_ignores_secret_params(cache_dir, monkeypatch):
+    url = "https://api.example.org/series"
+    http_cache.store_response(url, b'{"v": 1}', params={"id": "X", "api_key": "old"})
+    monkeypatch.setattr(http_cache, "get_session", _no_network)
+
+    resp = http_cache.cached_get(url, params={"id": "X", "api_key": "new"}, ttl=60)
+
+    assert resp.from_cache
+    assert resp.json() == {"v": 1}
+
+
+def test_stale_entry_revalidates_and_serves_304_from_disk(cache_dir, monkeypatch):
+    url = "https://api.example.org/feed"
+    http_cache.store_response(url, b"cached", headers={"ETag": '"abc"', "Last-Modified": "Mon"},
+                              fetched_at=time.time() - 120)
+    session = FakeSession([FakeResp(304), FakeResp(200, b"fresh", {"ETag": '"def"'})])
+    monkeypatch.setattr(http_cache, "get_session", lambda: session)
+
+    first = http_cache.cached_get(url, ttl=60)
+    assert first.from_cache and first.content == b"cached"
+    assert session.calls[0]["headers"] == {"If-None-Match": '"abc"', "If-Modified-Since": "Mon"}
+
+    # the 304 refreshed fetched_at, so the next call within the TTL stays local
+    assert http_cache.cached_get(url, ttl=60).content == b"cached"
+    assert len(session.calls) == 1
+
+    updated = http_cache.cached_get(url, ttl=0)
+    assert not updated.from_cache and updated.content == b"fresh"
+    assert http_cache._read(http_cache.cache_key(url))[0]["etag"] == '"def"'
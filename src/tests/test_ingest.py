@@ -0,0 +1,66 @@
+"""
+Unit tests for parallel source ingestion.
+"""
+import asyncio
+import time
+import types
+
+from src.sources import ingest
+
+
+def _source(name, delay=0.0, fail=False, use_async=False):
+    mod = types.SimpleNamespace()
+
+    def fetch():
+        time.sleep(delay)
+        if fail:
+            raise RuntimeError(f"{name} down")
+        return [name]
+
+    async def afetch():
+        await asyncio.sleep(delay)
+        return [name]
+
+    if use_async:
+        mod.afetch = afetch
+    mod.fetch = fetch
+    mod.normalize = lambda raw: [{"source": item} for item in raw]
+    return mod
+
+
+def _patch_sources(monkeypatch, modules):
+    monkeypatch.setattr(ingest, "get_source", lambda dom, sid: modules[sid])
+    return {"conflict": [{"id": sid} for sid in modules]}
+
+
+def test_ingest_runs_sources_concurrently_in_registry_order(monkeypatch):
+    modules = {
+        "slow": _source("slow", delay=0.3),
+        "async": _source("async", delay=0.3, use_async=True),
+        "fast": _source("fast", delay=0.3),
+    }
+    registry = _patch_sources(monkeypatch, modules)
+
+    started = time.perf_counter()
+    result = ingest.ingest_sources(registry, domains=["conflict"])
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.8
+    assert [i["source"] for i in result["insights"]] == ["slow", "async", "fast"]
+    assert all(s["status"] == "ok" and s["count"] == 1 for s in result["sources"].values())
+
+
+def test_ingest_returns_partial_results_on_timeout_and_error(monkeypatch):
+    modules = {
+        "hung": _source("hung", delay=2.0),
+        "broken": _source("broken", fail=True),
+        "ok": _source("ok"),
+    }
+    registry = _patch_sources(monkeypatch, modules)
+
+    result = ingest.ingest_sources(registry, domains=["conflict"], timeout=0.2)
+
+    assert result["insights"] == [{"source": "ok"}]
+    assert result["sources"]["conflict/hung"]["status"] == "timeout"
+    assert result["sources"]["conflict/broken"]["status"] == "error"
+    assert "broken down" in result["sources"]["conflict/broken"]["error"]
@@ -0,0 +1,104 @@
+"""
+Tests for incremental InsightAgent runs over the persisted InsightState.
+"""
+import random
+
+from src.agents.insight_agent import InsightAgent
+from src.db.raw_archive import ArchiveWriter, archive_path
+from src.enrichment.insight_state import InsightState
+
+COUNTRIES = ["Mali", "Chad", "Niger"]
+EVENT_TYPES = ["Battles", "Protests", "Riots", "Violence against civilians"]
+
+
+def _events(rng, ids, month):
+    events = []
+    for i in ids:
+        country = rng.choice(COUNTRIES)
+        events.append({
+            "event_id_cnty": f"E{i}",
+            "event_date": f"2025-{month:02d}-{rng.randint(1, 28):02d}",
+            "event_type": rng.choice(EVENT_TYPES),
+            "actor1": rng.choice(["Army", "Rebels", "Militia", "Protesters", ""]),
+            "actor2": rng.choice(["Army", "Civilians", ""]),
+            "country": country,
+            "location": f"{country} {rng.randint(0, 4)}",
+            "latitude": f"{rng.uniform(10, 20):.4f}",
+            "longitude": f"{rng.uniform(0, 20):.4f}",
+            "fatalities": str(rng.choice([0, 0, 1, 3, 12])),
+            "notes": f"event {i}",
+        })
+    return events
+
+
+def _write(raw_dir, day, events):
+    with ArchiveWriter(archive_path(raw_dir, day), group_rows=50) as writer:
+        writer.write_all(events)
+
+
+def _insights(raw_dir, processed_dir, mode):
+    agent = InsightAgent(raw_data_dir=raw_dir, processed_data_dir=processed_dir, mode=mode)
+    agent.load_data()
+    for step in (agent.extract_metadata, agent.extract_country_profiles, agent.extract_event_type_summary,
+                 agent.extract_actor_profiles, agent.identify_hotspots, agent.extract_map_cells,
+                 agent.identify_strategic_alerts, agent.extract_event_samples):
+        step()
+    agent.insights["metadata"]["generated_at"] = ""
+    return agent
+
+
+def test_incremental_runs_match_a_full_rebuild(tmp_path):
+    raw_dir, processed_dir = tmp_path / "raw", tmp_path / "processed"
+    rng = random.Random(3)
+    _write(raw_dir, "2025-02-01", _events(rng, range(0, 300), 1))
+    _insights(raw_dir, processed_dir, "incremental")
+
+    # a later run revises some earlier events and adds new ones
+    revised = _events(rng, range(250, 320), 2)
+    _write(raw_dir, "2025-03-01", revised + _events(rng, range(320, 500), 3))
+    _insights(raw_dir, processed_dir, "incremental")
+    # the same day's archive is rewritten by a rerun
+    _write(raw_dir, "2025-04-01", _events(rng, range(500, 560), 3))
+    _insights(raw_dir, processed_dir, "incremental")
+    _write(raw_dir, "2025-04-01", [dict(e, actor1="New Front") for e in _events(rng, range(540, 600), 4)])
+    incremental = _insights(raw_dir, processed_dir, "incremental")
+
+    full = _insights(raw_dir, tmp_path / "rebuilt", "full")
+    assert incremental.state.events.equals(full.state.events)
+    assert incremental.state.actors.equals(full.state.actors)
+    assert incremental.insights == full.insights
+    assert incremental.insights["metadata"]["total_events"] == 560
+    assert incremental.insights["events"] and incremental.insights["strategic_alerts"]
+    assert len(incremental.insights["map_cells"]) == 500
+    # every event has coordinates, so the uncapped map cells hold all of them
+    incremental.extract_map_cells(limit=None)
+    assert sum(c["count"] for c in incremental.insights["map_cells"]) == 560
+    assert all(h["cell"] >= 0 for h in incremental.insights["hotspots"])
+
+
+def test_incremental_run_only_reads_new_archives(tmp_path, monkeypatch):
+    raw_dir, processed_dir = tmp_path / "raw", tmp_path / "processed"
+    rng = random.Random(5)
+    _write(raw_dir, "2025-02-01", _events(rng, range(0, 100), 1))
+    first = InsightAgent(raw_data_dir=raw_dir, processed_data_dir=processed_dir, mode="incremental")
+    assert first.update_state() == 100
+    _write(raw_dir, "2025-03-01", _events(rng, range(100, 130), 2))
+
+    merged = []
+    monkeypatch.setattr(InsightState, "merge", lambda self, batches: merged.extend(p for p, _ in batches) or 0)
+    second = InsightAgent(raw_data_dir=raw_dir, processed_data_dir=processed_dir, mode="incremental")
+    second.update_state()
+    assert [p.rsplit("/", 1)[-1] for p in merged] == ["conflict_2025-03-01.cols.zip"]
+    assert len(second.state) == 100
+
+
+def test_latest_mode_reports_on_the_newest_archive_only(tmp_path):
+    raw_dir = tmp_path / "raw"
+    rng = random.Random(7)
+    _write(raw_dir, "2025-02-01", _events(rng, range(0, 80), 1))
+    _write(raw_dir, "2025-03-01", _events(rng, range(80, 120), 2))
+
+    latest = _insights(raw_dir, tmp_path / "processed", "latest")
+    assert latest.insights["metadata"]["total_events"] == 40
+    assert {e["event_id_cnty"] for e in latest.insights["events"]} <= {f"E{i}" for i in range(80, 120)}
+    assert not (tmp_path / "processed" / "insight_state.pkl").exists()
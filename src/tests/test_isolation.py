@@ -0,0 +1,62 @@
+"""
+Tests for process-isolated agent execution.
+"""
+import functools
+import io
+import os
+import time
+
+import pytest
+
+from src.core.isolation import AgentProcessError, AgentProcessPool, AgentTimeout
+
+
+@pytest.fixture
+def pool():
+    pool = AgentProcessPool(size=1, max_tasks=3)
+    yield pool
+    pool.shutdown()
+
+
+def test_workers_are_reused_and_recycled(pool):
+    pids = [pool.run("getpid", os.getpid) for _ in range(4)]
+    assert os.getpid() not in pids
+    assert pids[0] == pids[1] == pids[2] != pids[3]
+
+
+def test_output_streams_back_and_errors_raise(pool):
+    out = io.StringIO()
+    assert pool.run("echo", functools.partial(print, "hello from the worker"), stdout=out) is None
+    assert out.getvalue() == "hello from the worker\n"
+    with pytest.raises(AgentProcessError, match="ValueError") as error:
+        pool.run("bad", functools.partial(int, "x"))
+    assert "Traceback" in error.value.remote_traceback
+
+
+def test_timeout_kills_the_worker(pool):
+    pid = pool.run("getpid", os.getpid)
+    started = time.monotonic()
+    with pytest.raises(AgentTimeout):
+        pool.run("hang", functools.partial(time.sleep, 60), timeout=1)
+    assert time.monotonic() - started < 10
+    assert pool.run("getpid", os.getpid) != pid
+
+
+def test_memory_ceiling(pool):
+    with pytest.raises(AgentProcessError, match="MemoryError"):
+        pool.run("hog", functools.partial(bytearray, 2048 * 1024 * 1024), memory_mb=512)
+    # the limit is lifted once the task is over
+    assert len(pool.run("alloc", functools.partial(bytearray, 1024 * 1024 * 1024))) == 1024 * 1024 * 1024
+
+
+def test_execute_agent_logs_a_timeout(tmp_path, monkeypatch, pool):
+    from src.core import ctrl
+    monkeypatch.setattr(ctrl, "STATE_FILE", str(tmp_path / "state.db"))
+    statuses = []
+    monkeypatch.setattr(ctrl, "_append_runlog", lambda name, status, *args, **kwargs: statuses.append(status))
+    with pytest.raises(AgentTimeout):
+        ctrl.execute_agent(functools.partial(time.sleep, 60), "sleepy_agent", 0,
+                           isolation="process", timeout=1, pool=pool)
+    assert statuses == ["timeout"]
+    assert ctrl.get_state_store().get("sleepy_agent")["failure_count"] == 1
+    ctrl.get_state_store().close()
@@ -0,0 +1,70 @@
+"""
+Unit tests for the vectorized group profile engine.
+"""
+import numpy as np
+import pandas as pd
+
+from src.enrichment.profiles import actor_table, group_stats, top_counts, top_groups, top_values, trend_label
+
+
+def _frame():
+    rows = [
+        ("2025-01-01", "Chad", "Battles", "A", "B", "Abeche", 2),
+        ("2025-01-02", "Chad", "Riots", "A", None, "Abeche", 0),
+        ("2025-01-30", "Chad", "Battles", "B", "A", "Mongo", 5),
+        ("2025-01-31", "Chad", "Battles", "C", "C", "Mongo", 1),
+        ("2025-01-10", "Mali", "Protests", "B", None, "Gao", 0),
+        ("2025-01-20", "Mali", "Protests", "D", "A", "Gao", 3),
+    ]
+    df = pd.DataFrame(rows, columns=["event_date", "country", "event_type", "actor1", "actor2",
+                                     "location", "fatalities"])
+    df["event_date"] = pd.to_datetime(df["event_date"])
+    for col in ["country", "event_type", "actor1", "actor2", "location"]:
+        df[col] = df[col].astype("category")
+    return df
+
+
+def _legacy_trend(dates):
+    quarter = (dates.max() - dates.min()) / 4
+    recent = (dates >= dates.max() - quarter).sum()
+    early = (dates <= dates.min() + quarter).sum()
+    return (recent - early) / early
+
+
+def test_group_stats_match_per_group_computation():
+    df = _frame()
+    stats = group_stats(df, "country")
+
+    assert list(stats.index) == ["Chad", "Mali"]
+    assert stats["events"].tolist() == [4, 2] and stats["fatalities"].tolist() == [8, 3]
+    for country, group in df.groupby("country", observed=True):
+        assert np.isclose(stats.loc[country, "trend_factor"], _legacy_trend(group["event_date"]))
+    assert trend_label(0.5) == "increasing" and trend_label(-0.5) == "decreasing" and trend_label(0) == "stable"
+
+
+def test_top_k_orders_by_count_then_value():
+    df = _frame()
+    assert top_counts(df, "country", "event_type") == {"Chad": {"Battles": 3, "Riots": 1}, "Mali": {"Protests": 2}}
+    assert top_counts(df, "country", "actor1", 2)["Chad"] == {"A": 2, "B": 1}
+    assert top_groups(df, "country", "location", 1) == {"Chad": [("Abeche", 2, 2)], "Mali": [("Gao", 2, 3)]}
+    assert top_values(df["actor1"], 3) == ["A", "B", "C"]
+
+
+def test_actor_table_counts_each_event_once_per_actor():
+    df = _frame()
+    actors = actor_table(df, ["A", "C"], keep=["country", "fatalities", "event_date"])
+
+    assert sorted(actors["actor"].astype(str)) == ["A", "A", "A", "A", "C"]
+    stats = group_stats(actors, "actor")
+    assert stats.loc["A", "events"] == 4 and stats.loc["A", "fatalities"] == 10
+    assert top_counts(actors, "actor", "actor2")["A"] == {"A": 2, "B": 1}
+
+
+def test_weighted_rows_match_expanded_rows():
+    df = _frame()
+    cube = df.groupby(["event_date", "country", "event_type"], observed=True) \
+        .agg(fatalities=("fatalities", "sum"), n=("fatalities", "size")).reset_index()
+
+    weighted = group_stats(cube, "event_type", weight="n")
+    pd.testing.assert_frame_equal(weighted, group_stats(df, "event_type"), check_index_type=False)
+    assert top_counts(cube, "event_type", "country", weight="n") == top_counts(df, "event_type", "country")
@@ -0,0 +1,93 @@
+"""
+Unit tests for the compressed raw event archive.
+"""
+import json
+import os
+
+from src.db.raw_archive import (ArchiveWriter, archive_path, iter_archive, latest_archive, list_archives,
+                                 read_archive, read_rows)
+
+
+def _event(i):
+    return {"event_id_cnty": f"E{i}", "event_date": "2025-04-19", "event_type": "Battles",
+            "latitude": "15.5", "longitude": "32.5", "fatalities": str(i), "notes": "x" * 50}
+
+
+def test_archive_round_trip_with_selected_columns(tmp_path):
+    path = archive_path(tmp_path, "2025-04-19")
+    with ArchiveWriter(path) as writer:
+        writer.write_all(_event(i) for i in range(3))
+        writer.write_all([_event(3)])
+
+    assert [e["event_id_cnty"] for e in iter_archive(path)] == ["E0", "E1", "E2", "E3"]
+    df = read_archive(path, columns=["latitude", "longitude", "fatalities", "missing"])
+    assert list(df.columns) == ["latitude", "longitude", "fatalities", "missing"]
+    assert df["latitude"].dtype == "float64" and df["fatalities"].tolist() == [0, 1, 2, 3]
+    assert df["missing"].isna().all()
+    assert str(read_archive(path)["event_date"].dtype).startswith("datetime64")
+
+
+def test_empty_or_failed_write_keeps_previous_archive(tmp_path):
+    path = archive_path(tmp_path, "2025-04-19")
+    with ArchiveWriter(path) as writer:
+        writer.write_all([_event(1)])
+    with ArchiveWriter(path):
+        pass
+    try:
+        with ArchiveWriter(path) as writer:
+            writer.write_all([_event(2)])
+            raise RuntimeError("fetch failed")
+    except RuntimeError:
+        pass
+    assert [e["event_id_cnty"] for e in iter_archive(path)] == ["E1"]
+    assert os.listdir(tmp_path) == [os.path.basename(path)]
+
+
+def test_merge_keeps_earlier_events_of_the_day(tmp_path):
+    path = archive_path(tmp_path, "2025-04-19")
+    with ArchiveWriter(path) as writer:
+        writer.write_all([_event(i) for i in range(50)])
+    with ArchiveWriter(path, group_rows=20, merge=True) as writer:
+        writer.write_all([dict(_event(3), fatalities=99), _event(50)])
+    events = list(iter_archive(path))
+    assert [e["event_id_cnty"] for e in events] == ["E3", "E50"] + [f"E{i}" for i in range(50) if i != 3]
+    assert events[0]["fatalities"] == 99
+    assert os.listdir(tmp_path) == [os.path.basename(path)]
+
+
+def test_list_archives_reads_legacy_json_and_filters_by_date(tmp_path):
+    (tmp_path / "conflict_2025-04-17.json").write_text(json.dumps([{"flagged": True, "event": _event(7)}]))
+    (tmp_path / "conflict_2025-04-18.json").write_text(json.dumps([_event(8)]))
+    with ArchiveWriter(archive_path(tmp_path, "2025-04-18")) as writer:
+        writer.write_all([_event(9)])
+
+    archives = list_archives(tmp_path, start="2025-04-17", end="2025-04-18")
+    assert [day for day, _ in archives] == ["2025-04-17", "2025-04-18"]
+    assert archives[1][1].endswith(".cols.zip")
+    df = read_archive([path for _, path in archives], columns=["event_id_cnty"])
+    assert df["event_id_cnty"].tolist() == ["E7", "E9"]
+    assert latest_archive(tmp_path) == archives[1][1]
+
+
+def test_read_archive_applies_dtypes_per_group(tmp_path):
+    path = archive_path(tmp_path, "2025-04-19")
+    events = [dict(_event(i), actor1="Group A" if i % 2 else "") for i in range(5)]
+    with ArchiveWriter(path, group_rows=2) as writer:
+        writer.write_all(events)
+
+    df = read_archive(path, columns=["actor1", "latitude", "fatalities"],
+                      dtypes={"actor1": "category", "latitude": "float32", "fatalities": "int32"})
+    assert str(df["actor1"].dtype) == "category" and list(df["actor1"].cat.categories) == ["Group A"]
+    assert df["actor1"].isna().tolist() == [True, False, True, False, True]
+    assert df["latitude"].dtype == "float32" and df["fatalities"].dtype == "int32"
+
+
+def test_read_rows_returns_requested_events_in_order(tmp_path):
+    path = archive_path(tmp_path, "2025-04-19")
+    with ArchiveWriter(path, group_rows=3) as writer:
+        writer.write_all(dict(_event(i), **({"source": "radio"} if i == 7 else {})) for i in range(10))
+
+    df = read_rows(path, [8, 0, 7, 3])
+    assert df["event_id_cnty"].tolist() == ["E8", "E0", "E7", "E3"]
+    assert df["fatalities"].tolist() == [8, 0, 7, 3]
+    assert df["source"].tolist() == [None, None, "radio", None]
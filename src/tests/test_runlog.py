@@ -0,0 +1,59 @@
+"""
+Tests for the rotating NDJSON run log.
+"""
+import json
+import threading
+
+from src.core import runlog as runlog_module
+from src.core.runlog import RunLog
+
+
+def _entry(i, day="2025-05-01"):
+    return {"timestamp": f"{day}T00:{i // 60:02d}:{i % 60:02d}", "agent": f"agent_{i % 3}", "status": "success"}
+
+
+def test_appends_rotate_by_size_and_day(tmp_path, monkeypatch):
+    log = RunLog(str(tmp_path / "runlog"), max_bytes=400, legacy_path=None)
+    for i in range(20):
+        log.append(_entry(i))
+    monkeypatch.setattr(runlog_module, "datetime", type("Tomorrow", (runlog_module.datetime,), {
+        "utcnow": classmethod(lambda cls: runlog_module.datetime(2099, 1, 2))}))
+    log.append(_entry(20, day="2099-01-02"))
+
+    segments = log.segments()
+    assert len(segments) > 2 and segments[-1]["file"] == "runlog-20990102-000.ndjson"
+    assert sum(s["count"] for s in segments[:-1]) == 20
+    assert all(s["count"] is None or s["count"] > 0 for s in segments)
+    assert [e["timestamp"] for e in log.tail(3)] == [_entry(18)["timestamp"], _entry(19)["timestamp"],
+                                                    "2099-01-02T00:00:20"]
+    # a reopened log sees the same segments
+    assert RunLog(str(tmp_path / "runlog"), legacy_path=None).segments() == segments
+
+
+def test_read_range_opens_only_overlapping_segments(tmp_path, monkeypatch):
+    log = RunLog(str(tmp_path / "runlog"), max_bytes=300, legacy_path=None)
+    for i in range(30):
+        log.append(_entry(i))
+
+    opened = []
+    read_lines = runlog_module._read_lines
+    monkeypatch.setattr(runlog_module, "_read_lines", lambda path: opened.append(path) or read_lines(path))
+    entries = log.read_range("2025-05-01T00:00:25", "2025-05-01T00:00:27")
+    assert [e["timestamp"][-2:] for e in entries] == ["25", "26", "27"]
+    assert len(opened) <= 2 < len(log.segments())
+    assert len(log.read_range()) == 30 and len(log.read_range("not a date")) == 30
+
+
+def test_legacy_runlog_is_imported_and_concurrent_appends_are_kept(tmp_path):
+    legacy = tmp_path / "runlog.json"
+    legacy.write_text(json.dumps([_entry(i, day="2025-04-01") for i in range(5)]))
+    log = RunLog(str(tmp_path / "runlog"), legacy_path=str(legacy))
+
+    threads = [threading.Thread(target=lambda k=k: [log.append(_entry(k * 50 + i)) for i in range(50)])
+               for k in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(log.read_range()) == 205
+    assert len(log.read_range(end="2025-04-30")) == 5
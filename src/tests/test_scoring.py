@@ -47,4 +47,58 @@ def test_confidence_levels():
     assert high["confidence"] in ["low", "medium", "high"]
     assert low["confidence"] in ["low", "medium", "high"]
     # Should be different confidence levels
-    assert high["relevance"] > low["relevance"] 
\ No newline at end of file
+    assert high["relevance"] > low["relevance"] 
+
+
+def test_novelty_index_expires_whole_days(tmp_path):
+    from datetime import datetime, timedelta
+    from src.scoring.novelty import NoveltyIndex
+
+    path = tmp_path / "novelty.json"
+    idx = NoveltyIndex(str(path), window_days=30)
+    old_day = (datetime.utcnow() - timedelta(days=40)).date().isoformat()
+    idx.update({"ancient"}, day=old_day)
+    idx.update({"recent", "words"})
+    assert "ancient" in idx and "recent" in idx
+
+    # the cutoff has not moved since update(), so force the window check
+    idx.expire(force=True)
+    assert "ancient" not in idx
+    assert "recent" in idx
+
+    idx.flush()
+    reloaded = NoveltyIndex(str(path), window_days=30)
+    assert "recent" in reloaded and "words" in reloaded
+    assert "ancient" not in reloaded
+
+def test_novelty_index_reads_legacy_layout(tmp_path):
+    import json
+    from datetime import datetime
+    from src.scoring.novelty import NoveltyIndex
+
+    today = datetime.utcnow().date().isoformat()
+    path = tmp_path / "novelty.json"
+    path.write_text(json.dumps({"troop": [today, today], "strike": [today]}))
+    idx = NoveltyIndex(str(path))
+    assert "troop" in idx and "strike" in idx
+    assert idx.days[today]["troop"] == 2
+
+def test_score_insights_matches_per_row_path(tmp_path, monkeypatch):
+    import copy
+    from src.scoring import scorer
+    from src.scoring.scorer import score_insights
+
+    rows = [
+        {"domain": "ai", "title": "New LLM training paper", "body": "Model aims higher", "source_id": "t", "event_date": "2025-04-23"},
+        {"domain": "conflict", "title": "Troop attack reported", "body": "Shelling near the border", "source_id": "t", "event_date": "2025-04-23"},
+        {"domain": "markets", "title": "Bond yield rises", "body": "Equity index price fell", "source_id": "t", "event_date": "2025-04-23", "change_pct": -3.2},
+        {"domain": "ai", "title": "New LLM training paper", "body": "Model aims higher", "source_id": "t", "event_date": "2025-04-23"},
+    ]
+
+    monkeypatch.setattr(scorer, "MEM_PATH", str(tmp_path / "per_row.json"))
+    expected = [score_insight(copy.deepcopy(r)) for r in rows]
+
+    monkeypatch.setattr(scorer, "MEM_PATH", str(tmp_path / "batch.json"))
+    assert score_insights(copy.deepcopy(rows)) == expected
+    # the repeated row must see the words recorded earlier in the same batch
+    assert expected[3]["novelty"] == 0
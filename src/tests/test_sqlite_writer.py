@@ -0,0 +1,216 @@
+"""
+Unit tests for the SQLite conflict event writer.
+"""
+import sqlite3
+
+from src.db.sqlite_writer import ConflictEventWriter
+
+
+def _event(i, **overrides):
+    event = {
+        "event_id_cnty": f"EVT{i}",
+        "event_date": "2025-04-19",
+        "event_type": "Battles",
+        "country": "Sudan",
+        "location": "Khartoum",
+        "fatalities": i % 7,
+        "latitude": 15.5,
+        "longitude": 32.5,
+        "notes": "test event",
+    }
+    event.update(overrides)
+    return event
+
+
+def test_insert_events_reports_inserted_and_ignored(tmp_path):
+    db_path = str(tmp_path / "events.db")
+    with ConflictEventWriter(db_path, chunk_size=3) as writer:
+        first = writer.insert_events(_event(i) for i in range(10))
+        second = writer.insert_events(_event(i) for i in range(5, 15))
+    assert first == {"inserted": 10, "ignored": 0}
+    assert second == {"inserted": 5, "ignored": 5}
+
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM conflict_events").fetchone()[0] == 15
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    city, lat = conn.execute("SELECT city, lat FROM conflict_events WHERE id = 'EVT3'").fetchone()
+    conn.close()
+    assert city == "Khartoum" and lat == 15.5
+
+
+def test_insert_events_tolerates_missing_fields(tmp_path):
+    db_path = str(tmp_path / "events.db")
+    with ConflictEventWriter(db_path) as writer:
+        stats = writer.insert_events([{"event_id_cnty": "ONLY_ID"}])
+    assert stats == {"inserted": 1, "ignored": 0}
+
+
+def test_migrate_adds_summary_indexes(tmp_path):
+    from src.db.sqlite_writer import MIGRATIONS, migrate
+
+    conn = sqlite3.connect(str(tmp_path / "events.db"))
+    assert migrate(conn) == len(MIGRATIONS)
+    # Re-running is a no-op
+    assert migrate(conn) == len(MIGRATIONS)
+    names = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    conn.close()
+    assert {"idx_events_date_type", "idx_events_date_country", "idx_events_date_city"} <= names
+
+
+def test_get_summary_single_pass_breakdowns(tmp_path, monkeypatch):
+    from src.agents import report_agent
+
+    db_path = str(tmp_path / "events.db")
+    events = [
+        _event(1, event_type="Battles", country="Sudan", location="Khartoum", fatalities=5),
+        _event(2, event_type="Battles", country="Sudan", location="Khartoum", fatalities=1),
+        _event(3, event_type="Battles", country="Chad", location="Abeche", fatalities=0),
+        _event(4, event_type="Protests", country="Chad", location="Abeche", fatalities=0),
+        _event(5, event_type="Protests", country="Chad", location="Abeche", fatalities=0, event_date="2025-04-01"),
+    ]
+    with ConflictEventWriter(db_path) as writer:
+        writer.insert_events(events)
+    monkeypatch.setattr(report_agent, "DB_PATH", db_path)
+
+    summary = report_agent.get_summary("daily")
+    assert summary["period"] == "2025-04-19 to 2025-04-19"
+    assert [(s["type"], s["count"], s["fatalities"]) for s in summary["summary"]] == [
+        ("Battles", 3, 6),
+        ("Protests", 1, 0),
+    ]
+    assert summary["top_locations"] == [{"location": "Abeche", "count": 2}, {"location": "Khartoum", "count": 2}]
+    assert summary["countries_by_type"]["Battles"] == [{"country": "Sudan", "count": 2}, {"country": "Chad", "count": 1}]
+    assert report_agent.get_summary("monthly")["summary"][1]["count"] == 2
+
+
+def test_daily_rollup_tracks_inserts_updates_and_deletes(tmp_path):
+    db_path = str(tmp_path / "events.db")
+    with ConflictEventWriter(db_path) as writer:
+        stats = writer.insert_events([_event(1, fatalities=4), _event(2, fatalities=3), _event(2)])
+        assert stats == {"inserted": 2, "ignored": 1}
+        conn = writer.conn
+        rollup = lambda: conn.execute(
+            "SELECT event_date, country, city, event_type, event_count, fatalities FROM daily_rollup ORDER BY 1, 4"
+        ).fetchall()
+        assert rollup() == [("2025-04-19", "Sudan", "Khartoum", "Battles", 2, 7)]
+
+        with conn:
+            conn.execute("UPDATE conflict_events SET event_type = 'Riots', fatalities = 1 WHERE id = 'EVT2'")
+        assert rollup() == [
+            ("2025-04-19", "Sudan", "Khartoum", "Battles", 1, 4),
+            ("2025-04-19", "Sudan", "Khartoum", "Riots", 1, 1),
+        ]
+
+        with conn:
+            conn.execute("DELETE FROM conflict_events WHERE id = 'EVT1'")
+        assert rollup() == [("2025-04-19", "Sudan", "Khartoum", "Riots", 1, 1)]
+
+
+def test_rollup_migration_backfills_existing_events(tmp_path):
+    from src.db.sqlite_writer import migrate
+
+    db_path = str(tmp_path / "events.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE conflict_events (id TEXT PRIMARY KEY, event_date TEXT, event_type TEXT, "
+                 "country TEXT, admin1 TEXT, city TEXT, fatalities INTEGER)")
+    conn.executemany("INSERT INTO conflict_events VALUES (?, ?, ?, ?, ?, ?, ?)", [
+        ("a", "2025-04-18", "Battles", "Mali", None, "Gao", 2),
+        ("b", "2025-04-18", "Battles", "Mali", None, "Gao", 5),
+    ])
+    conn.commit()
+    migrate(conn)
+    assert conn.execute("SELECT admin1, event_count, fatalities FROM daily_rollup").fetchall() == [("", 2, 7)]
+    conn.close()
+
+
+def test_upsert_events_applies_newer_revisions(tmp_path):
+    db_path = str(tmp_path / "events.db")
+    with ConflictEventWriter(db_path) as writer:
+        first = writer.upsert_events([_event(1, timestamp=100), _event(2, timestamp=100)])
+        second = writer.upsert_events([
+            _event(1, timestamp=200, fatalities=9),  # revised
+            _event(2, timestamp=100, fatalities=8),  # same revision
+            _event(3, timestamp=200),
+        ])
+        rows = writer.conn.execute("SELECT id, fatalities, acled_timestamp FROM conflict_events ORDER BY id").fetchall()
+        rollup = writer.conn.execute("SELECT event_count, fatalities FROM daily_rollup").fetchall()
+    assert first == {"inserted": 2, "updated": 0, "ignored": 0}
+    assert second == {"inserted": 1, "updated": 1, "ignored": 1}
+    assert rows == [("EVT1", 9, 200), ("EVT2", 2, 100), ("EVT3", 3, 200)]
+    assert rollup == [(3, 14)]
+
+
+def test_watermark_only_moves_forward(tmp_path):
+    with ConflictEventWriter(str(tmp_path / "events.db")) as writer:
+        assert writer.get_watermark("all") is None
+        writer.set_watermark("all", "2025-04-19", 500)
+        writer.set_watermark("all", "2025-04-17", 300)
+        assert writer.get_watermark("all") == {"last_event_date": "2025-04-19", "last_timestamp": 500}
+
+
+def test_get_summary_migrates_once_per_process(tmp_path, monkeypatch):
+    from src.agents import report_agent
+    from src.db import sqlite_writer
+
+    db_path = str(tmp_path / "events.db")
+    monkeypatch.setattr(report_agent, "DB_PATH", db_path)
+    calls = []
+    real_migrate = sqlite_writer.migrate
+    monkeypatch.setattr(sqlite_writer, "migrate", lambda conn: calls.append(1) or real_migrate(conn))
+
+    for _ in range(3):
+        report_agent.get_summary("daily")
+    assert len(calls) == 1
+
+
+def test_migrate_resumes_a_half_applied_migration(tmp_path):
+    from src.db.sqlite_writer import MIGRATIONS, migrate
+
+    db_path = str(tmp_path / "events.db")
+    conn = sqlite3.connect(db_path)
+    migrate(conn)
+    # as left by a crash between the ALTER and the version bump
+    conn.execute("PRAGMA user_version = 2;")
+    assert migrate(conn) == len(MIGRATIONS)
+    conn.close()
+
+
+def test_failed_migration_rolls_back_its_ddl(tmp_path, monkeypatch):
+    import pytest
+    from src.db import sqlite_writer
+
+    db_path = str(tmp_path / "events.db")
+    init_version = sqlite_writer.migrate(sqlite3.connect(db_path))
+    monkeypatch.setattr(sqlite_writer, "MIGRATIONS", sqlite_writer.MIGRATIONS + [
+        ["CREATE TABLE half_done (x INTEGER);", "ALTER TABLE missing_table ADD COLUMN y INTEGER;"],
+    ])
+    conn = sqlite3.connect(db_path)
+    with pytest.raises(sqlite3.OperationalError):
+        sqlite_writer.migrate(conn)
+    assert conn.execute("PRAGMA user_version;").fetchone()[0] == init_version
+    assert conn.execute("SELECT name FROM sqlite_master WHERE name = 'half_done'").fetchone() is None
+    conn.close()
+
+
+def test_concurrent_migrations_of_a_fresh_database(tmp_path):
+    import threading
+    from src.db.sqlite_writer import MIGRATIONS, migrate
+
+    db_path = str(tmp_path / "events.db")
+    versions, errors = [], []
+
+    def run():
+        conn = sqlite3.connect(db_path, timeout=10)
+        try:
+            versions.append(migrate(conn))
+        except Exception as e:
+            errors.append(e)
+        finally:
+            conn.close()
+
+    threads = [threading.Thread(target=run) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == [] and versions == [len(MIGRATIONS)] * 4
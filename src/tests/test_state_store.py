@@ -0,0 +1,52 @@
+"""
+Tests for the SQLite pipeline state store.
+"""
+import json
+import threading
+
+from src.db import state_store
+from src.db.state_store import StateStore, read_state
+
+
+def test_record_run_keeps_history(tmp_path):
+    store = StateStore(str(tmp_path / "state.db"))
+    store.record_run("conflict_agent", True, duration=2.5, at="2025-05-01T00:00:00")
+    row = store.record_run("conflict_agent", False, at="2025-05-02T00:00:00")
+    assert row == {"last_run": "2025-05-02T00:00:00", "last_success": "2025-05-01T00:00:00",
+                   "last_failure": "2025-05-02T00:00:00", "last_duration": 2.5,
+                   "run_count": 2, "failure_count": 1}
+    assert store.last_run("conflict_agent") == "2025-05-02T00:00:00"
+    assert store.last_run("report_agent") is None
+
+
+def test_concurrent_runners_do_not_lose_updates(tmp_path):
+    path = str(tmp_path / "state.db")
+    StateStore(path)
+    stores = [StateStore(path) for _ in range(4)]  # one connection per runner
+    threads = [threading.Thread(target=lambda s=s, k=k: [s.record_run(f"agent_{i % 2}", i % 5 != k)
+                                                         for i in range(50)])
+               for k, s in enumerate(stores)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    rows = read_state(path)
+    assert rows["agent_0"]["run_count"] + rows["agent_1"]["run_count"] == 200
+    assert rows["agent_0"]["failure_count"] + rows["agent_1"]["failure_count"] == 40
+
+
+def test_reads_do_not_wait_for_a_writer_and_cache_expires(tmp_path, monkeypatch):
+    path = str(tmp_path / "state.db")
+    legacy = tmp_path / "pipeline_state.json"
+    legacy.write_text(json.dumps({"insight_agent": "2025-04-01T00:00:00"}))
+    reader, writer = StateStore(path, legacy_json=str(legacy)), StateStore(path)
+    assert reader.last_run("insight_agent") == "2025-04-01T00:00:00"
+
+    writer._conn.execute("BEGIN IMMEDIATE")
+    writer._conn.execute("UPDATE agent_state SET last_run = 'uncommitted'")
+    assert read_state(path)["insight_agent"]["last_run"] == "2025-04-01T00:00:00"
+    writer._conn.execute("COMMIT")
+
+    assert reader.last_run("insight_agent") == "2025-04-01T00:00:00"  # cached
+    monkeypatch.setattr(state_store, "CACHE_TTL", 0)
+    assert reader.last_run("insight_agent") == "uncommitted"
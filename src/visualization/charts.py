@@ -7,14 +7,21 @@ Provides functions to generate charts and maps from conflict data.
 import matplotlib.pyplot as plt
 import pandas as pd
 import numpy as np
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Union
 import os
+import sys
 from pathlib import Path
 import folium
 from folium.plugins import HeatMap
 from datetime import datetime
 import json
 
+# Add the parent directory to the Python path to make imports work
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.core import artifact_cache
+from src.core.event_table import EventTable
+
 # Set matplotlib style for consistent, professional visualizations
 plt.style.use('ggplot')
 
@@ -219,13 +226,16 @@ def top_hotspots_chart(hotspots: List[Dict[str, Any]],
     
     return chart_path
 
-def generate_heatmap(events: List[Dict[str, Any]], title: str = "Conflict Events Heatmap") -> str:
+def generate_heatmap(events: Union[List[Dict[str, Any]], EventTable], title: str = "Conflict Events Heatmap",
+                     cells: Optional[List[Dict[str, Any]]] = None) -> str:
     """
     Generate a Folium heatmap from conflict events.
     
     Args:
-        events: List of conflict events with lat/long data
+        events: List of conflict events with lat/long data, or an EventTable
         title: Map title
+        cells: Pre-binned grid cells (insights["map_cells"]); when given they
+            are drawn weighted by event count instead of the events
         
     Returns:
         Path to saved HTML map
@@ -233,8 +243,16 @@ def generate_heatmap(events: List[Dict[str, Any]], title: str = "Conflict Events
     ensure_dirs()
     
     # Extract coordinates and weight by fatalities (or 1 if no fatalities)
-    heat_data = []
-    for event in events:
+    heat_data = [[cell['latitude'], cell['longitude'], cell['count']] for cell in cells or []]
+    if not heat_data and isinstance(events, EventTable):
+        # Typed columns: filter and weight the whole table at once
+        if 'latitude' in events and 'longitude' in events:
+            lat, lon = events['latitude'], events['longitude']
+            weight = np.maximum(1, events['fatalities']) if 'fatalities' in events else np.ones(len(events))
+            valid = (lat >= -90) & (lat <= 90) & (lon >= -180) & (lon <= 180)
+            heat_data = np.column_stack([lat[valid], lon[valid], weight[valid]]).tolist()
+        events = []
+    for event in events if not heat_data else []:
         lat = event.get('latitude')
         lon = event.get('longitude')
         fatalities = event.get('fatalities', 1)
@@ -274,18 +292,62 @@ def generate_heatmap(events: List[Dict[str, Any]], title: str = "Conflict Events
     
     return map_path
 
-def generate_event_type_maps(events: List[Dict[str, Any]]) -> Dict[str, str]:
+def _cell_points(cells: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Map points per event type from pre-binned grid cells, one per cell."""
+    points_by_type = {}
+    for cell in cells:
+        for event_type, count in cell.get('event_types', {}).items():
+            points_by_type.setdefault(event_type, []).append({
+                'lat': cell['latitude'],
+                'lon': cell['longitude'],
+                'count': count,
+                'fatalities': cell.get('fatalities', 0)
+            })
+    return points_by_type
+
+def generate_event_type_maps(events: Union[List[Dict[str, Any]], EventTable],
+                             cells: Optional[List[Dict[str, Any]]] = None) -> Dict[str, str]:
     """
     Generate a separate map for each event type.
     
     Args:
-        events: List of conflict events
+        events: List of conflict events (or an EventTable, read row by row)
+        cells: Pre-binned grid cells (insights["map_cells"]); when given each
+            map shows one marker per cell sized by its events of that type
         
     Returns:
         Dict mapping event types to their map file paths
     """
     ensure_dirs()
     
+    if cells:
+        map_paths = {}
+        for event_type, points in _cell_points(cells).items():
+            map_path = os.path.join("data", "visualizations", "maps", f"{event_type.replace(' ', '_').replace('/', '_').lower()}_{datetime.now().strftime('%Y%m%d')}.html")
+            avg_lat = sum(p['lat'] * p['count'] for p in points) / sum(p['count'] for p in points)
+            avg_lon = sum(p['lon'] * p['count'] for p in points) / sum(p['count'] for p in points)
+            
+            m = folium.Map(location=[avg_lat, avg_lon], zoom_start=4, tiles='CartoDB positron')
+            title_html = f'''
+                <h3 align="center" style="font-size:16px"><b>{event_type} Events</b></h3>
+            '''
+            m.get_root().html.add_child(folium.Element(title_html))
+            
+            for point in points:
+                # Scale marker size by the cell's event count
+                folium.CircleMarker(
+                    location=[point['lat'], point['lon']],
+                    radius=min(12, 4 + point['count']),
+                    popup=f"Events: {point['count']}<br>Fatalities in cell: {point['fatalities']}",
+                    color='red',
+                    fill=True,
+                    fill_color='red'
+                ).add_to(m)
+            
+            m.save(map_path)
+            map_paths[event_type] = map_path
+        return map_paths
+    
     # Group events by type
     events_by_type = {}
     for event in events:
@@ -298,7 +360,7 @@ def generate_event_type_maps(events: List[Dict[str, Any]]) -> Dict[str, str]:
     # Generate a map for each event type
     map_paths = {}
     for event_type, type_events in events_by_type.items():
-        map_path = os.path.join("data", "visualizations", "maps", f"{event_type.replace(' ', '_').lower()}_{datetime.now().strftime('%Y%m%d')}.html")
+        map_path = os.path.join("data", "visualizations", "maps", f"{event_type.replace(' ', '_').replace('/', '_').lower()}_{datetime.now().strftime('%Y%m%d')}.html")
         
         # Extract coordinates
         points = []
@@ -379,7 +441,17 @@ def generate_all_charts(insights: Dict[str, Any]) -> Dict[str, Dict[str, str]]:
         
     Returns:
         Dictionary of visualization paths by type
+
+    The charts are cached by the content of ``insights`` (see
+    ``src.core.artifact_cache``): identical insights reuse the files
+    written for them.
     """
+    key = artifact_cache.stage_key("charts", config={"insights": artifact_cache.object_digest(insights)},
+                                   code=[__name__])
+    cached = artifact_cache.lookup("charts", key)
+    if cached is not None:
+        return cached["result"]
+
     visualization_paths = {
         'charts': {},
         'event_type_maps': {},
@@ -407,12 +479,19 @@ def generate_all_charts(insights: Dict[str, Any]) -> Dict[str, Dict[str, str]]:
             insights['hotspots']
         )
     
-    # Generate maps if we have events
-    if 'events' in insights and insights['events']:
+    # Generate maps if we have events (pre-binned grid cells when available)
+    if insights.get('events') or insights.get('map_cells'):
         # Generate heatmap
-        visualization_paths['heatmap'] = generate_heatmap(insights['events'])
+        visualization_paths['heatmap'] = generate_heatmap(insights.get('events', []),
+                                                          cells=insights.get('map_cells'))
         
         # Generate event type maps
-        visualization_paths['event_type_maps'] = generate_event_type_maps(insights['events'])
+        visualization_paths['event_type_maps'] = generate_event_type_maps(insights.get('events', []),
+                                                                          cells=insights.get('map_cells'))
+
+    outputs = {f"chart:{name}": path for name, path in visualization_paths['charts'].items()}
+    outputs.update({f"map:{name}": path for name, path in visualization_paths['event_type_maps'].items()})
+    outputs['heatmap'] = visualization_paths['heatmap']
+    artifact_cache.store("charts", key, outputs, visualization_paths)
     
     return visualization_paths 
\ No newline at end of file